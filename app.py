@@ -1,25 +1,301 @@
-from flask import Flask, render_template, send_from_directory, jsonify, request
+from flask import (Flask, render_template, send_from_directory, jsonify, request, Response,
+                   stream_with_context, g)
 from datetime import datetime
 import os
 import json
+import re
+import secrets
+import threading
+import time
+import zlib
 
-app = Flask(__name__, static_folder='static', template_folder='templates')
-
-# Store session data in memory (in production, use a database)
-session_data = {
-    'gestures': [],
-    'analytics': [],
-    'settings': {
-        'theme': 'dark',
-        'showPose': True,
-        'showHands': True,
-        'showFace': False,
-        'multiPerson': False,
-        'showLabels': True,
-        'visualizationStyle': 'skeleton',
-        'confidenceThreshold': 0.5
-    }
+from utils.asset_pipeline import AssetPipeline
+from utils.metrics import MetricsRegistry
+from utils.session_store import create_session_backend
+from utils.session_export import (EXPORT_FORMATS, EXPORT_MIMETYPES, PYARROW_AVAILABLE, iter_csv,
+                                  iter_json, iter_ndjson, iter_parquet)
+
+try:
+    from flask_sock import Sock
+    FLASK_SOCK_AVAILABLE = True
+except ImportError:
+    FLASK_SOCK_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    from utils.pose_analytics import analyze_pose
+    POSE_ANALYTICS_AVAILABLE = True
+except ImportError:
+    POSE_ANALYTICS_AVAILABLE = False
+
+# /static is served by serve_static below, from the asset pipeline
+app = Flask(__name__, static_folder=None, template_folder='templates')
+sock = Sock(app) if FLASK_SOCK_AVAILABLE else None
+
+# Page scripts and styles are bundled, minified and precompressed once at
+# startup, and linked under content-hash URLs that can be cached forever.
+# ASSETS_MINIFY=0 keeps bundles readable while debugging
+ASSET_BUNDLES = {
+    'app.js': ['mobile-optimizations.js', 'gestures.js', 'analytics.js', 'objects.js',
+               'agriculture.js', 'script.js'],
+    'app.css': ['style.css'],
 }
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+assets = AssetPipeline(os.path.join(app.root_path, 'static'), ASSET_BUNDLES,
+                       minify=os.environ.get('ASSETS_MINIFY', '1') != '0')
+for bundle, stats in assets.stats.items():
+    print(f"[OK] Asset bundle {bundle}: {stats['source_bytes'] / 1024:.1f} KB from "
+          f"{stats['files']} files -> {stats['identity_bytes'] / 1024:.1f} KB, "
+          f"{stats.get('br_bytes', stats.get('gzip_bytes', 0)) / 1024:.1f} KB compressed")
+
+@app.context_processor
+def asset_helpers():
+    """Make asset_url('app.js') available in templates"""
+    return {'asset_url': assets.url}
+
+# Gesture / analytics history and settings are kept per client session,
+# identified by a cookie. The default backend holds bounded ring buffers in
+# process memory; set SESSION_BACKEND=sqlite when running several gunicorn
+# workers so they all see the same data
+HISTORY_LIMIT = int(os.environ.get('SESSION_HISTORY_LIMIT', 10000))
+MAX_RANGE_RECORDS = 1000
+
+session_backend = create_session_backend(
+    os.environ.get('SESSION_BACKEND', 'memory'),
+    path=os.environ.get('SESSION_DB_PATH', 'bodyvision_sessions.db'),
+    history_limit=HISTORY_LIMIT
+)
+
+SESSION_COOKIE = 'bv_session'
+SESSION_MAX_AGE = 30 * 24 * 3600
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+def current_session():
+    """Session of the requesting client (cookie or X-Session-Id header), created if new"""
+    if 'session' not in g:
+        session_id = request.cookies.get(SESSION_COOKIE) or request.headers.get('X-Session-Id')
+        if not session_id or not SESSION_ID_PATTERN.match(session_id):
+            session_id = secrets.token_urlsafe(24)
+            g.new_session_id = session_id
+        g.session = session_backend.get(session_id)
+    return g.session
+
+def gevent_active():
+    """Whether this process runs under gunicorn's gevent worker (sockets monkey-patched)"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('socket')
+
+def run_blocking(function, *args):
+    """
+    Call a session store function without stalling the event loop
+
+    On the gevent worker, calls into a blocking backend (SQLite) run in the
+    hub's pool of native threads so other greenlets keep being served;
+    otherwise (or for the in-memory backend) the function is called directly.
+    """
+    if session_backend.blocking and gevent_active():
+        import gevent
+        return gevent.get_hub().threadpool.apply(function, args)
+    return function(*args)
+
+def iter_blocking(iterable):
+    """Iterate with each step passed through run_blocking (for streamed exports)"""
+    iterator = iter(iterable)
+    done = object()
+    while True:
+        item = run_blocking(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+# Request counts are always kept; latency histograms time a METRICS_SAMPLE_RATE
+# fraction of requests and inference results (none at 0)
+metrics = MetricsRegistry(sample_rate=float(os.environ.get('METRICS_SAMPLE_RATE', 1.0)))
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request by route and status, and time a sample of them"""
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    metrics.counter('http_requests_total', 'HTTP requests handled', route=route,
+                    method=request.method, status=str(response.status_code)).inc()
+    if metrics.sample() and 'request_start' in g:
+        metrics.histogram('http_request_seconds', 'Time to produce the response',
+                          route=route).observe(time.perf_counter() - g.request_start)
+    return response
+
+@app.after_request
+def set_session_cookie(response):
+    """Hand newly created session ids to the client"""
+    session_id = g.get('new_session_id')
+    if session_id is not None:
+        response.set_cookie(SESSION_COOKIE, session_id, max_age=SESSION_MAX_AGE,
+                            httponly=True, samesite='Lax')
+    return response
+
+# Bulk ingestion limits (after decompression)
+MAX_INGEST_BYTES = 4 * 1024 * 1024
+MAX_INGEST_SAMPLES = 5000
+
+def gesture_record(data, timestamp):
+    """Build a stored gesture record from posted data"""
+    return {
+        'gesture': data.get('gesture'),
+        'confidence': data.get('confidence'),
+        'timestamp': datetime.fromtimestamp(timestamp).isoformat()
+    }
+
+def analytics_record(data, timestamp):
+    """
+    Build a stored analytics record from posted data
+
+    When the client sends raw pose `landmarks` (33 [x, y, z, ...] rows) the
+    metrics are computed on the server (utils/pose_analytics.py) instead of
+    taken from the client.
+    """
+    landmarks = data.get('landmarks')
+    if landmarks is not None and POSE_ANALYTICS_AVAILABLE:
+        try:
+            data = analyze_pose(landmarks)
+        except (TypeError, ValueError):
+            pass
+    return {
+        'posture_score': data.get('posture_score'),
+        'joint_angles': data.get('joint_angles'),
+        'body_alignment': data.get('body_alignment'),
+        'timestamp': datetime.fromtimestamp(timestamp).isoformat()
+    }
+
+def parse_time_arg(name):
+    """Read a query parameter as Unix seconds or an ISO 8601 timestamp (None if absent)"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+def query_history(store, key):
+    """Answer a history GET: latest 10, ?since/?until range, or ?rollup=<seconds>"""
+    try:
+        since = parse_time_arg('since')
+        until = parse_time_arg('until')
+    except ValueError:
+        return jsonify({'error': 'since/until must be Unix seconds or ISO 8601'}), 400
+
+    rollup = request.args.get('rollup', type=int)
+    if rollup is not None:
+        if rollup not in store.rollup_intervals:
+            return jsonify({'error': f'rollup must be one of {list(store.rollup_intervals)}'}), 400
+        return jsonify({'interval': rollup,
+                        'rollups': run_blocking(store.rollups, rollup, since, until)})
+
+    if since is None and until is None:
+        return jsonify({key: run_blocking(store.latest, 10)})
+
+    limit = min(request.args.get('limit', MAX_RANGE_RECORDS, type=int), MAX_RANGE_RECORDS)
+    return jsonify({key: run_blocking(store.range, since, until, limit)})
+
+# Server-side inference pool, created on the first /api/infer request so
+# the web app still runs where OpenCV / MediaPipe are not installed
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 0)) or None
+INFERENCE_MAX_PENDING = int(os.environ.get('INFERENCE_MAX_PENDING', 0)) or None
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 10.0))
+# Fork inference workers from a fork server with MediaPipe preloaded (see
+# gunicorn.conf.py, which also warms the pools before serving requests)
+INFERENCE_PREFORK = os.environ.get('INFERENCE_PREFORK', '0') == '1'
+MAX_FRAMES_PER_REQUEST = 16
+
+inference_state = {'pool': None, 'error': None}
+inference_lock = threading.Lock()
+
+def get_inference_pool():
+    """Get the shared inference pool, creating it on first use (None if unavailable)"""
+    with inference_lock:
+        if inference_state['pool'] is None and inference_state['error'] is None:
+            if gevent_active():
+                # The pool's result threads would block the event loop
+                inference_state['error'] = 'Not supported on the gevent worker; use gthread'
+                return None
+            try:
+                from inference_pool import InferencePool
+                inference_state['pool'] = InferencePool(
+                    workers=INFERENCE_WORKERS,
+                    max_pending=INFERENCE_MAX_PENDING,
+                    prefork=INFERENCE_PREFORK
+                )
+            except Exception as e:
+                inference_state['error'] = str(e)
+                print(f"[ERROR] Server-side inference not available: {e}")
+        return inference_state['pool']
+
+# Streaming sessions: each client is pinned to one worker process that keeps
+# its PoseEstimator in tracking mode between frames
+STREAM_WORKERS = int(os.environ.get('STREAM_WORKERS', 0)) or None
+STREAM_MAX_SESSIONS = int(os.environ.get('STREAM_MAX_SESSIONS', 0)) or None
+STREAM_IDLE_TIMEOUT = float(os.environ.get('STREAM_IDLE_TIMEOUT', 30.0))
+# Reuse the last result for frames where nothing moved (kiosks, static cameras)
+STREAM_MOTION_GATE = os.environ.get('STREAM_MOTION_GATE', '0') == '1'
+STREAM_WAIT_TIMEOUT = 5.0
+
+stream_state = {'manager': None, 'error': None}
+stream_lock = threading.Lock()
+
+def get_stream_manager():
+    """Get the shared stream session manager, creating it on first use (None if unavailable)"""
+    with stream_lock:
+        if stream_state['manager'] is None and stream_state['error'] is None:
+            if gevent_active():
+                # Result dispatcher threads block on multiprocessing queues
+                stream_state['error'] = 'Not supported on the gevent worker; use gthread'
+                return None
+            try:
+                from stream_sessions import StreamSessionManager
+                stream_state['manager'] = StreamSessionManager(
+                    workers=STREAM_WORKERS,
+                    max_sessions=STREAM_MAX_SESSIONS,
+                    idle_timeout=STREAM_IDLE_TIMEOUT,
+                    estimator_kwargs={'motion_gate': True} if STREAM_MOTION_GATE else None,
+                    prefork=INFERENCE_PREFORK
+                )
+            except Exception as e:
+                stream_state['error'] = str(e)
+                print(f"[ERROR] Streaming inference not available: {e}")
+        return stream_state['manager']
+
+def warm_inference():
+    """Start the inference pool and stream workers now instead of on the first request"""
+    start = time.perf_counter()
+    ready = [get_inference_pool() is not None, get_stream_manager() is not None]
+    print(f"[INFO] Inference warmup: {sum(ready)}/2 worker pools ready "
+          f"in {time.perf_counter() - start:.1f}s")
+
+def stream_result_payload(seq, result, error):
+    """JSON-ready dictionary for one streaming result"""
+    payload = {'seq': seq}
+    if result is not None:
+        sampled = metrics.sample()
+        start = time.perf_counter()
+        payload['result'] = result.to_dict()
+        if sampled:
+            metrics.observe_stage('encode', time.perf_counter() - start)
+            metrics.observe_timings(result.timings)
+    else:
+        payload['error'] = error
+    return payload
 
 @app.route('/')
 def index():
@@ -28,77 +304,430 @@ def index():
 
 @app.route('/static/<path:filename>')
 def serve_static(filename):
-    """Serve static files"""
-    return send_from_directory('static', filename)
+    """Serve static files: fingerprinted names are immutable, plain names revalidate by ETag"""
+    asset, fingerprinted = assets.lookup(filename)
+    if asset is None:
+        return send_from_directory('static', filename)
+
+    cache_control = IMMUTABLE_CACHE if fingerprinted else 'no-cache'
+    # Weak ETag: the gzip / br / identity bodies of one file are equivalent
+    if request.if_none_match.contains_weak(asset.digest):
+        response = Response(status=304)
+    else:
+        encoding, body = asset.negotiate(request.accept_encodings)
+        response = Response(body, mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(asset.digest, weak=True)
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 @app.route('/health')
 def health():
     """Health check endpoint for Render"""
     return {'status': 'healthy', 'app': 'BodyVisionAI - Advanced Body Parts Recognition'}
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus metrics: request and stage latency histograms, request counts, store sizes"""
+    stats = run_blocking(session_backend.get_stats)
+    metrics.gauge('sessions', 'Client sessions held by the session backend',
+                  backend=stats['backend']).set(stats['sessions'])
+    for store, retained in stats['retained'].items():
+        metrics.gauge('store_records', 'Records retained in the gesture and analytics stores',
+                      backend=stats['backend'], store=store).set(retained)
+    pool = inference_state['pool']
+    if pool is not None:
+        metrics.gauge('inference_queue_depth', 'Frames queued or in flight in the inference pool'
+                      ).set(pool.get_stats()['queue_depth'])
+    manager = stream_state['manager']
+    if manager is not None:
+        metrics.gauge('stream_sessions', 'Open streaming inference sessions'
+                      ).set(manager.get_stats()['sessions'])
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/gestures', methods=['GET', 'POST'])
 def gestures():
     """Gesture recognition API endpoint"""
     if request.method == 'POST':
         data = request.json
-        gesture_data = {
-            'gesture': data.get('gesture'),
-            'confidence': data.get('confidence'),
-            'timestamp': datetime.now().isoformat()
-        }
-        session_data['gestures'].append(gesture_data)
+        now = time.time()
+        gesture_data = gesture_record(data, now)
+        run_blocking(current_session().gestures.append, gesture_data, now)
         return jsonify({'status': 'success', 'data': gesture_data})
     else:
-        return jsonify({'gestures': session_data['gestures'][-10:]})  # Last 10 gestures
+        return query_history(current_session().gestures, 'gestures')
 
 @app.route('/api/analytics', methods=['GET', 'POST'])
 def analytics():
     """Pose analytics API endpoint"""
     if request.method == 'POST':
         data = request.json
-        analytics_data = {
-            'posture_score': data.get('posture_score'),
-            'joint_angles': data.get('joint_angles'),
-            'body_alignment': data.get('body_alignment'),
-            'timestamp': datetime.now().isoformat()
-        }
-        session_data['analytics'].append(analytics_data)
+        now = time.time()
+        analytics_data = analytics_record(data, now)
+        run_blocking(current_session().analytics.append, analytics_data, now)
         return jsonify({'status': 'success', 'data': analytics_data})
     else:
-        return jsonify({'analytics': session_data['analytics'][-10:]})
+        return query_history(current_session().analytics, 'analytics')
+
+class IngestError(ValueError):
+    """Malformed or unsupported bulk ingestion request (carries the HTTP status)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def read_ingest_payload():
+    """Decode a bulk ingestion body: JSON or msgpack, optionally gzip-compressed"""
+    body = request.get_data(cache=False)
+
+    encoding = request.headers.get('Content-Encoding', 'identity').lower()
+    if encoding == 'gzip':
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(body, MAX_INGEST_BYTES)
+        except zlib.error:
+            raise IngestError('Invalid gzip body')
+        if decompressor.unconsumed_tail:
+            raise IngestError('Payload too large', 413)
+    elif encoding != 'identity':
+        raise IngestError(f'Unsupported Content-Encoding: {encoding}', 415)
+    if len(body) > MAX_INGEST_BYTES:
+        raise IngestError('Payload too large', 413)
+
+    if request.mimetype in ('application/msgpack', 'application/x-msgpack'):
+        if not MSGPACK_AVAILABLE:
+            raise IngestError('msgpack is not installed on the server; send JSON', 415)
+        try:
+            return msgpack.unpackb(body, raw=False)
+        except Exception:
+            raise IngestError('Invalid msgpack body')
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise IngestError('Invalid JSON body')
+
+def ingest_samples(samples, build_record, clock_offset, now):
+    """Turn posted samples into time-ordered (timestamp, record) pairs"""
+    if not isinstance(samples, list):
+        raise IngestError('Sample lists must be arrays')
+    items = []
+    for sample in samples:
+        if not isinstance(sample, dict):
+            raise IngestError('Samples must be objects')
+        # Client times are epoch milliseconds, shifted onto the server clock
+        sample_time = sample.get('t')
+        if isinstance(sample_time, (int, float)):
+            timestamp = min(sample_time / 1000.0 + clock_offset, now)
+        else:
+            timestamp = now
+        items.append((timestamp, build_record(sample, timestamp)))
+    items.sort(key=lambda item: item[0])
+    return items
+
+@app.route('/api/ingest', methods=['POST'])
+def ingest():
+    """Bulk ingestion of buffered gesture and analytics samples"""
+    try:
+        payload = read_ingest_payload()
+        if not isinstance(payload, dict):
+            raise IngestError('Body must be an object')
+
+        gesture_samples = payload.get('gestures') or []
+        analytics_samples = payload.get('analytics') or []
+        if not isinstance(gesture_samples, list) or not isinstance(analytics_samples, list):
+            raise IngestError('Sample lists must be arrays')
+        if len(gesture_samples) + len(analytics_samples) > MAX_INGEST_SAMPLES:
+            raise IngestError(f'At most {MAX_INGEST_SAMPLES} samples per request', 413)
+
+        now = time.time()
+        sent_at = payload.get('sent_at')
+        clock_offset = now - sent_at / 1000.0 if isinstance(sent_at, (int, float)) else 0.0
+
+        gesture_items = ingest_samples(gesture_samples, gesture_record, clock_offset, now)
+        analytics_items = ingest_samples(analytics_samples, analytics_record, clock_offset, now)
+    except IngestError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), e.status
+
+    session = current_session()
+    run_blocking(session.gestures.extend, gesture_items)
+    run_blocking(session.analytics.extend, analytics_items)
+    return jsonify({
+        'status': 'success',
+        'accepted': {'gestures': len(gesture_items), 'analytics': len(analytics_items)}
+    })
 
 @app.route('/api/settings', methods=['GET', 'POST'])
 def settings():
     """User settings API endpoint"""
     if request.method == 'POST':
         data = request.json
-        session_data['settings'].update(data)
-        return jsonify({'status': 'success', 'settings': session_data['settings']})
+        settings = run_blocking(current_session().update_settings, data)
+        return jsonify({'status': 'success', 'settings': settings})
     else:
-        return jsonify({'settings': session_data['settings']})
+        return jsonify({'settings': run_blocking(current_session().get_settings)})
 
 @app.route('/api/export', methods=['GET'])
 def export_data():
-    """Export session data"""
+    """Stream session data as JSON, NDJSON, CSV or Parquet"""
     export_format = request.args.get('format', 'json')
-    
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Unsupported format'}), 400
+
+    try:
+        since = parse_time_arg('since')
+        until = parse_time_arg('until')
+    except ValueError:
+        return jsonify({'error': 'since/until must be Unix seconds or ISO 8601'}), 400
+
+    fields = request.args.get('fields')
+    if fields:
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    else:
+        fields = None
+
+    # json / ndjson export both stores by default; csv / parquet one table
+    default_types = 'gestures,analytics' if export_format in ('json', 'ndjson') else 'analytics'
+    types = [name.strip() for name in request.args.get('type', default_types).split(',')]
+    if any(name not in ('gestures', 'analytics') for name in types):
+        return jsonify({'error': 'type must be gestures and/or analytics'}), 400
+    session = current_session()
+    stores = {name: getattr(session, name) for name in types}
+
+    headers = {}
+    if export_format != 'json':
+        extension = 'csv' if export_format == 'csv' else export_format
+        headers['Content-Disposition'] = (f'attachment; filename=bodyvision-{"-".join(types)}-'
+                                          f'{datetime.now().strftime("%Y%m%d-%H%M%S")}.{extension}')
+
     if export_format == 'json':
-        return jsonify({
+        extra = {
             'export_date': datetime.now().isoformat(),
-            'gestures': session_data['gestures'],
-            'analytics': session_data['analytics'],
-            'settings': session_data['settings']
-        })
-    
-    return jsonify({'error': 'Unsupported format'}), 400
+            'analytics_rollups': run_blocking(session.analytics.rollups, 60, since, until),
+            'retention': {name: run_blocking(store.get_stats) for name, store in stores.items()},
+            'settings': run_blocking(session.get_settings)
+        }
+        body = iter_json(stores, since, until, fields, extra)
+    elif export_format == 'ndjson':
+        body = iter_ndjson(stores, since, until, fields)
+    else:
+        if len(types) != 1:
+            return jsonify({'error': f'{export_format} export takes a single type'}), 400
+        if export_format == 'parquet' and not PYARROW_AVAILABLE:
+            return jsonify({'error': 'Parquet export needs pyarrow on the server'}), 415
+        exporter = iter_csv if export_format == 'csv' else iter_parquet
+        body = exporter(stores[types[0]], since, until, fields)
+
+    return Response(stream_with_context(iter_blocking(body)),
+                    mimetype=EXPORT_MIMETYPES[export_format], headers=headers)
 
 @app.route('/api/reset', methods=['POST'])
 def reset_session():
-    """Reset session data"""
-    session_data['gestures'] = []
-    session_data['analytics'] = []
+    """Reset this client's session data"""
+    run_blocking(current_session().reset)
     return jsonify({'status': 'success', 'message': 'Session data reset'})
 
+@app.route('/api/infer', methods=['POST'])
+def infer():
+    """Server-side pose and hand inference on JPEG/PNG frames"""
+    # Frames come either as repeated multipart 'frame' fields or as a raw image body
+    payloads = [f.read() for f in request.files.getlist('frame')]
+    if not payloads and request.mimetype.startswith('image/'):
+        payloads = [request.get_data(cache=False)]
+
+    if not payloads:
+        return jsonify({'status': 'error', 'message': 'No frames in request'}), 400
+    if len(payloads) > MAX_FRAMES_PER_REQUEST:
+        return jsonify({'status': 'error',
+                        'message': f'At most {MAX_FRAMES_PER_REQUEST} frames per request'}), 400
+
+    pool = get_inference_pool()
+    if pool is None:
+        return jsonify({'status': 'error', 'message': 'Server-side inference unavailable',
+                        'detail': inference_state['error']}), 503
+
+    from inference_pool import FuturesTimeoutError, InferencePoolBusy
+    try:
+        results, errors, latency_ms = pool.infer(payloads, timeout=INFERENCE_TIMEOUT)
+    except InferencePoolBusy as e:
+        return jsonify({'status': 'error', 'message': f'Server busy: {e}'}), 503, {'Retry-After': '1'}
+    except FuturesTimeoutError:
+        return jsonify({'status': 'error', 'message': 'Inference timed out'}), 504
+
+    headers = {
+        'X-Latency-Ms': f'{latency_ms:.1f}',
+        'X-Queue-Depth': str(pool.pending),
+    }
+
+    sampled = metrics.sample()
+    encode_start = time.perf_counter()
+    if request.args.get('format') == 'binary':
+        # One fixed-size landmark timeline record per frame (see utils/landmark_timeline.py)
+        from utils.landmark_timeline import RECORD_DTYPE, records_from_results
+        records = records_from_results(results, timestamps=[0.0] * len(results))
+        headers['X-Frame-Count'] = str(len(records))
+        headers['X-Record-Size'] = str(RECORD_DTYPE.itemsize)
+        response = Response(records.tobytes(), mimetype='application/octet-stream', headers=headers)
+    else:
+        response = jsonify({
+            'status': 'success',
+            'results': [
+                result.to_dict() if result is not None else {'error': error}
+                for result, error in zip(results, errors)
+            ],
+            'latency_ms': latency_ms,
+            'queue_depth': pool.pending
+        })
+        response.headers.update(headers)
+
+    if sampled:
+        # Worker-side stages travel back in each result's timings
+        metrics.observe_stage('encode', time.perf_counter() - encode_start)
+        for result in results:
+            if result is not None:
+                metrics.observe_timings(result.timings)
+    return response
+
+@app.route('/api/infer/stats', methods=['GET'])
+def infer_stats():
+    """Inference pool queue depth and latency statistics"""
+    pool = inference_state['pool']
+    if pool is None:
+        return jsonify({'status': 'idle' if inference_state['error'] is None else 'unavailable',
+                        'detail': inference_state['error']})
+    return jsonify({'status': 'running', 'stats': pool.get_stats()})
+
+@app.route('/api/stream', methods=['POST'])
+def open_stream():
+    """Open a streaming inference session (HTTP fallback for /ws/stream)"""
+    manager = get_stream_manager()
+    if manager is None:
+        return jsonify({'status': 'error', 'message': 'Streaming inference unavailable',
+                        'detail': stream_state['error']}), 503
+
+    from stream_sessions import StreamCapacityError
+    try:
+        session_id = manager.open_session()
+    except StreamCapacityError as e:
+        return jsonify({'status': 'error', 'message': f'Server busy: {e}'}), 503, {'Retry-After': '5'}
+    return jsonify({'status': 'success', 'session_id': session_id,
+                    'idle_timeout': manager.idle_timeout}), 201
+
+@app.route('/api/stream/<session_id>', methods=['GET', 'DELETE'])
+def stream_session(session_id):
+    """Get session statistics or close the session"""
+    manager = stream_state['manager']
+    if manager is None:
+        return jsonify({'status': 'error', 'message': 'Unknown session'}), 404
+
+    if request.method == 'DELETE':
+        manager.close_session(session_id)
+        return jsonify({'status': 'success', 'message': 'Session closed'})
+
+    from stream_sessions import UnknownSessionError
+    try:
+        return jsonify({'status': 'success', 'session': manager.session_stats(session_id)})
+    except UnknownSessionError:
+        return jsonify({'status': 'error', 'message': 'Unknown session'}), 404
+
+@app.route('/api/stream/<session_id>/frames', methods=['POST'])
+def stream_frame(session_id):
+    """Submit a JPEG/PNG frame; with ?wait=1 respond with the newest result"""
+    manager = stream_state['manager']
+    if manager is None:
+        return jsonify({'status': 'error', 'message': 'Unknown session'}), 404
+
+    data = request.get_data(cache=False)
+    if not data:
+        return jsonify({'status': 'error', 'message': 'No frame in request'}), 400
+
+    from stream_sessions import UnknownSessionError
+    try:
+        seq = manager.submit(session_id, data)
+        if request.args.get('wait') != '1':
+            return jsonify({'status': 'accepted', 'seq': seq}), 202
+
+        # Results for this frame or, if it was dropped, a newer one
+        latest = manager.wait_result(session_id, after_seq=seq - 1, timeout=STREAM_WAIT_TIMEOUT)
+    except UnknownSessionError:
+        return jsonify({'status': 'error', 'message': 'Unknown session'}), 404
+
+    if latest is None:
+        return jsonify({'status': 'pending', 'seq': seq}), 202
+    return jsonify({'status': 'success', **stream_result_payload(*latest)})
+
+@app.route('/api/stream/<session_id>/result', methods=['GET'])
+def stream_result(session_id):
+    """Long-poll for a result newer than ?after=<seq>"""
+    manager = stream_state['manager']
+    if manager is None:
+        return jsonify({'status': 'error', 'message': 'Unknown session'}), 404
+
+    from stream_sessions import UnknownSessionError
+    after_seq = request.args.get('after', -1, type=int)
+    try:
+        latest = manager.wait_result(session_id, after_seq=after_seq, timeout=STREAM_WAIT_TIMEOUT)
+    except UnknownSessionError:
+        return jsonify({'status': 'error', 'message': 'Unknown session'}), 404
+
+    if latest is None:
+        return '', 204
+    return jsonify({'status': 'success', **stream_result_payload(*latest)})
+
+@app.route('/api/stream/stats', methods=['GET'])
+def stream_stats():
+    """Streaming session and worker statistics"""
+    manager = stream_state['manager']
+    if manager is None:
+        return jsonify({'status': 'idle' if stream_state['error'] is None else 'unavailable',
+                        'detail': stream_state['error']})
+    return jsonify({'status': 'running', 'stats': manager.get_stats()})
+
+if sock is not None:
+    def send_stream_results(ws, manager, session_id):
+        """Push each new result of a session to its WebSocket until either closes"""
+        last_seq = -1
+        try:
+            while True:
+                latest = manager.wait_result(session_id, after_seq=last_seq, timeout=1.0)
+                if latest is None:
+                    continue
+                last_seq = latest[0]
+                ws.send(json.dumps(stream_result_payload(*latest)))
+        except Exception:
+            # Session closed/evicted or the socket went away
+            pass
+
+    @sock.route('/ws/stream')
+    def stream_socket(ws):
+        """WebSocket stream: binary JPEG/PNG messages in, JSON results out"""
+        manager = get_stream_manager()
+        if manager is None:
+            ws.send(json.dumps({'status': 'error', 'message': 'Streaming inference unavailable'}))
+            return
+
+        from stream_sessions import StreamCapacityError
+        try:
+            session_id = manager.open_session()
+        except StreamCapacityError as e:
+            ws.send(json.dumps({'status': 'error', 'message': f'Server busy: {e}'}))
+            return
+
+        ws.send(json.dumps({'status': 'ready', 'session_id': session_id}))
+        sender = threading.Thread(target=send_stream_results, args=(ws, manager, session_id),
+                                  name=f"stream-sender-{session_id[:8]}", daemon=True)
+        sender.start()
+        try:
+            while True:
+                data = ws.receive()
+                if isinstance(data, bytes):
+                    manager.submit(session_id, data)
+        except Exception:
+            pass
+        finally:
+            manager.close_session(session_id)
+
 @app.route('/api/agriculture/identify', methods=['POST'])
 def identify_crop():
     """Identify crop and provide farming solutions"""
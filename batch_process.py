@@ -0,0 +1,363 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.landmark_timeline import TIMELINE_EXTENSION, TimelineWriter, concatenate_timelines
+from utils.pose_analytics import analyze_timeline
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v')
+
+# Per-process estimator, created once by the pool initializer
+_estimator = None
+
+
+def find_videos(inputs, extensions=VIDEO_EXTENSIONS):
+    """
+    Expand files and directories into a sorted list of video paths
+
+    Args:
+        inputs: List of file or directory paths
+        extensions: File extensions to pick up inside directories
+
+    Returns:
+        List of video file paths
+    """
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    if name.lower().endswith(extensions):
+                        videos.append(os.path.join(root, name))
+        elif os.path.isfile(path):
+            videos.append(path)
+        else:
+            print(f"[ERROR] Input not found: {path}")
+    return sorted(videos)
+
+
+def output_names(videos):
+    """
+    Give every video a unique output name
+
+    The name is the file stem, plus a short hash of the absolute path when
+    another video in the batch has the same stem (`a/x.mp4` and `b/x.mp4`,
+    or `x.mp4` and `x.mov`), so their segments and timelines do not
+    overwrite each other.
+
+    Returns:
+        Dictionary of video path -> output name
+    """
+    by_stem = defaultdict(list)
+    for video_path in videos:
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+        # Case-insensitive filesystems would still collide on X.mp4 / x.mp4
+        by_stem[stem.lower()].append((stem, video_path))
+
+    names = {}
+    for paths in by_stem.values():
+        for stem, video_path in paths:
+            if len(paths) == 1:
+                names[video_path] = stem
+            else:
+                digest = hashlib.sha1(os.path.abspath(video_path).encode('utf-8')).hexdigest()
+                names[video_path] = f"{stem}-{digest[:8]}"
+    return names
+
+
+def plan_segments(video_path, segment_seconds):
+    """
+    Split a video into fixed-length frame ranges
+
+    Returns:
+        List of (video_path, segment_index, start_frame, end_frame, fps)
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"[ERROR] Could not open video: {video_path}")
+        return []
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    if frame_count <= 0:
+        print(f"[ERROR] Could not determine frame count: {video_path}")
+        return []
+
+    segment_frames = max(1, int(round(segment_seconds * fps)))
+    return [
+        (video_path, segment_idx, start, min(start + segment_frames, frame_count), fps)
+        for segment_idx, start in enumerate(range(0, frame_count, segment_frames))
+    ]
+
+
+def _init_worker(estimator_kwargs):
+    """Process pool initializer: build this worker's PoseEstimator once"""
+    global _estimator
+    from pose_estimator import PoseEstimator
+    _estimator = PoseEstimator(**estimator_kwargs)
+
+
+def process_segment(segment, output_dir, name):
+    """
+    Run inference over one video segment and write its landmarks to disk
+
+    The worker's estimator is reset first, so tracking state from whatever
+    segment or video it processed before does not leak into this one.
+    The segment is written as a landmark timeline (utils/landmark_timeline.py)
+    with timestamps in seconds from the start of the video; run_batch joins
+    the segments of each video once they are all done.
+
+    Args:
+        segment: Tuple from plan_segments
+        output_dir: Batch output directory
+        name: Output name of the video (see output_names)
+
+    Returns:
+        Dictionary with the segment, output name and path, frame count,
+        elapsed seconds and worker pid
+
+    Raises:
+        RuntimeError: If the video cannot be opened or seeked to the
+            segment start (the segment is then reported as failed)
+    """
+    video_path, segment_idx, start_frame, end_frame, fps = segment
+    start_time = time.perf_counter()
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {video_path}")
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if position != start_frame:
+            cap.release()
+            raise RuntimeError(f"Could not seek {video_path} to frame {start_frame} "
+                               f"(landed on {position})")
+
+    segment_dir = os.path.join(output_dir, name)
+    os.makedirs(segment_dir, exist_ok=True)
+    output_path = os.path.join(segment_dir, f"segment_{segment_idx:05d}{TIMELINE_EXTENSION}")
+
+    _estimator.reset()
+    frame = None
+    processed = 0
+    with TimelineWriter(output_path, fps=fps) as writer:
+        for frame_index in range(start_frame, end_frame):
+            ret, frame = cap.read(frame)
+            if not ret:
+                break
+            result = _estimator.infer(frame)
+            writer.append_result(result, timestamp=frame_index / fps, frame_index=frame_index)
+            processed += 1
+    cap.release()
+
+    return {
+        'video': video_path,
+        'name': name,
+        'segment': segment_idx,
+        'output': output_path,
+        'frames': processed,
+        'fps': fps,
+        'elapsed': time.perf_counter() - start_time,
+        'pid': os.getpid(),
+    }
+
+
+def run_batch(inputs, output_dir, workers=None, segment_seconds=60.0, model_complexity=1,
+              analytics=False):
+    """
+    Process every video under `inputs` across a pool of worker processes
+
+    Each worker process holds its own PoseEstimator (MediaPipe graphs are
+    not shareable between processes). Videos are split into segments so a
+    single long recording is spread over all workers; when every segment of
+    a video has finished they are joined into `<output_dir>/<name>.bvlm`,
+    where the name is the video's stem made unique within the batch (see
+    output_names). With `analytics`, per-frame pose analytics are written
+    next to each joined timeline as `<name>.analytics.csv`.
+
+    Returns:
+        List of per-segment result dictionaries
+    """
+    videos = find_videos(inputs)
+    if not videos:
+        print("[ERROR] No videos found")
+        return []
+
+    names = output_names(videos)
+    segments = []
+    for video_path in videos:
+        segments.extend(plan_segments(video_path, segment_seconds))
+
+    workers = workers or os.cpu_count() or 1
+    print(f"[INFO] {len(videos)} videos, {len(segments)} segments, {workers} workers")
+    os.makedirs(output_dir, exist_ok=True)
+
+    estimator_kwargs = {
+        'static_image_mode': False,
+        'model_complexity': model_complexity,
+    }
+
+    results = []
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(estimator_kwargs,)) as pool:
+        futures = {pool.submit(process_segment, segment, output_dir, names[segment[0]]): segment
+                   for segment in segments}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                segment = futures[future]
+                print(f"[ERROR] {names[segment[0]]} segment {segment[1]} failed: {e}")
+                continue
+            results.append(result)
+            print(f"[OK] {result['name']} segment {result['segment']}: "
+                  f"{result['frames']} frames in {result['elapsed']:.1f}s "
+                  f"({result['frames'] / max(result['elapsed'], 1e-9):.1f} FPS)")
+    elapsed = time.perf_counter() - start_time
+
+    planned = defaultdict(int)
+    for segment in segments:
+        planned[segment[0]] += 1
+    merged = merge_segments(results, output_dir, planned)
+    report_throughput(results, elapsed)
+    if analytics:
+        write_analytics(merged)
+    return results
+
+
+def merge_segments(results, output_dir, planned_segments):
+    """
+    Join each video's segment timelines into one timeline per video
+
+    Segment files are removed after a successful merge. Videos with failed
+    segments, or whose merge fails, keep their segment files so nothing is
+    silently lost; the other videos are still merged.
+
+    Args:
+        results: Per-segment result dictionaries from process_segment
+        output_dir: Batch output directory
+        planned_segments: Dictionary of video path -> number of segments
+
+    Returns:
+        List of joined timeline paths
+    """
+    merged = []
+    by_video = defaultdict(list)
+    for result in results:
+        by_video[result['video']].append(result)
+
+    for video_path, video_results in sorted(by_video.items()):
+        video_results.sort(key=lambda result: result['segment'])
+        expected = planned_segments[video_path]
+        name = video_results[0]['name']
+        if len(video_results) != expected:
+            print(f"[ERROR] {name}: {expected - len(video_results)} segments missing, "
+                  f"keeping segment files in {os.path.join(output_dir, name)}")
+            continue
+
+        paths = [result['output'] for result in video_results]
+        merged_path = os.path.join(output_dir, name + TIMELINE_EXTENSION)
+        fps = video_results[0]['fps']
+        try:
+            frames = concatenate_timelines(paths, merged_path, fps=fps)
+        except Exception as e:
+            print(f"[ERROR] {name}: merge failed ({e}), "
+                  f"keeping segment files in {os.path.join(output_dir, name)}")
+            continue
+        for path in paths:
+            os.remove(path)
+        segment_dir = os.path.dirname(paths[0])
+        if not os.listdir(segment_dir):
+            os.rmdir(segment_dir)
+        print(f"[OK] {name}: {frames} frames -> {merged_path}")
+        merged.append(merged_path)
+    return merged
+
+
+def write_analytics(timeline_paths):
+    """
+    Write per-frame joint angles, segment lengths, alignment and posture
+    score of each timeline to `<timeline stem>.analytics.csv`
+
+    Each timeline is analysed in one vectorized pass (see
+    utils/pose_analytics.py); frames without a pose are written as nan.
+    A timeline that cannot be read or analysed is reported and skipped.
+    """
+    start_time = time.perf_counter()
+    total_frames = 0
+    written = 0
+    for path in timeline_paths:
+        csv_path = os.path.splitext(path)[0] + '.analytics.csv'
+        try:
+            columns = analyze_timeline(path)
+            names = ['timestamp', 'frame_index'] + [name for name in columns
+                                                    if name not in ('timestamp', 'frame_index')]
+            table = np.column_stack([columns[name] for name in names])
+            np.savetxt(csv_path, table, fmt='%.6g', delimiter=',', header=','.join(names),
+                       comments='')
+        except Exception as e:
+            print(f"[ERROR] {path}: {e}")
+            continue
+        total_frames += len(table)
+        written += 1
+        print(f"[OK] {os.path.basename(path)}: {len(table)} frames -> {csv_path}")
+    elapsed = time.perf_counter() - start_time
+    print(f"[INFO] Analytics: {total_frames} frames from {written}/{len(timeline_paths)} timelines "
+          f"in {elapsed:.2f}s")
+
+
+def report_throughput(results, elapsed):
+    """Print frames/sec per worker process and overall"""
+    per_worker = defaultdict(lambda: [0, 0.0])
+    for result in results:
+        per_worker[result['pid']][0] += result['frames']
+        per_worker[result['pid']][1] += result['elapsed']
+
+    print("[INFO] Worker throughput:")
+    for pid, (frames, busy) in sorted(per_worker.items()):
+        print(f"  worker {pid}: {frames} frames, {frames / max(busy, 1e-9):.1f} FPS")
+
+    total_frames = sum(result['frames'] for result in results)
+    print(f"[INFO] Total: {total_frames} frames in {elapsed:.1f}s "
+          f"({total_frames / max(elapsed, 1e-9):.1f} FPS across {len(per_worker)} workers)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless batch pose extraction for recorded videos")
+    parser.add_argument("inputs", nargs="+", help="video files or directories to scan")
+    parser.add_argument("-o", "--output-dir", default="landmarks", help="where to write landmark files")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--segment-seconds", type=float, default=60.0,
+                        help="split videos into segments of this length")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=(0, 1, 2))
+    parser.add_argument("--analytics", action="store_true",
+                        help="also write per-frame pose analytics CSVs")
+    parser.add_argument("--analytics-only", action="store_true",
+                        help="inputs are existing .bvlm timelines; only (re)compute analytics")
+    args = parser.parse_args()
+
+    if args.analytics_only:
+        write_analytics(find_videos(args.inputs, extensions=(TIMELINE_EXTENSION,)))
+        return
+
+    run_batch(args.inputs, args.output_dir, workers=args.workers,
+              segment_seconds=args.segment_seconds, model_complexity=args.model_complexity,
+              analytics=args.analytics)
+
+
+if __name__ == "__main__":
+    main()
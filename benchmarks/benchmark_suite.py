@@ -0,0 +1,381 @@
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Add the project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+RESOLUTIONS = {'480p': (854, 480), '720p': (1280, 720), '1080p': (1920, 1080)}
+
+# Frame cases run on every resolution and clip; API cases run once
+FRAME_CASES = ('convert', 'detect_pose', 'render')
+API_CASES = ('api_ingest', 'api_analytics_post', 'api_analytics_get', 'api_settings')
+CASES = FRAME_CASES + API_CASES
+
+# Normalized (x, y) of a standing person for the 33 pose landmarks
+STANDING_POSE = (
+    (0.50, 0.20), (0.51, 0.185), (0.515, 0.185), (0.52, 0.185), (0.49, 0.185),
+    (0.485, 0.185), (0.48, 0.185), (0.53, 0.19), (0.47, 0.19), (0.51, 0.22),
+    (0.49, 0.22), (0.58, 0.30), (0.42, 0.30), (0.62, 0.42), (0.38, 0.42),
+    (0.64, 0.54), (0.36, 0.54), (0.65, 0.57), (0.35, 0.57), (0.645, 0.575),
+    (0.355, 0.575), (0.63, 0.56), (0.37, 0.56), (0.55, 0.58), (0.45, 0.58),
+    (0.56, 0.74), (0.44, 0.74), (0.56, 0.90), (0.44, 0.90), (0.555, 0.92),
+    (0.445, 0.92), (0.58, 0.93), (0.42, 0.93),
+)
+LIMBS = ((11, 12), (11, 13), (13, 15), (12, 14), (14, 16), (11, 23), (12, 24),
+         (23, 24), (23, 25), (25, 27), (24, 26), (26, 28))
+
+SYNTHETIC_FRAMES = 8
+
+
+def synthetic_pose(index):
+    """(33, 4) pose landmarks of the standing figure in synthetic frame `index`"""
+    rng = np.random.default_rng(index)
+    pose = np.zeros((33, 4), dtype=np.float32)
+    pose[:, :2] = np.array(STANDING_POSE) + rng.normal(0.0, 0.004, (33, 2))
+    pose[:, 0] += 0.02 * np.sin(index)
+    pose[:, 2] = rng.normal(0.0, 0.05, 33)
+    pose[:, 3] = 0.95
+    return pose
+
+
+def synthetic_hands(pose):
+    """(2, 21, 3) hand landmarks fanned out from the pose's wrists"""
+    angles = np.linspace(-0.8, 0.8, 21)
+    radii = np.tile(np.linspace(0.0, 0.06, 5), 5)[:21]
+    hands = np.zeros((2, 21, 3), dtype=np.float32)
+    for hand, wrist in enumerate((15, 16)):
+        hands[hand, :, 0] = pose[wrist, 0] + radii * np.sin(angles)
+        hands[hand, :, 1] = pose[wrist, 1] + radii * np.cos(angles)
+    return hands
+
+
+def synthetic_frames(width, height):
+    """
+    Deterministic test frames: a textured background with a drawn figure
+
+    Returns:
+        List of SYNTHETIC_FRAMES (height, width, 3) BGR frames
+    """
+    import cv2
+
+    rng = np.random.default_rng(0)
+    background = np.empty((height, width, 3), dtype=np.uint8)
+    background[:] = np.linspace(40, 120, height, dtype=np.uint8)[:, None, None]
+    background += rng.integers(0, 24, (height, width, 3), dtype=np.uint8)
+
+    frames = []
+    scale = np.array((width, height))
+    thickness = max(2, height // 40)
+    for index in range(SYNTHETIC_FRAMES):
+        frame = background.copy()
+        points = (synthetic_pose(index)[:, :2] * scale).astype(int)
+        for start, end in LIMBS:
+            cv2.line(frame, tuple(points[start]), tuple(points[end]), (70, 110, 190), thickness)
+        cv2.circle(frame, tuple(points[0]), height // 16, (150, 180, 210), -1)
+        frames.append(frame)
+    return frames
+
+
+def clip_frames(path, limit):
+    """Decode up to `limit` frames of a recorded clip into memory"""
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    if not frames:
+        raise ValueError(f"Could not read any frames from {path}")
+    return frames
+
+
+def load_frames(source, limit):
+    """Frames for a source: a RESOLUTIONS key or 'clip:<path>'"""
+    if source.startswith('clip:'):
+        return clip_frames(source[5:], limit)
+    return synthetic_frames(*RESOLUTIONS[source])
+
+
+def build_frame_case(case, frames):
+    """
+    Set up one frame case
+
+    Returns:
+        Tuple of (prepare, step): prepare(i) runs untimed before step(i)
+    """
+    if case == 'convert':
+        from utils.frame_buffers import FrameBufferPool
+
+        pool = FrameBufferPool()
+        return None, lambda i: pool.to_rgb(frames[i % len(frames)], mirror=True)
+
+    from pose_estimator import PoseEstimator
+    from utils.landmark_arrays import PoseResult
+
+    height, width = frames[0].shape[:2]
+    estimator = PoseEstimator(static_image_mode=False)
+    if case == 'detect_pose':
+        estimator.warmup(image_size=(width, height))
+        return None, lambda i: estimator.detect_pose(frames[i % len(frames)], mirror=True)
+
+    # render: pose and both hands with labels, drawn onto a fresh copy of the frame
+    results = []
+    for index in range(SYNTHETIC_FRAMES):
+        pose = synthetic_pose(index)
+        results.append(PoseResult(pose=pose, hands=synthetic_hands(pose),
+                                  handedness=['Left', 'Right'], image_size=(width, height)))
+    canvas = np.empty_like(frames[0])
+
+    def prepare(i):
+        np.copyto(canvas, frames[i % len(frames)])
+
+    return prepare, lambda i: estimator.render(canvas, results[i % len(results)])
+
+
+def build_api_case(case):
+    """Set up one Flask endpoint case (in-process test client, no network)"""
+    os.environ.setdefault('SESSION_BACKEND', 'memory')
+    from app import app
+
+    client = app.test_client()
+    now_ms = int(time.time() * 1000)
+    if case == 'api_ingest':
+        samples = [{'posture_score': 80 + i % 20, 't': now_ms - i * 33} for i in range(30)]
+        body = json.dumps({'sent_at': now_ms, 'analytics': samples})
+        step = lambda i: client.post('/api/ingest', data=body, content_type='application/json')
+    elif case == 'api_analytics_post':
+        body = json.dumps({'landmarks': synthetic_pose(0).tolist()})
+        step = lambda i: client.post('/api/analytics', data=body, content_type='application/json')
+    elif case == 'api_analytics_get':
+        client.post('/api/ingest', json={'analytics': [{'posture_score': 90}] * 100})
+        step = lambda i: client.get('/api/analytics')
+    else:
+        step = lambda i: client.get('/api/settings')
+
+    def checked(i):
+        response = step(i)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{case}: HTTP {response.status_code}")
+
+    return None, checked
+
+
+def peak_rss_mb():
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0)
+
+
+def run_case(case_id, iterations, warmup):
+    """
+    Run one case in this process
+
+    Args:
+        case_id: '<case>@<source>' for frame cases, '<case>' for API cases
+        iterations: Timed iterations
+        warmup: Untimed iterations first
+
+    Returns:
+        Dictionary of latency percentiles (ms), FPS, CPU % and peak RSS (MB)
+    """
+    case, _, source = case_id.partition('@')
+    if case in FRAME_CASES:
+        frames = load_frames(source, iterations)
+        prepare, step = build_frame_case(case, frames)
+    else:
+        prepare, step = build_api_case(case)
+
+    for i in range(warmup):
+        if prepare is not None:
+            prepare(i)
+        step(i)
+
+    latencies = np.empty(iterations)
+    cpu_time = 0.0
+    for i in range(iterations):
+        if prepare is not None:
+            prepare(i)
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        step(i)
+        latencies[i] = time.perf_counter() - start
+        cpu_time += time.process_time() - cpu_start
+
+    total = latencies.sum()
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) * 1000.0
+    return {
+        'iterations': iterations,
+        'mean_ms': total / iterations * 1000.0,
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'fps': iterations / total,
+        # Process-wide CPU time: >100% when the models use several cores
+        'cpu_percent': cpu_time / total * 100.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_child(case_id, args):
+    """Run a case in a fresh interpreter so its peak RSS is its own"""
+    command = [sys.executable, os.path.abspath(__file__), '--child', case_id,
+               '--iterations', str(args.iterations), '--warmup', str(args.warmup)]
+    output = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if output.returncode != 0:
+        error = (output.stderr.strip().splitlines() or ['failed'])[-1]
+        print(f"  {case_id:<28} [ERROR] {error}")
+        return None
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    """Versions and machine details stored with the results"""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    for package in ('opencv-python', 'opencv-python-headless', 'mediapipe', 'flask'):
+        try:
+            info[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            info[package] = None
+    try:
+        info['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                        capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        info['commit'] = None
+    return info
+
+
+def print_row(case_id, row):
+    rss = row['peak_rss_mb']
+    print(f"  {case_id:<28} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+          f"{row['fps']:>9.1f} {row['cpu_percent']:>6.0f} "
+          f"{'' if rss is None else f'{rss:.0f}':>8}")
+
+
+def compare(baseline, current, threshold):
+    """
+    Print per-case changes against a baseline
+
+    Returns:
+        List of case ids whose p50 or p95 latency got worse by more than
+        `threshold` (a fraction)
+    """
+    print(f"\nComparison with baseline {baseline['environment'].get('commit')} "
+          f"(regression threshold {threshold * 100:.0f}%)")
+    print(f"  {'case':<28} {'p50 ms':>17} {'p95 ms':>17} {'fps':>9} {'rss MB':>8}")
+    regressions = []
+    for case_id, row in current['results'].items():
+        base = baseline['results'].get(case_id)
+        if base is None:
+            print(f"  {case_id:<28} (not in baseline)")
+            continue
+        changes = {key: row[key] / base[key] - 1.0 if base[key] else 0.0
+                   for key in ('p50_ms', 'p95_ms', 'fps')}
+        regressed = changes['p50_ms'] > threshold or changes['p95_ms'] > threshold
+        if regressed:
+            regressions.append(case_id)
+        rss = ''
+        if row['peak_rss_mb'] is not None and base.get('peak_rss_mb') is not None:
+            rss = f"{row['peak_rss_mb'] - base['peak_rss_mb']:+.0f}"
+        print(f"  {case_id:<28} {base['p50_ms']:>7.2f} {changes['p50_ms'] * 100:>+8.1f}% "
+              f"{base['p95_ms']:>7.2f} {changes['p95_ms'] * 100:>+8.1f}% "
+              f"{changes['fps'] * 100:>+8.1f}% {rss:>8}{'  REGRESSION' if regressed else ''}")
+    missing = set(baseline['results']) - set(current['results'])
+    if missing:
+        print(f"[INFO] Not run this time: {', '.join(sorted(missing))}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless PoseEstimator and API benchmark suite")
+    parser.add_argument("--cases", default=','.join(CASES),
+                        help=f"comma separated cases: {', '.join(CASES)}")
+    parser.add_argument("--resolutions", default=','.join(RESOLUTIONS),
+                        help="synthetic frame sizes for the frame cases")
+    parser.add_argument("--clip", action="append", default=[],
+                        help="recorded video to run the frame cases on (repeatable)")
+    parser.add_argument("--iterations", type=int, default=200, help="timed iterations per case")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed iterations per case")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="fractional p50/p95 slowdown reported as a regression")
+    parser.add_argument("--compare-only", metavar="RESULTS",
+                        help="compare a saved results file with --baseline without running")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Everything the cases print goes before the JSON line
+        print(json.dumps(run_case(args.child, args.iterations, args.warmup)))
+        return
+
+    if args.compare_only:
+        if not args.baseline:
+            parser.error("--compare-only needs --baseline")
+        with open(args.compare_only) as f:
+            current = json.load(f)
+    else:
+        cases = args.cases.split(',')
+        unknown = set(cases) - set(CASES)
+        if unknown:
+            parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+        sources = args.resolutions.split(',') + [f'clip:{path}' for path in args.clip]
+        case_ids = [f'{case}@{source}' for case in cases if case in FRAME_CASES
+                    for source in sources]
+        case_ids += [case for case in cases if case in API_CASES]
+
+        print(f"Benchmark suite: {args.iterations} iterations per case")
+        print(f"  {'case':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fps':>9} "
+              f"{'cpu %':>6} {'rss MB':>8}")
+        current = {'environment': environment(), 'settings': vars(args), 'results': {}}
+        for case_id in case_ids:
+            row = run_child(case_id, args)
+            if row is not None:
+                current['results'][case_id] = row
+                print_row(case_id, row)
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(current, f, indent=2)
+            print(f"[OK] Results written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"[ERROR] {len(regressions)} case(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print("[OK] No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.frame_buffers import FrameBufferPool
+
+
+def legacy_frame_path(frame):
+    """The per-frame conversions main.py + detect_pose used to do"""
+    frame = cv2.flip(frame, 1)
+    image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    image_rgb.flags.writeable = False
+    # (models run on image_rgb here)
+    image_rgb.flags.writeable = True
+    image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+    return image_rgb, image_bgr
+
+
+def pooled_frame_path(frame, pool):
+    """detect_pose(mirror=True, in_place=True) conversion path"""
+    image_rgb = pool.to_rgb(frame, mirror=True)
+    # (models run on image_rgb here)
+    cv2.flip(frame, 1, dst=frame)
+    return image_rgb, frame
+
+
+def measure(name, step, frames, width, height):
+    """
+    Measure peak transient bytes allocated and time per frame
+
+    Returns:
+        Tuple of (bytes per frame, milliseconds per frame)
+    """
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+
+    # Warm up so lazily created buffers are not counted
+    for _ in range(3):
+        step(frame)
+
+    tracemalloc.start()
+    peak_total = 0
+    elapsed = 0.0
+    for _ in range(frames):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        step(frame)
+        elapsed += time.perf_counter() - start
+        peak_total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    bytes_per_frame = peak_total / frames
+    ms_per_frame = elapsed / frames * 1000.0
+    print(f"  {name:<8} {bytes_per_frame / 1e6:8.2f} MB/frame  {ms_per_frame:6.2f} ms/frame")
+    return bytes_per_frame, ms_per_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame allocation benchmark for the frame conversion path")
+    parser.add_argument("--frames", type=int, default=200, help="frames to measure per path")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    print(f"Frame conversion path at {args.width}x{args.height} ({args.frames} frames)")
+    pool = FrameBufferPool()
+    legacy_bytes, _ = measure("legacy", legacy_frame_path, args.frames, args.width, args.height)
+    pooled_bytes, _ = measure("pooled", lambda frame: pooled_frame_path(frame, pool),
+                              args.frames, args.width, args.height)
+    print(f"[INFO] Saved {(legacy_bytes - pooled_bytes) / 1e6:.2f} MB of allocations per frame")
+
+
+if __name__ == "__main__":
+    main()
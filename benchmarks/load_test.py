@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Add the project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+
+def request_mix():
+    """
+    Lightweight API calls a browser session makes, weighted like the real client
+
+    Returns:
+        List of (weight, method, path, body) tuples
+    """
+    now_ms = int(time.time() * 1000)
+    samples = [{'posture_score': random.randint(50, 100), 't': now_ms - i * 33} for i in range(30)]
+    ingest = json.dumps({'sent_at': now_ms, 'analytics': samples}).encode()
+    return [
+        (4, 'GET', '/health', None),
+        (3, 'GET', '/api/settings', None),
+        (2, 'GET', '/api/analytics', None),
+        (1, 'POST', '/api/ingest', ingest),
+    ]
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client over asyncio streams (one connection)"""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cookie = None
+        self._reader = None
+        self._writer = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def request(self, method, path, body=None):
+        """Send one request, reconnecting if needed; returns the status code"""
+        return await asyncio.wait_for(self._request(method, path, body), self.timeout)
+
+    async def _request(self, method, path, body):
+        if self._writer is None:
+            await self._connect()
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        if self.cookie:
+            lines.append(f"Cookie: {self.cookie}")
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + (body or b''))
+
+        try:
+            head = await self._reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            # Server closed an idle keep-alive connection; retry once on a new one
+            self.close()
+            await self._connect()
+            return await self._request(method, path, body)
+
+        status_line, *header_lines = head.decode('latin-1').split("\r\n")
+        headers = {}
+        for line in header_lines:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        await self._reader.readexactly(int(headers.get('content-length', 0)))
+
+        if 'set-cookie' in headers:
+            self.cookie = headers['set-cookie'].split(';', 1)[0]
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return int(status_line.split()[1])
+
+
+async def run_client(host, port, deadline, timeout, latencies, errors):
+    client = HttpClient(host, port, timeout)
+    mix = request_mix()
+    weights = [weight for weight, *_ in mix]
+    try:
+        while time.perf_counter() < deadline:
+            _, method, path, body = random.choices(mix, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = await client.request(method, path, body)
+            except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError, ValueError):
+                errors['timeout/connection'] = errors.get('timeout/connection', 0) + 1
+                client.close()
+                continue
+            if status >= 400:
+                errors[status] = errors.get(status, 0) + 1
+            else:
+                latencies.append(time.perf_counter() - start)
+    finally:
+        client.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+async def run_level(host, port, concurrency, duration, timeout):
+    """
+    Run `concurrency` clients in a closed loop for `duration` seconds
+
+    Returns:
+        Dictionary of request rate, latency percentiles and error counts
+    """
+    latencies = []
+    errors = {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(run_client(host, port, deadline, timeout, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000.0,
+        'p99_ms': percentile(latencies, 0.99) * 1000.0,
+        'errors': errors,
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_healthy(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1.0):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become healthy")
+
+
+def start_server(worker_class, port, workers):
+    """Start gunicorn with gunicorn.conf.py and the given worker class"""
+    env = dict(os.environ, PORT=str(port), WEB_WORKER_CLASS=worker_class,
+               WEB_CONCURRENCY=str(workers))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_healthy(port)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process
+
+
+def raise_file_limit(connections):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, connections + 256))
+    if wanted > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    if wanted < connections + 256:
+        print(f"[INFO] Open file limit is {wanted}; high concurrency levels may fail to connect")
+
+
+def print_row(label, row):
+    errors = sum(row['errors'].values())
+    print(f"  {label:<8} {row['concurrency']:>6} {row['requests']:>9} {row['rps']:>9.0f} "
+          f"{row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} {errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the lightweight JSON API")
+    parser.add_argument("--url", help="test an already running server (e.g. http://127.0.0.1:5000)")
+    parser.add_argument("--worker-classes", default="sync,gthread,gevent",
+                        help="gunicorn worker classes to start and compare (ignored with --url)")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn worker processes")
+    parser.add_argument("--concurrency", default="100,1000,5000",
+                        help="comma separated numbers of concurrent connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    raise_file_limit(max(levels))
+
+    if args.url:
+        host, _, port = args.url.split('://', 1)[-1].rstrip('/').partition(':')
+        targets = [('server', host, int(port or 80), None)]
+    else:
+        targets = [(worker_class, '127.0.0.1', None, worker_class)
+                   for worker_class in args.worker_classes.split(',')]
+
+    print(f"{'':2}{'server':<8} {'conns':>6} {'requests':>9} {'req/s':>9} "
+          f"{'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    results = []
+    for label, host, port, worker_class in targets:
+        process = None
+        if worker_class is not None:
+            port = free_port()
+            try:
+                process = start_server(worker_class, port, args.workers)
+            except RuntimeError as e:
+                print(f"[ERROR] {worker_class}: {e} (is it installed?)")
+                continue
+        try:
+            for level in levels:
+                row = asyncio.run(run_level(host, port, level, args.duration, args.timeout))
+                row['server'] = label
+                results.append(row)
+                print_row(label, row)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"[OK] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
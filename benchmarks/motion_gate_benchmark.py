@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from benchmark_suite import LIMBS, synthetic_pose
+
+# Scripted scene: (phase, seconds, person visible, person moving)
+PHASES = (
+    ('empty', 5.0, False, False),
+    ('walk in', 2.0, True, True),
+    ('still', 3.0, True, False),
+    ('empty again', 5.0, False, False),
+)
+
+
+def noisy_backgrounds(width, height, count=8):
+    """
+    The empty scene with `count` different draws of camera noise
+
+    Made up front so generating frames costs next to nothing in the
+    measured CPU time.
+    """
+    rng = np.random.default_rng(0)
+    background = np.empty((height, width, 3), dtype=np.uint8)
+    background[:] = np.linspace(40, 120, height, dtype=np.uint8)[:, None, None]
+    background += rng.integers(0, 24, (height, width, 3), dtype=np.uint8)
+    return [background + rng.integers(0, 4, background.shape, dtype=np.uint8)
+            for _ in range(count)]
+
+
+def scene_frame(backgrounds, person, moving, index):
+    """One BGR frame of the scripted scene"""
+    import cv2
+
+    frame = backgrounds[index % len(backgrounds)].copy()
+    height, width = frame.shape[:2]
+    if person:
+        pose = synthetic_pose(index if moving else 0)
+        if moving:
+            pose[:, 0] += 0.1 * np.sin(index / 10.0)
+        points = (pose[:, :2] * (width, height)).astype(int)
+        for start, end in LIMBS:
+            cv2.line(frame, tuple(points[start]), tuple(points[end]), (70, 110, 190),
+                     max(2, height // 40))
+        cv2.circle(frame, tuple(points[0]), height // 16, (150, 180, 210), -1)
+    return frame
+
+
+def run(gate, fps, size, idle_after, probe_interval):
+    """
+    Play the scene in real time through one estimator
+
+    Returns:
+        Dictionary of per-phase CPU use and inferred frames, plus the gate stats
+    """
+    from pose_estimator import PoseEstimator
+    from utils.motion_gate import MotionGate
+
+    backgrounds = noisy_backgrounds(*size)
+    estimator = PoseEstimator(
+        motion_gate=MotionGate(idle_after=idle_after, probe_interval=probe_interval) if gate else None)
+    estimator.warmup(image_size=size)
+
+    phases = {}
+    index = 0
+    for phase, seconds, person, moving in PHASES:
+        frames = int(seconds * fps)
+        inferred = 0
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for frame_index in range(frames):
+            frame = scene_frame(backgrounds, person, moving, index)
+            index += 1
+            result = estimator.infer(frame)
+            inferred += not result.synthesized
+            # Hold the camera frame rate so the gate's timers see real time
+            delay = wall_start + (frame_index + 1) / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        wall = time.perf_counter() - wall_start
+        phases[phase] = {
+            'cpu_percent': 100.0 * (time.process_time() - cpu_start) / wall,
+            'inferred_fraction': inferred / frames,
+        }
+    stats = estimator.motion_gate.get_stats() if gate else {}
+    return {'phases': phases, 'gate': stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CPU use and wake-up latency of motion-gated inference on a scripted scene")
+    parser.add_argument("--fps", type=float, default=30.0, help="camera frame rate to simulate")
+    parser.add_argument("--size", default="640x480", help="frame size WIDTHxHEIGHT")
+    parser.add_argument("--idle-after", type=float, default=3.0,
+                        help="seconds without a person before the gate goes idle")
+    parser.add_argument("--idle-probe", type=float, default=2.0,
+                        help="seconds between idle probes")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split('x'))
+    results = {
+        'ungated': run(False, args.fps, size, args.idle_after, args.idle_probe),
+        'motion gate': run(True, args.fps, size, args.idle_after, args.idle_probe),
+    }
+
+    print(f"\n{'phase':<12} " + "".join(f"{name + ' cpu %':>18} {'inferred':>9}" for name in results))
+    for phase, *_ in PHASES:
+        row = "".join(f"{result['phases'][phase]['cpu_percent']:>18.1f} "
+                      f"{result['phases'][phase]['inferred_fraction'] * 100:>8.0f}%"
+                      for result in results.values())
+        print(f"{phase:<12} {row}")
+    stats = results['motion gate']['gate']
+    if stats['wake_ms_mean'] is None:
+        print("[INFO] The gate never woke up (was the person detected?)")
+    else:
+        print(f"[INFO] Wake-up latency: {stats['wake_ms_mean']:.1f} ms mean, "
+              f"{stats['wake_ms_max']:.1f} ms max over {stats['wakes']} wakes")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
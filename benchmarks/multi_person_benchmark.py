@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from benchmark_suite import LIMBS, STANDING_POSE, clip_frames
+
+
+def crowd_frames(people, width=1280, height=720, count=60):
+    """
+    Synthetic frames with `people` walking figures side by side
+
+    Returns:
+        List of (height, width, 3) BGR frames
+    """
+    import cv2
+
+    rng = np.random.default_rng(0)
+    background = np.empty((height, width, 3), dtype=np.uint8)
+    background[:] = np.linspace(40, 120, height, dtype=np.uint8)[:, None, None]
+    background += rng.integers(0, 24, (height, width, 3), dtype=np.uint8)
+
+    # STANDING_POSE spans roughly x 0.35..0.65 of a full frame; squeeze one into each column
+    template = np.array(STANDING_POSE, dtype=np.float64)
+    template[:, 0] = (template[:, 0] - 0.5) * 1.5
+    column = 1.0 / people
+    thickness = max(2, height // 60)
+    frames = []
+    for index in range(count):
+        frame = background.copy()
+        for person in range(people):
+            center = column * (person + 0.5) + 0.15 * column * np.sin(index / 8.0 + person)
+            points = np.column_stack((center + template[:, 0] * column, template[:, 1]))
+            points = (points * (width, height)).astype(int)
+            for start, end in LIMBS:
+                cv2.line(frame, tuple(points[start]), tuple(points[end]), (70, 110, 190), thickness)
+            cv2.circle(frame, tuple(points[0]), height // 18, (150, 180, 210), -1)
+        frames.append(frame)
+    return frames
+
+
+def run(frames, crops, max_people, budget_ms):
+    """
+    Time multi-person inference over a sequence of frames
+
+    Returns:
+        Dictionary of latency percentiles, crops per frame and people tracked
+    """
+    from pose_estimator import PoseEstimator
+
+    estimator = PoseEstimator(multi_person=True, max_people=max_people, person_crops=crops,
+                              person_budget_ms=budget_ms)
+    estimator.warmup(image_size=(frames[0].shape[1], frames[0].shape[0]))
+    latencies = []
+    people = 0
+    for frame in frames:
+        start = time.perf_counter()
+        result = estimator.infer(frame)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        people = len(result.people)
+
+    stats = estimator.people.stats
+    # The first frames find the people; the steady state is what scales
+    steady = np.array(latencies[len(latencies) // 4:])
+    return {
+        'p50_ms': float(np.percentile(steady, 50)),
+        'p95_ms': float(np.percentile(steady, 95)),
+        'crops_per_frame': stats['crops'] / stats['frames'],
+        'people': people,
+        'frames_per_update': people * stats['frames'] / max(stats['crops'], 1) if people else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-frame cost of multi-person pose against the number of people")
+    parser.add_argument("--people", default="1,2,3,4",
+                        help="comma separated people counts for the synthetic crowd")
+    parser.add_argument("--clip", help="use a recorded video instead of the synthetic crowd")
+    parser.add_argument("--frames", type=int, default=60, help="frames per run")
+    parser.add_argument("--size", default="1280x720", help="synthetic frame size WIDTHxHEIGHT")
+    parser.add_argument("--crops", type=int, default=2, help="person crops per frame (budgeted run)")
+    parser.add_argument("--budget", type=float, default=None, help="per-frame pose budget in ms")
+    parser.add_argument("--max-people", type=int, default=4, help="most people tracked")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.clip:
+        sources = {os.path.basename(args.clip): clip_frames(args.clip, args.frames)}
+    else:
+        width, height = (int(v) for v in args.size.lower().split('x'))
+        sources = {f"{n} people": crowd_frames(int(n), width, height, args.frames)
+                   for n in args.people.split(',')}
+
+    results = {}
+    for name, frames in sources.items():
+        # 'every person' crops everyone each frame: the cost of per-person inference
+        results[name] = {
+            'budgeted': run(frames, args.crops, args.max_people, args.budget),
+            'every person': run(frames, args.max_people, args.max_people, None),
+        }
+
+    print(f"\n{'input':<12} {'strategy':<13} {'p50 ms':>8} {'p95 ms':>8} {'crops/frame':>12} "
+          f"{'people':>7} {'frames/update':>14}")
+    for name, runs in results.items():
+        for strategy, row in runs.items():
+            print(f"{name:<12} {strategy:<13} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                  f"{row['crops_per_frame']:>12.2f} {row['people']:>7} {row['frames_per_update']:>14.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pose_analytics import analyze_pose, analyze_sequence
+
+
+def per_frame(poses):
+    """One frame at a time, the way analytics.js computes metrics"""
+    return [analyze_pose(pose) for pose in poses]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame vs vectorized pose analytics")
+    parser.add_argument("--frames", type=int, default=20000, help="frames in the synthetic timeline")
+    parser.add_argument("--loop-frames", type=int, default=2000,
+                        help="frames to time with the per-frame loop (it is slow)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    poses = rng.random((args.frames, 33, 4)).astype(np.float32)
+
+    start = time.perf_counter()
+    per_frame(poses[:args.loop_frames])
+    loop_us = (time.perf_counter() - start) / args.loop_frames * 1e6
+
+    start = time.perf_counter()
+    analyze_sequence(poses)
+    vector_us = (time.perf_counter() - start) / args.frames * 1e6
+
+    print(f"Pose analytics ({args.frames} frames)")
+    print(f"  per-frame  {loop_us:8.2f} us/frame")
+    print(f"  vectorized {vector_us:8.2f} us/frame")
+    print(f"[INFO] Vectorized pass is {loop_us / vector_us:.0f}x faster "
+          f"({1e6 / vector_us:,.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
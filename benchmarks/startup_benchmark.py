@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROCESS_START = time.perf_counter()
+
+# Add the project root to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+MODES = {
+    'lazy': "construct, then infer the first frame (graphs built on first use)",
+    'warmup': "construct and warmup(), then infer the first frame",
+    'pool': "InferencePool with spawned workers, then the first request",
+    'pool-prefork': "InferencePool forked from a preloaded fork server, then the first request",
+}
+
+
+def test_frame(image_path, size):
+    import cv2
+    import numpy as np
+
+    if image_path:
+        frame = cv2.imread(image_path)
+        if frame is None:
+            raise SystemExit(f"[ERROR] Could not read {image_path}")
+        return frame
+    width, height = size
+    frame = np.full((height, width, 3), 96, dtype=np.uint8)
+    cv2.circle(frame, (width // 2, height // 3), height // 10, (200, 180, 160), -1)
+    cv2.rectangle(frame, (width // 2 - height // 8, height // 3 + height // 10),
+                  (width // 2 + height // 8, height * 5 // 6), (60, 90, 160), -1)
+    return frame
+
+
+def measure(mode, image_path, size, workers):
+    """
+    Time one cold start in this (fresh) process
+
+    Returns:
+        Dictionary of phase timings in milliseconds
+    """
+    def since(start):
+        return (time.perf_counter() - start) * 1000.0
+
+    timings = {}
+    start = time.perf_counter()
+    import pose_estimator
+    timings['import_ms'] = since(start)
+    timings['mediapipe_imported'] = 'mediapipe' in sys.modules
+    frame = test_frame(image_path, size)
+
+    if mode in ('lazy', 'warmup'):
+        start = time.perf_counter()
+        estimator = pose_estimator.PoseEstimator(static_image_mode=False)
+        timings['construct_ms'] = since(start)
+        if mode == 'warmup':
+            estimator.warmup(image_size=(frame.shape[1], frame.shape[0]))
+            timings['warmup_ms'] = estimator.startup_timings['warmup_ms']
+        start = time.perf_counter()
+        estimator.infer(frame)
+        timings['first_result_ms'] = since(start)
+        start = time.perf_counter()
+        estimator.infer(frame)
+        timings['steady_result_ms'] = since(start)
+        timings.update({f'graph_{name}': value for name, value in estimator.startup_timings.items()
+                        if name != 'warmup_ms'})
+    else:
+        import cv2
+        from inference_pool import InferencePool
+
+        data = cv2.imencode('.jpg', frame)[1].tobytes()
+        start = time.perf_counter()
+        pool = InferencePool(workers=workers, prefork=(mode == 'pool-prefork'))
+        timings['construct_ms'] = since(start)
+        try:
+            start = time.perf_counter()
+            pool.infer([data] * pool.workers)
+            timings['first_result_ms'] = since(start)
+            start = time.perf_counter()
+            pool.infer([data] * pool.workers)
+            timings['steady_result_ms'] = since(start)
+        finally:
+            pool.shutdown()
+
+    timings['cold_start_ms'] = (time.perf_counter() - PROCESS_START) * 1000.0 - \
+        timings['steady_result_ms']
+    return timings
+
+
+def run_child(mode, args):
+    """Measure one mode in a new interpreter so nothing is already imported"""
+    command = [sys.executable, os.path.abspath(__file__), '--child', mode,
+               '--size', args.size, '--workers', str(args.workers)]
+    if args.image:
+        command += ['--image', args.image]
+    start = time.perf_counter()
+    output = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000.0
+    if output.returncode != 0:
+        print(f"[ERROR] {mode} failed:\n{output.stderr.strip()}")
+        return None
+    timings = json.loads(output.stdout.strip().splitlines()[-1])
+    timings['process_wall_ms'] = wall_ms
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start to first result of the pose estimator")
+    parser.add_argument("--modes", default="lazy,warmup",
+                        help=f"comma separated modes to compare: {', '.join(MODES)}")
+    parser.add_argument("--image", help="image to run (default: a synthetic frame)")
+    parser.add_argument("--size", default="640x480", help="synthetic frame size WIDTHxHEIGHT")
+    parser.add_argument("--workers", type=int, default=2, help="pool workers for the pool modes")
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts per mode (median is kept)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        size = tuple(int(v) for v in args.size.lower().split('x'))
+        timings = measure(args.child, args.image, size, args.workers)
+        # The estimator prints to stdout; the JSON line is last
+        print(json.dumps(timings))
+        return
+
+    results = {}
+    for mode in args.modes.split(','):
+        runs = [timings for timings in (run_child(mode, args) for _ in range(args.repeat))
+                if timings is not None]
+        if not runs:
+            continue
+        runs.sort(key=lambda timings: timings['cold_start_ms'])
+        results[mode] = runs[len(runs) // 2]
+
+    print(f"{'mode':<13} {'import':>8} {'construct':>10} {'warmup':>8} {'1st result':>11} "
+          f"{'steady':>8} {'cold start':>11}   (ms, median of {args.repeat})")
+    for mode, timings in results.items():
+        print(f"{mode:<13} {timings['import_ms']:>8.1f} {timings['construct_ms']:>10.1f} "
+              f"{timings.get('warmup_ms', 0.0):>8.1f} {timings['first_result_ms']:>11.1f} "
+              f"{timings['steady_result_ms']:>8.1f} {timings['cold_start_ms']:>11.1f}")
+    for mode in results:
+        print(f"  {mode}: {MODES[mode]}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Gunicorn configuration, read by `gunicorn -c gunicorn.conf.py app:app`
+#
+# WEB_WORKER_CLASS selects how each worker handles connections:
+#   gthread (default) - a thread per in-flight request, works with every endpoint
+#   gevent            - event loop with cooperative greenlets; thousands of idle or
+#                       slow connections per worker for the lightweight JSON API.
+#                       Needs `pip install gevent`. Server-side inference and
+#                       streaming are disabled in this mode (see app.py)
+#   sync              - gunicorn's default, one request per worker at a time
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'gthread')
+
+# Several workers only share session data with SESSION_BACKEND=sqlite
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+threads = int(os.environ.get('WEB_THREADS', 32))
+worker_connections = int(os.environ.get('WEB_WORKER_CONNECTIONS', 2000))
+
+# Queued connections waiting for accept, and HTTP keep-alive for polling clients
+backlog = int(os.environ.get('WEB_BACKLOG', 4096))
+keepalive = 5
+timeout = 60
+graceful_timeout = 30
+
+# INFERENCE_PREFORK=1: load the app once in the master so workers inherit
+# it through fork, and have each worker start its inference and stream
+# worker pools (forked from a fork server with MediaPipe imported, models
+# warmed) before it accepts requests, instead of on the first request.
+# MediaPipe graphs themselves are never forked: they own threads
+prefork = os.environ.get('INFERENCE_PREFORK', '0') == '1'
+preload_app = prefork
+
+
+def post_worker_init(worker):
+    if prefork:
+        from app import warm_inference
+        warm_inference()
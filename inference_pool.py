@@ -0,0 +1,245 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+
+import cv2
+import numpy as np
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.frame_pipeline import StageStats
+
+# Frames from different clients are interleaved on the same worker, so
+# temporal tracking between consecutive frames would mix people up
+DEFAULT_ESTIMATOR_KWARGS = {
+    'static_image_mode': True,
+    'model_complexity': 1,
+}
+
+# Modules a fork server imports once for every worker it starts (prefork)
+PREFORK_MODULES = ['numpy', 'cv2', 'mediapipe', 'pose_estimator']
+
+# Per-process estimator, created once by the pool initializer
+_estimator = None
+
+
+class InferencePoolBusy(RuntimeError):
+    """Raised when accepting a request would exceed the pool's pending limit"""
+
+
+def worker_context(prefork=False):
+    """
+    multiprocessing context for inference worker processes
+
+    Workers are spawned (not forked) because the web server is
+    multi-threaded. With `prefork` they are forked from a single-threaded
+    fork server that has already imported PREFORK_MODULES, so every
+    worker, including restarted ones, skips importing MediaPipe. Falls
+    back to spawn where fork servers are not supported (Windows).
+    """
+    if prefork and 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(PREFORK_MODULES)
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _init_worker(estimator_kwargs, warmup):
+    """Process pool initializer: build this worker's PoseEstimator once"""
+    global _estimator
+    from pose_estimator import PoseEstimator
+    _estimator = PoseEstimator(**estimator_kwargs)
+    if warmup:
+        _estimator.warmup()
+
+
+def _worker_ready(hold):
+    # Holding the worker briefly makes the pool hand the next task to
+    # another (possibly still starting) worker
+    time.sleep(hold)
+    return os.getpid()
+
+
+def _infer_encoded(data, submitted_at):
+    """
+    Decode one encoded image and run inference on it (runs in a worker)
+
+    Args:
+        data: JPEG/PNG bytes as received in the request
+        submitted_at: time.time() when the frame was queued
+
+    Returns:
+        Tuple of (PoseResult or None, error message or None)
+    """
+    queue_ms = (time.time() - submitted_at) * 1000.0
+
+    start = time.perf_counter()
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    decode_ms = (time.perf_counter() - start) * 1000.0
+    if frame is None:
+        return None, "Could not decode image"
+
+    result = _estimator.infer(frame)
+    result.timings['queue_ms'] = queue_ms
+    result.timings['decode_ms'] = decode_ms
+    return result, None
+
+
+class InferencePool:
+    """
+    Fixed pool of worker processes, each holding a preloaded PoseEstimator
+
+    MediaPipe graphs are not thread-safe, so every worker process owns one
+    estimator and handles one frame at a time. Frames of a batched request
+    are spread over the workers. Encoded images are passed to the workers
+    as-is and decoded there, so the request thread never touches pixels.
+
+    The number of frames queued or in flight is capped by `max_pending`;
+    past that, requests are rejected with InferencePoolBusy instead of
+    queueing up latency.
+
+    With `warmup` each worker runs blank frames through its graphs before
+    taking requests; `prefork` starts workers from a fork server (see
+    worker_context).
+    """
+
+    def __init__(self, workers=None, max_pending=None, estimator_kwargs=None,
+                 warmup=True, prefork=False):
+        from pose_estimator import MEDIAPIPE_AVAILABLE
+        if not MEDIAPIPE_AVAILABLE:
+            raise ImportError("MediaPipe is not installed. Please run: pip install mediapipe")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+
+        kwargs = dict(DEFAULT_ESTIMATOR_KWARGS)
+        kwargs.update(estimator_kwargs or {})
+
+        # Workers build and warm their graphs before taking any frame
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=worker_context(prefork),
+            initializer=_init_worker,
+            initargs=(kwargs, warmup)
+        )
+
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.request_stats = StageStats("request")
+        self.queue_stats = StageStats("queue wait")
+        self.decode_stats = StageStats("decode")
+        self.inference_stats = StageStats("inference")
+
+        self._preload()
+
+    def _preload(self, timeout=120.0):
+        """Start every worker and load its models before the first request"""
+        start = time.perf_counter()
+        pids = set()
+        while len(pids) < self.workers and time.perf_counter() - start < timeout:
+            futures = [self._executor.submit(_worker_ready, 0.05) for _ in range(self.workers)]
+            pids.update(future.result() for future in futures)
+        print(f"[OK] Inference pool ready: {len(pids)} workers "
+              f"in {time.perf_counter() - start:.1f}s")
+
+    def infer(self, payloads, timeout=None):
+        """
+        Run inference on a batch of encoded images
+
+        Args:
+            payloads: List of JPEG/PNG byte strings
+            timeout: Seconds to wait for the whole batch (None waits forever)
+
+        Returns:
+            Tuple of (results, errors, latency_ms) where results[i] is a
+            PoseResult or None and errors[i] is the matching error message
+
+        Raises:
+            InferencePoolBusy: The pool already has too many pending frames
+            FuturesTimeoutError: The batch did not finish in time
+        """
+        count = len(payloads)
+        with self._lock:
+            if self.pending + count > self.max_pending:
+                self.rejected += count
+                raise InferencePoolBusy(
+                    f"{self.pending} frames pending (limit {self.max_pending})")
+            self.pending += count
+
+        start = time.perf_counter()
+        submitted_at = time.time()
+        futures = []
+        for data in payloads:
+            future = self._executor.submit(_infer_encoded, data, submitted_at)
+            future.add_done_callback(self._frame_done)
+            futures.append(future)
+
+        deadline = None if timeout is None else start + timeout
+        results = []
+        errors = []
+        for future in futures:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                result, error = future.result(timeout=remaining)
+            except FuturesTimeoutError:
+                raise
+            except Exception as e:
+                result, error = None, f"Inference failed: {e}"
+            results.append(result)
+            errors.append(error)
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.request_stats.record(latency)
+            for result in results:
+                if result is None:
+                    continue
+                self.queue_stats.record(result.timings['queue_ms'] / 1000.0)
+                self.decode_stats.record(result.timings['decode_ms'] / 1000.0)
+                self.inference_stats.record(result.timings['total_ms'] / 1000.0)
+
+        return results, errors, latency * 1000.0
+
+    def _frame_done(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None or future.result()[0] is None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def get_stats(self):
+        """
+        Get queue depth and latency statistics
+
+        Returns:
+            Dictionary of counters and average/max latencies in milliseconds
+        """
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_depth': self.pending,
+                'max_pending': self.max_pending,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'requests': self.request_stats.count,
+                'latency_ms': {
+                    'avg': self.request_stats.average_ms,
+                    'max': self.request_stats.max_time * 1000.0,
+                    'last': self.request_stats.last_time * 1000.0,
+                },
+                'queue_wait_ms': self.queue_stats.average_ms,
+                'decode_ms': self.decode_stats.average_ms,
+                'inference_ms': self.inference_stats.average_ms,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
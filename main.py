@@ -1,4 +1,6 @@
+import argparse
 import cv2
+import threading
 import time
 import os
 import sys
@@ -7,8 +9,296 @@ import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from pose_estimator import PoseEstimator
+from utils.frame_pipeline import LatestFrameQueue, StageStats, StageTimer
+from utils.metrics import MetricsRegistry
+from utils.motion_gate import MotionGate
 
-def main():
+WINDOW_NAME = 'Human Body Parts Recognition'
+
+
+def draw_overlay(frame, fps, display, pose_estimator, status_lines=()):
+    """
+    Draw FPS, display settings and detection counts onto the frame
+
+    Optional rows (people tracked, `status_lines` such as the pipeline's
+    stage times, the latency table) are stacked below the fixed HUD lines
+    so they never overlap.
+    """
+    cv2.putText(frame, f'FPS: {fps}', (10, 30),
+               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+    settings_text = f"Skeleton: {'ON' if display['skeleton'] else 'OFF'} | " \
+                   f"Points: {'ON' if display['points'] else 'OFF'} | " \
+                   f"Labels: {'ON' if display['labels'] else 'OFF'}"
+    cv2.putText(frame, settings_text, (10, 70),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+    # Display detected body parts count
+    body_parts_count = pose_estimator.get_detected_body_parts_count()
+    cv2.putText(frame, f'Body Parts Detected: {body_parts_count}', (10, 100),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+
+    # Display detected hands count
+    hands_count = pose_estimator.get_detected_hands_count()
+    hands_color = (0, 255, 0) if hands_count > 0 else (100, 100, 100)
+    cv2.putText(frame, f'Hands Detected: {hands_count}', (10, 130),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, hands_color, 2)
+
+    y = 160
+    if pose_estimator.people is not None:
+        cv2.putText(frame, f'People Tracked: {len(pose_estimator.people.tracks)}', (10, y),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 200, 255), 2)
+        y += 30
+
+    for line in status_lines:
+        cv2.putText(frame, line, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 200, 255), 2)
+        y += 30
+
+    gate = pose_estimator.motion_gate
+    if gate is not None:
+        gate_color = (0, 255, 0) if gate.state == gate.ACTIVE else (100, 100, 100)
+        cv2.putText(frame, f'Motion Gate: {gate.state.upper()} (motion {gate.motion * 100:.1f}%)',
+                   (10, frame.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, gate_color, 2)
+
+    if display.get('metrics') and pose_estimator.metrics is not None:
+        draw_metrics_overlay(frame, pose_estimator.metrics, top=y)
+
+
+def draw_metrics_overlay(frame, metrics, top=160):
+    """Draw p50 / p95 / p99 latency of every recorded stage"""
+    cv2.putText(frame, f"Stage ms ({metrics.sample_rate * 100:.0f}% sampled)   p50    p95    p99",
+               (10, top), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 200, 255), 1)
+    for row, (stage, histogram) in enumerate(metrics.stage_histograms().items(), start=1):
+        p50, p95, p99 = (histogram.quantile(q) * 1000.0 for q in (0.50, 0.95, 0.99))
+        cv2.putText(frame, f"{stage:<10} {p50:6.1f} {p95:6.1f} {p99:6.1f}",
+                   (10, top + row * 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 200, 255), 1)
+
+
+def print_metrics_summary(metrics):
+    print("[INFO] Stage latency histograms (ms):")
+    for stage, histogram in metrics.stage_histograms().items():
+        print(f"  {stage:<10} n={histogram.count:<6} p50 {histogram.quantile(0.50) * 1000:6.1f}  "
+              f"p95 {histogram.quantile(0.95) * 1000:6.1f}  p99 {histogram.quantile(0.99) * 1000:6.1f}")
+
+
+def handle_key(key, display):
+    """
+    Apply a key press to the display settings
+
+    Returns:
+        False when the user asked to quit, True otherwise
+    """
+    if key == ord('q'):
+        return False
+    elif key == ord('s'):
+        display['skeleton'] = not display['skeleton']
+        print(f"[SETTING] Skeleton display: {'ON' if display['skeleton'] else 'OFF'}")
+    elif key == ord('p'):
+        display['points'] = not display['points']
+        print(f"[SETTING] Points display: {'ON' if display['points'] else 'OFF'}")
+    elif key == ord('l'):
+        display['labels'] = not display['labels']
+        print(f"[SETTING] Labels display: {'ON' if display['labels'] else 'OFF'}")
+    elif key == ord('m'):
+        display['metrics'] = not display['metrics']
+        print(f"[SETTING] Metrics overlay: {'ON' if display['metrics'] else 'OFF'}")
+    return True
+
+
+def run_sequential(cap, pose_estimator, display):
+    """Capture, detect and display each frame one after another on this thread"""
+    # FPS calculation
+    fps_start_time = time.time()
+    fps_frame_count = 0
+    fps = 0
+
+    # Frame error counter for retry logic
+    frame_error_count = 0
+    max_frame_errors = 10
+
+    # Capture into the same buffer every frame and draw on it in place
+    frame = None
+    metrics = pose_estimator.metrics
+
+    while True:
+        sampled = metrics is not None and metrics.sample()
+        stage_start = time.perf_counter()
+        ret, frame = cap.read(frame)
+        if sampled:
+            metrics.observe_stage('capture', time.perf_counter() - stage_start)
+        if not ret or frame is None:
+            frame = None
+            frame_error_count += 1
+            if frame_error_count >= max_frame_errors:
+                print("[ERROR] Too many failed frame captures. Exiting...")
+                break
+            continue
+        
+        # Reset error counter on successful frame
+        frame_error_count = 0
+
+        # Process frame for pose estimation; the mirror flip is folded into
+        # the colour conversion and the overlay is drawn on the capture buffer
+        try:
+            processed_frame = pose_estimator.detect_pose(
+                frame,
+                draw_skeleton=display['skeleton'],
+                draw_points=display['points'],
+                draw_labels=display['labels'],
+                mirror=True,
+                in_place=True
+            )
+        except Exception as e:
+            print(f"[ERROR] Error during pose detection: {e}")
+            processed_frame = frame
+
+        # Calculate FPS
+        fps_frame_count += 1
+        if time.time() - fps_start_time >= 1.0:
+            fps = fps_frame_count
+            fps_frame_count = 0
+            fps_start_time = time.time()
+
+        # Display FPS and settings
+        draw_overlay(processed_frame, fps, display, pose_estimator)
+
+        # Display the frame
+        stage_start = time.perf_counter()
+        cv2.imshow(WINDOW_NAME, processed_frame)
+        if sampled:
+            metrics.observe_stage('display', time.perf_counter() - stage_start)
+
+        # Handle key presses
+        key = cv2.waitKey(1) & 0xFF
+        if not handle_key(key, display):
+            break
+
+
+def run_pipelined(cap, pose_estimator, display, queue_size=1):
+    """
+    Run capture, inference and overlay/display as separate stages
+
+    Capture and inference each get their own thread; overlay and display
+    stay on the main thread because OpenCV's HighGUI is not thread-safe.
+    Stages are joined by LatestFrameQueues that drop the oldest frame, so
+    throughput is bounded by the slowest stage instead of the sum of all.
+    """
+    capture_queue = LatestFrameQueue(queue_size)
+    result_queue = LatestFrameQueue(queue_size)
+    stop_event = threading.Event()
+
+    capture_stats = StageStats("capture")
+    inference_stats = StageStats("inference")
+    display_stats = StageStats("overlay/display")
+
+    metrics = pose_estimator.metrics
+
+    def capture_stage():
+        frame_error_count = 0
+        max_frame_errors = 10
+        while not stop_event.is_set():
+            with StageTimer(capture_stats):
+                ret, frame = cap.read()
+                if ret and frame is not None:
+                    # Mirror in place; the frame is owned by this pipeline
+                    cv2.flip(frame, 1, dst=frame)
+            if metrics is not None and metrics.sample():
+                metrics.observe_stage('capture', capture_stats.last_time)
+            if not ret or frame is None:
+                frame_error_count += 1
+                if frame_error_count >= max_frame_errors:
+                    print("[ERROR] Too many failed frame captures. Exiting...")
+                    break
+                continue
+            frame_error_count = 0
+            capture_queue.put(frame)
+        stop_event.set()
+        capture_queue.close()
+
+    def inference_stage():
+        while not stop_event.is_set():
+            frame = capture_queue.get(timeout=0.1)
+            if frame is None:
+                if capture_queue.closed:
+                    break
+                continue
+            try:
+                with StageTimer(inference_stats):
+                    result = pose_estimator.infer(frame)
+            except Exception as e:
+                print(f"[ERROR] Error during pose detection: {e}")
+                result = None
+            result_queue.put((frame, result))
+        result_queue.close()
+
+    threads = [
+        threading.Thread(target=capture_stage, name="capture", daemon=True),
+        threading.Thread(target=inference_stage, name="inference", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    fps_start_time = time.time()
+    fps_frame_count = 0
+    fps = 0
+
+    while not stop_event.is_set():
+        item = result_queue.get(timeout=0.1)
+        if item is None:
+            if result_queue.closed:
+                break
+            continue
+
+        frame, result = item
+        with StageTimer(display_stats):
+            if result is not None:
+                frame = pose_estimator.render(
+                    frame,
+                    result,
+                    draw_skeleton=display['skeleton'],
+                    draw_points=display['points'],
+                    draw_labels=display['labels']
+                )
+
+            fps_frame_count += 1
+            if time.time() - fps_start_time >= 1.0:
+                fps = fps_frame_count
+                fps_frame_count = 0
+                fps_start_time = time.time()
+
+            stage_text = f"Stage ms - cap: {capture_stats.last_time * 1000:.0f} | " \
+                         f"infer: {inference_stats.last_time * 1000:.0f} | " \
+                         f"draw: {display_stats.last_time * 1000:.0f} | " \
+                         f"dropped: {capture_queue.dropped + result_queue.dropped}"
+            draw_overlay(frame, fps, display, pose_estimator, status_lines=(stage_text,))
+
+            stage_start = time.perf_counter()
+            cv2.imshow(WINDOW_NAME, frame)
+            if metrics is not None and metrics.sample():
+                metrics.observe_stage('display', time.perf_counter() - stage_start)
+
+        key = cv2.waitKey(1) & 0xFF
+        if not handle_key(key, display):
+            break
+
+    stop_event.set()
+    capture_queue.close()
+    for thread in threads:
+        thread.join(timeout=2.0)
+
+    print("[INFO] Pipeline stage latency:")
+    for stats in (capture_stats, inference_stats, display_stats):
+        print(f"  {stats.summary()}")
+    print(f"[INFO] Dropped frames - capture->inference: {capture_queue.dropped}, "
+          f"inference->display: {result_queue.dropped}")
+
+
+def main(pipelined=False, queue_size=1, concurrent_inference=False, hand_roi_tracking=False,
+         target_fps=None, skip_quality=0.5, inference_long_side=None, auto_resolution=False,
+         latency_budget_ms=33.0, record_path=None, landmark_filter=None,
+         show_metrics=False, metrics_sample_rate=None, multi_person=False, max_people=4,
+         person_crops=2, person_budget_ms=None, motion_gate=False, idle_after=3.0,
+         probe_interval=2.0):
     print("Human Body Parts Recognition System")
     print("=" * 50)
     print("Press 'q' to quit")
@@ -16,6 +306,14 @@ def main():
     print("Press 'p' to toggle points display")
     print("Press 'l' to toggle labels display")
 
+    # Stage timing is opt-in: without --metrics or an explicit sample rate no
+    # registry is built and the frame loop does not time anything
+    if metrics_sample_rate is None:
+        metrics_sample_rate = 1.0 if show_metrics else 0.0
+    metrics = MetricsRegistry(sample_rate=metrics_sample_rate) if metrics_sample_rate > 0 else None
+    if metrics is not None:
+        print("Press 'm' to toggle the stage latency overlay")
+
     try:
         # Initialize pose estimator
         pose_estimator = PoseEstimator(
@@ -25,7 +323,22 @@ def main():
             enable_segmentation=False,
             smooth_segmentation=True,
             min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+            min_tracking_confidence=0.5,
+            concurrent_inference=concurrent_inference,
+            hand_roi_tracking=hand_roi_tracking,
+            target_fps=target_fps,
+            skip_quality=skip_quality,
+            inference_long_side=inference_long_side,
+            auto_resolution=auto_resolution,
+            latency_budget_ms=latency_budget_ms,
+            landmark_filter=landmark_filter,
+            metrics=metrics,
+            multi_person=multi_person,
+            max_people=max_people,
+            person_crops=person_crops,
+            person_budget_ms=person_budget_ms,
+            motion_gate=MotionGate(idle_after=idle_after, probe_interval=probe_interval)
+            if motion_gate else None
         )
     except Exception as e:
         print(f"Error initializing pose estimator: {e}")
@@ -33,6 +346,10 @@ def main():
         print("Run: python install_dependencies.py")
         return
 
+    # Load the models while the webcam is being opened
+    warmup_thread = threading.Thread(target=pose_estimator.warmup, name="model-warmup", daemon=True)
+    warmup_thread.start()
+
     # Initialize webcam with retry logic
     print("Initializing webcam...")
     cap = None
@@ -71,99 +388,102 @@ def main():
     # Set camera resolution
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+    warmup_thread.join()
 
     # Display settings
-    show_skeleton = True
-    show_points = True
-    show_labels = True
-
-    # FPS calculation
-    fps_start_time = time.time()
-    fps_frame_count = 0
-    fps = 0
+    display = {'skeleton': True, 'points': True, 'labels': True, 'metrics': show_metrics}
 
-    # Frame error counter for retry logic
-    frame_error_count = 0
-    max_frame_errors = 10
+    if record_path:
+        pose_estimator.start_recording(record_path, fps=cap.get(cv2.CAP_PROP_FPS) or 30.0)
 
     print("Starting pose estimation...")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret or frame is None:
-            frame_error_count += 1
-            if frame_error_count >= max_frame_errors:
-                print("[ERROR] Too many failed frame captures. Exiting...")
-                break
-            continue
-        
-        # Reset error counter on successful frame
-        frame_error_count = 0
-
-        # Flip frame horizontally for mirror effect
-        frame = cv2.flip(frame, 1)
-
-        # Process frame for pose estimation
-        try:
-            processed_frame = pose_estimator.detect_pose(
-                frame,
-                draw_skeleton=show_skeleton,
-                draw_points=show_points,
-                draw_labels=show_labels
-            )
-        except Exception as e:
-            print(f"[ERROR] Error during pose detection: {e}")
-            processed_frame = frame
+    if pipelined:
+        print(f"[INFO] Pipelined mode: capture / inference / display threads (queue size {queue_size})")
+        run_pipelined(cap, pose_estimator, display, queue_size=queue_size)
+    else:
+        run_sequential(cap, pose_estimator, display)
 
-        # Calculate FPS
-        fps_frame_count += 1
-        if time.time() - fps_start_time >= 1.0:
-            fps = fps_frame_count
-            fps_frame_count = 0
-            fps_start_time = time.time()
+    if hand_roi_tracking:
+        stats = pose_estimator.hand_roi_stats
+        print(f"[INFO] Hand ROI frames: {stats['roi']} cropped, {stats['skipped']} skipped, "
+              f"{stats['fallback']} full-frame fallback "
+              f"({pose_estimator.get_hand_roi_fallback_rate() * 100:.1f}%)")
 
-        # Display FPS and settings
-        cv2.putText(processed_frame, f'FPS: {fps}', (10, 30),
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-        settings_text = f"Skeleton: {'ON' if show_skeleton else 'OFF'} | " \
-                       f"Points: {'ON' if show_points else 'OFF'} | " \
-                       f"Labels: {'ON' if show_labels else 'OFF'}"
-        cv2.putText(processed_frame, settings_text, (10, 70),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-
-        # Display detected body parts count
-        body_parts_count = pose_estimator.get_detected_body_parts_count()
-        cv2.putText(processed_frame, f'Body Parts Detected: {body_parts_count}', (10, 100),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-
-        # Display detected hands count
-        hands_count = pose_estimator.get_detected_hands_count()
-        hands_color = (0, 255, 0) if hands_count > 0 else (100, 100, 100)
-        cv2.putText(processed_frame, f'Hands Detected: {hands_count}', (10, 130),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, hands_color, 2)
+    if pose_estimator.scheduler is not None:
+        stats = pose_estimator.scheduler.get_stats()
+        print(f"[INFO] Frame scheduler: {stats['inferred']} inferred, "
+              f"{stats['synthesized']} synthesized (interval {stats['interval']}, "
+              f"inference {stats['latency_ms']:.1f} ms)")
 
-        # Display the frame
-        cv2.imshow('Human Body Parts Recognition', processed_frame)
+    if pose_estimator.motion_gate is not None:
+        stats = pose_estimator.motion_gate.get_stats()
+        wake = "no wake-ups" if stats['wake_ms_mean'] is None else \
+            f"wake-up {stats['wake_ms_mean']:.0f} ms mean, {stats['wake_ms_max']:.0f} ms max"
+        print(f"[INFO] Motion gate: {stats['inferred']} inferred, {stats['reused']} reused, "
+              f"{stats['idle_frames']} idle frames, {stats['probes']} probes, "
+              f"{stats['wakes']} wakes ({wake})")
 
-        # Handle key presses
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('s'):
-            show_skeleton = not show_skeleton
-            print(f"[SETTING] Skeleton display: {'ON' if show_skeleton else 'OFF'}")
-        elif key == ord('p'):
-            show_points = not show_points
-            print(f"[SETTING] Points display: {'ON' if show_points else 'OFF'}")
-        elif key == ord('l'):
-            show_labels = not show_labels
-            print(f"[SETTING] Labels display: {'ON' if show_labels else 'OFF'}")
+    if pose_estimator.metrics is not None:
+        print_metrics_summary(pose_estimator.metrics)
 
     # Cleanup
+    pose_estimator.stop_recording()
     cap.release()
     cv2.destroyAllWindows()
     print("System stopped successfully")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Human Body Parts Recognition System")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="run capture, inference and display as separate pipeline stages")
+    parser.add_argument("--queue-size", type=int, default=1,
+                        help="frames buffered between pipeline stages (oldest dropped when full)")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="run the pose and hands models in parallel for each frame")
+    parser.add_argument("--hand-roi", action="store_true",
+                        help="run hand detection only on wrist crops derived from the pose")
+    parser.add_argument("--target-fps", type=float, default=None,
+                        help="skip inference on some frames to hold this display frame rate")
+    parser.add_argument("--skip-quality", type=float, default=0.5,
+                        help="0.0 (skip aggressively) to 1.0 (always infer) when --target-fps is set")
+    parser.add_argument("--inference-size", type=int, default=None,
+                        help="downscale frames to this long side (px) before inference")
+    parser.add_argument("--auto-resolution", action="store_true",
+                        help="step the inference resolution to hold --latency-budget")
+    parser.add_argument("--latency-budget", type=float, default=33.0,
+                        help="inference latency budget in ms for --auto-resolution")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="record landmarks of the session to a .bvlm timeline file")
+    parser.add_argument("--smooth", choices=("one_euro", "kalman"), default=None,
+                        help="temporally filter pose and hand landmarks")
+    parser.add_argument("--metrics", action="store_true",
+                        help="show per-stage latency percentiles on screen (toggle with 'm')")
+    parser.add_argument("--metrics-sample-rate", type=float, default=None,
+                        help="fraction of frames whose stages are timed (default: all with "
+                             "--metrics, none without)")
+    parser.add_argument("--multi-person", action="store_true",
+                        help="track several people by running pose on scheduled person crops")
+    parser.add_argument("--max-people", type=int, default=4,
+                        help="most people tracked at once with --multi-person")
+    parser.add_argument("--person-crops", type=int, default=2,
+                        help="most person crops run through the pose model per frame")
+    parser.add_argument("--person-budget", type=float, default=None,
+                        help="per-frame pose budget in ms for person crops (lowers --person-crops)")
+    parser.add_argument("--motion-gate", action="store_true",
+                        help="reuse the last result while nothing moves, idle when nobody is seen")
+    parser.add_argument("--idle-after", type=float, default=3.0,
+                        help="seconds without a person before --motion-gate goes idle")
+    parser.add_argument("--idle-probe", type=float, default=2.0,
+                        help="seconds between inferences while idle and nothing moves")
+    args = parser.parse_args()
+    main(pipelined=args.pipelined, queue_size=args.queue_size,
+         concurrent_inference=args.concurrent, hand_roi_tracking=args.hand_roi,
+         target_fps=args.target_fps, skip_quality=args.skip_quality,
+         inference_long_side=args.inference_size, auto_resolution=args.auto_resolution,
+         latency_budget_ms=args.latency_budget, record_path=args.record,
+         landmark_filter=args.smooth, show_metrics=args.metrics,
+         metrics_sample_rate=args.metrics_sample_rate, multi_person=args.multi_person,
+         max_people=args.max_people, person_crops=args.person_crops,
+         person_budget_ms=args.person_budget, motion_gate=args.motion_gate,
+         idle_after=args.idle_after, probe_interval=args.idle_probe)
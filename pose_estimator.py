@@ -1,25 +1,75 @@
 import cv2
+import importlib.util
 import numpy as np
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    import mediapipe as mp
-    MEDIAPIPE_AVAILABLE = True
-except ImportError:
-    MEDIAPIPE_AVAILABLE = False
+# MediaPipe is only imported when the first graph is built (see load_mediapipe),
+# so importing this module stays cheap for callers that never run inference
+MEDIAPIPE_AVAILABLE = importlib.util.find_spec('mediapipe') is not None
+if not MEDIAPIPE_AVAILABLE:
     print("[ERROR] MediaPipe not available. Please install it using: pip install mediapipe")
 
 try:
-    from utils.drawing_utils import draw_pose_landmarks
+    from utils.drawing_utils import draw_pose_array
+    from utils.hand_roi import (HandResults, build_hand_mosaic, hand_rois_from_pose,
+                                map_hand_results_to_frame)
+    from utils.frame_scheduler import AdaptiveFrameScheduler
+    from utils.inference_resolution import ResolutionController
+    from utils.frame_buffers import FrameBufferPool
+    from utils.landmark_arrays import PoseResult, hand_landmarks_to_array, pose_landmarks_to_array
+    from utils.landmark_renderer import LandmarkRenderer, HAND_LABEL_STYLE
+    from utils.landmark_timeline import TimelineWriter
+    from utils.landmark_filters import LandmarkSmoother
+    from utils.multi_person import MultiPersonTracker
+    from utils.motion_gate import MotionGate
     DRAWING_UTILS_AVAILABLE = True
 except ImportError as e:
     DRAWING_UTILS_AVAILABLE = False
     print(f"[ERROR] Drawing utils not available: {e}")
 
+
+# Pose landmark names by index (MediaPipe's PoseLandmark order)
+POSE_LANDMARK_NAMES = (
+    "Nose", "Left Eye Inner", "Left Eye", "Left Eye Outer",
+    "Right Eye Inner", "Right Eye", "Right Eye Outer", "Left Ear", "Right Ear",
+    "Mouth Left", "Mouth Right", "Left Shoulder", "Right Shoulder",
+    "Left Elbow", "Right Elbow", "Left Wrist", "Right Wrist",
+    "Left Pinky", "Right Pinky", "Left Index", "Right Index",
+    "Left Thumb", "Right Thumb", "Left Hip", "Right Hip",
+    "Left Knee", "Right Knee", "Left Ankle", "Right Ankle",
+    "Left Heel", "Right Heel", "Left Foot", "Right Foot"
+)
+
+# Box colours (BGR) of multi-person ids
+PERSON_COLORS = ((0, 200, 255), (255, 160, 0), (120, 255, 120), (255, 80, 200),
+                 (80, 80, 255), (255, 255, 80))
+
+
+def load_mediapipe():
+    """
+    Import MediaPipe's solutions package (the slow part of startup)
+
+    Returns:
+        The mediapipe.solutions module
+    """
+    import mediapipe as mp
+    return mp.solutions
+
+
+def _timed(fn, *args):
+    """Call fn(*args) and return (result, elapsed milliseconds)"""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000.0
+
+
 class PoseEstimator:
     def __init__(self,
                  static_image_mode=False,
@@ -28,7 +78,22 @@ class PoseEstimator:
                  enable_segmentation=False,
                  smooth_segmentation=True,
                  min_detection_confidence=0.5,
-                 min_tracking_confidence=0.5):
+                 min_tracking_confidence=0.5,
+                 concurrent_inference=False,
+                 hand_roi_tracking=False,
+                 hand_roi_size=256,
+                 target_fps=None,
+                 skip_quality=0.5,
+                 inference_long_side=None,
+                 auto_resolution=False,
+                 latency_budget_ms=33.0,
+                 landmark_filter=None,
+                 metrics=None,
+                 multi_person=False,
+                 max_people=4,
+                 person_crops=2,
+                 person_budget_ms=None,
+                 motion_gate=None):
 
         if not MEDIAPIPE_AVAILABLE:
             raise ImportError("MediaPipe is not installed. Please run: pip install mediapipe")
@@ -36,22 +101,15 @@ class PoseEstimator:
         if not DRAWING_UTILS_AVAILABLE:
             raise ImportError("Drawing utilities are not available")
 
-        # Initialize MediaPipe Pose
-        self.mp_pose = mp.solutions.pose
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
-
-        # Initialize MediaPipe Hands for detailed hand detection
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        # MediaPipe graphs are built on first use (or by warmup()), so
+        # constructing an estimator does not pay for models it never runs
+        self._hands_options = dict(
             static_image_mode=static_image_mode,
             max_num_hands=2,
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence
         )
-
-        # Initialize Pose model
-        self.pose = self.mp_pose.Pose(
+        self._pose_options = dict(
             static_image_mode=static_image_mode,
             model_complexity=model_complexity,
             smooth_landmarks=smooth_landmarks,
@@ -60,43 +118,21 @@ class PoseEstimator:
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence
         )
+        # Multi-person mode runs one Pose graph over many person crops, so it
+        # cannot carry tracking state between frames (static image mode)
+        self._person_pose_options = dict(
+            static_image_mode=True,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence
+        )
+        self._pose = None
+        self._hands = None
+        self._person_pose = None
+        self._graph_lock = threading.Lock()
+        self.startup_timings = {}
 
         # Body parts mapping for Pose
-        self.body_parts = {
-            self.mp_pose.PoseLandmark.NOSE: "Nose",
-            self.mp_pose.PoseLandmark.LEFT_EYE_INNER: "Left Eye Inner",
-            self.mp_pose.PoseLandmark.LEFT_EYE: "Left Eye",
-            self.mp_pose.PoseLandmark.LEFT_EYE_OUTER: "Left Eye Outer",
-            self.mp_pose.PoseLandmark.RIGHT_EYE_INNER: "Right Eye Inner",
-            self.mp_pose.PoseLandmark.RIGHT_EYE: "Right Eye",
-            self.mp_pose.PoseLandmark.RIGHT_EYE_OUTER: "Right Eye Outer",
-            self.mp_pose.PoseLandmark.LEFT_EAR: "Left Ear",
-            self.mp_pose.PoseLandmark.RIGHT_EAR: "Right Ear",
-            self.mp_pose.PoseLandmark.MOUTH_LEFT: "Mouth Left",
-            self.mp_pose.PoseLandmark.MOUTH_RIGHT: "Mouth Right",
-            self.mp_pose.PoseLandmark.LEFT_SHOULDER: "Left Shoulder",
-            self.mp_pose.PoseLandmark.RIGHT_SHOULDER: "Right Shoulder",
-            self.mp_pose.PoseLandmark.LEFT_ELBOW: "Left Elbow",
-            self.mp_pose.PoseLandmark.RIGHT_ELBOW: "Right Elbow",
-            self.mp_pose.PoseLandmark.LEFT_WRIST: "Left Wrist",
-            self.mp_pose.PoseLandmark.RIGHT_WRIST: "Right Wrist",
-            self.mp_pose.PoseLandmark.LEFT_PINKY: "Left Pinky",
-            self.mp_pose.PoseLandmark.RIGHT_PINKY: "Right Pinky",
-            self.mp_pose.PoseLandmark.LEFT_INDEX: "Left Index",
-            self.mp_pose.PoseLandmark.RIGHT_INDEX: "Right Index",
-            self.mp_pose.PoseLandmark.LEFT_THUMB: "Left Thumb",
-            self.mp_pose.PoseLandmark.RIGHT_THUMB: "Right Thumb",
-            self.mp_pose.PoseLandmark.LEFT_HIP: "Left Hip",
-            self.mp_pose.PoseLandmark.RIGHT_HIP: "Right Hip",
-            self.mp_pose.PoseLandmark.LEFT_KNEE: "Left Knee",
-            self.mp_pose.PoseLandmark.RIGHT_KNEE: "Right Knee",
-            self.mp_pose.PoseLandmark.LEFT_ANKLE: "Left Ankle",
-            self.mp_pose.PoseLandmark.RIGHT_ANKLE: "Right Ankle",
-            self.mp_pose.PoseLandmark.LEFT_HEEL: "Left Heel",
-            self.mp_pose.PoseLandmark.RIGHT_HEEL: "Right Heel",
-            self.mp_pose.PoseLandmark.LEFT_FOOT_INDEX: "Left Foot",
-            self.mp_pose.PoseLandmark.RIGHT_FOOT_INDEX: "Right Foot"
-        }
+        self.body_parts = dict(enumerate(POSE_LANDMARK_NAMES))
 
         # Hand landmarks mapping (21 points per hand)
         self.hand_landmarks = {
@@ -125,12 +161,215 @@ class PoseEstimator:
 
         self.detected_hands_count = 0
 
+        # Persistent worker that runs the Hands graph while the calling
+        # thread runs the Pose graph (MediaPipe releases the GIL while a
+        # graph runs, so the two models overlap on multi-core machines)
+        self._executor = None
+        if concurrent_inference:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hands-inference")
+
+        # Pose-guided hand ROI tracking: run Hands on a small two-tile mosaic
+        # of wrist crops instead of the full frame whenever pose is available
+        self.hand_roi_tracking = hand_roi_tracking
+        self._hand_mosaic = np.zeros((hand_roi_size, hand_roi_size * 2, 3), dtype=np.uint8)
+        self._last_pose_landmarks = None
+        self.hand_roi_stats = {'frames': 0, 'roi': 0, 'fallback': 0, 'skipped': 0}
+
+        # Adaptive frame skipping: only run the models every N frames and
+        # extrapolate landmarks in between to hold the target frame rate
+        self.scheduler = None
+        if target_fps:
+            self.scheduler = AdaptiveFrameScheduler(target_fps=target_fps, quality=skip_quality)
+
+        # Inference resolution: frames are downscaled once before colour
+        # conversion and inference; landmarks stay normalized so they are
+        # drawn on the original full-resolution frame
+        self.resolution = None
+        if inference_long_side or auto_resolution:
+            self.resolution = ResolutionController(
+                long_side=inference_long_side,
+                auto=auto_resolution,
+                latency_budget_ms=latency_budget_ms
+            )
+
+        # Temporal smoothing of pose and hand landmarks: 'one_euro', 'kalman'
+        # or a LandmarkSmoother instance. Skipped frames are extrapolated
+        # from already smoothed results
+        self.smoother = None
+        if isinstance(landmark_filter, LandmarkSmoother):
+            self.smoother = landmark_filter
+        elif landmark_filter:
+            self.smoother = LandmarkSmoother(landmark_filter)
+
+        # Multi-person mode: person proposals and a budgeted crop scheduler
+        # replace the single full-frame Pose graph (see utils/multi_person.py)
+        self.people = None
+        if multi_person:
+            self.people = MultiPersonTracker(max_people=max_people, max_crops=person_crops,
+                                             budget_ms=person_budget_ms)
+
+        # Motion gating: True or a MotionGate instance. Frames where nothing
+        # moved reuse the last result, and with nobody in view the models
+        # only run on motion or a low-rate idle probe
+        self.motion_gate = None
+        if isinstance(motion_gate, MotionGate):
+            self.motion_gate = motion_gate
+        elif motion_gate:
+            self.motion_gate = MotionGate()
+
+        # Optional stage histograms (utils/metrics.py MetricsRegistry); each
+        # frame is timed only when the registry samples it
+        self.metrics = metrics
+
+        # Reused RGB conversion and output buffers (no per-frame allocations)
+        self.frame_buffers = FrameBufferPool()
+
+        # Vectorized hand renderers, one per handedness (label sprites are cached)
+        self._hand_renderers = {}
+
+        # Optional landmark timeline recording (see start_recording)
+        self.recorder = None
+        self._recording_start = None
+        self._recorded_frames = 0
+
         print("[OK] Pose Estimator initialized with Hand Detection")
         print(f"[INFO] Model Complexity: {model_complexity}")
         print(f"[INFO] Detection Confidence: {min_detection_confidence}")
         print("[INFO] Hand Detection: ENABLED (21 landmarks per hand)")
+        if concurrent_inference:
+            print("[INFO] Concurrent Inference: ENABLED (pose and hands run in parallel)")
+        if hand_roi_tracking:
+            print(f"[INFO] Hand ROI Tracking: ENABLED ({hand_roi_size}px tiles)")
+        if target_fps:
+            print(f"[INFO] Adaptive Frame Skipping: target {target_fps} FPS, quality {skip_quality}")
+        if self.resolution is not None:
+            mode = f"auto, {latency_budget_ms:.0f} ms budget" if auto_resolution else "fixed"
+            print(f"[INFO] Inference Resolution: {self.resolution.long_side} px long side ({mode})")
+        if self.smoother is not None:
+            print(f"[INFO] Landmark Smoothing: {self.smoother.method} (pose and hands)")
+        if self.people is not None:
+            budget = f", {person_budget_ms:.0f} ms budget" if person_budget_ms else ""
+            print(f"[INFO] Multi-Person: up to {max_people} people, "
+                  f"{person_crops} crops per frame{budget}")
+            print("[INFO] Multi-Person: hands, frame skipping and smoothing are not applied")
+        if self.motion_gate is not None:
+            print(f"[INFO] Motion Gate: ENABLED (idle after {self.motion_gate.idle_after:.0f} s, "
+                  f"probe every {self.motion_gate.probe_interval:.0f} s)")
+
+    @property
+    def mp_pose(self):
+        """MediaPipe pose solution module (imports MediaPipe on first access)"""
+        return load_mediapipe().pose
+
+    @property
+    def mp_hands(self):
+        """MediaPipe hands solution module (imports MediaPipe on first access)"""
+        return load_mediapipe().hands
+
+    @property
+    def pose(self):
+        """The Pose graph, built on first use"""
+        if self._pose is None:
+            self._build_graph('pose')
+        return self._pose
+
+    @property
+    def hands(self):
+        """The Hands graph, built on first use"""
+        if self._hands is None:
+            self._build_graph('hands')
+        return self._hands
+
+    @property
+    def person_pose(self):
+        """The static-image Pose graph run on person crops, built on first use"""
+        if self._person_pose is None:
+            self._build_graph('person_pose')
+        return self._person_pose
+
+    def _build_graph(self, name):
+        # With concurrent inference the Hands graph is first used on the
+        # worker thread, so construction is serialized
+        with self._graph_lock:
+            if getattr(self, '_' + name) is not None:
+                return
+            start = time.perf_counter()
+            solutions = load_mediapipe()
+            import_ms = (time.perf_counter() - start) * 1000.0
+            if name == 'pose':
+                graph = solutions.pose.Pose(**self._pose_options)
+            elif name == 'person_pose':
+                graph = solutions.pose.Pose(**self._person_pose_options)
+            else:
+                graph = solutions.hands.Hands(**self._hands_options)
+            self.startup_timings.setdefault('import_ms', import_ms)
+            self.startup_timings[f'{name}_init_ms'] = (time.perf_counter() - start) * 1000.0 - import_ms
+            setattr(self, '_' + name, graph)
+
+    def warmup(self, frames=2, image_size=(640, 480)):
+        """
+        Build the graphs in use and run blank frames through them
 
-    def detect_pose(self, image, draw_skeleton=True, draw_points=True, draw_labels=True):
+        MediaPipe allocates its model buffers on the first processed
+        frame, so a warmed estimator answers its first real frame at the
+        steady-state latency. Tracking, frame skipping, smoothing and
+        recording state are left untouched.
+
+        Args:
+            frames: Number of blank frames to run
+            image_size: (width, height) of the blank frames
+
+        Returns:
+            Warmup time in milliseconds
+        """
+        start = time.perf_counter()
+        width, height = image_size
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        last_pose_landmarks = self._last_pose_landmarks
+        for _ in range(frames):
+            image_rgb = self._prepare_rgb(frame)
+            if self.people is not None:
+                self.person_pose.process(image_rgb)
+                continue
+            # Straight to the graphs: ROI tracking would skip Hands on blank frames
+            self.pose.process(image_rgb)
+            self.hands.process(image_rgb)
+        self._last_pose_landmarks = last_pose_landmarks
+        warmup_ms = (time.perf_counter() - start) * 1000.0
+        self.startup_timings['warmup_ms'] = warmup_ms
+        print(f"[OK] Pose Estimator warmed up in {warmup_ms:.0f} ms")
+        return warmup_ms
+
+    def reset(self):
+        """
+        Drop all state carried over from previous frames
+
+        Call this before feeding frames from an unrelated video or segment.
+        The tracking-mode graphs are closed and rebuilt on next use
+        (MediaPipe keeps the last pose and hands to track from), and the
+        hand ROI, frame skipping, smoothing, multi-person and motion gate
+        state starts fresh. Resolution control and metrics are kept.
+        """
+        with self._graph_lock:
+            for name in ('_pose', '_hands'):
+                graph = getattr(self, name)
+                if graph is not None:
+                    graph.close()
+                    setattr(self, name, None)
+        self._last_pose_landmarks = None
+        if self.scheduler is not None:
+            self.scheduler = AdaptiveFrameScheduler(target_fps=self.scheduler.target_fps,
+                                                    quality=self.scheduler.quality,
+                                                    max_interval=self.scheduler.max_interval)
+        if self.smoother is not None:
+            self.smoother.reset()
+        if self.people is not None:
+            self.people.reset()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    def detect_pose(self, image, draw_skeleton=True, draw_points=True, draw_labels=True,
+                    mirror=False, in_place=False):
         """
         Detect human pose and hands in the given image
 
@@ -139,30 +378,141 @@ class PoseEstimator:
             draw_skeleton: Whether to draw skeleton connections
             draw_points: Whether to draw landmark points
             draw_labels: Whether to draw body part labels
+            mirror: Flip the frame horizontally (selfie view) as part of the
+                colour conversion instead of a separate cv2.flip copy
+            in_place: Draw directly on `image` (flipping it in place when
+                mirroring) instead of on a pooled output buffer
+
+        Returns:
+            Processed image with pose and hand landmarks. Unless `in_place`
+            is set this is one of a small ring of reused buffers, so copy it
+            if it has to outlive the next few calls.
+        """
+        result = self.infer(image, mirror=mirror)
+
+        if in_place:
+            if mirror:
+                cv2.flip(image, 1, dst=image)
+            image_bgr = image
+        else:
+            image_bgr = self.frame_buffers.output_frame(image, mirror=mirror)
+
+        return self.render(
+            image_bgr,
+            result,
+            draw_skeleton=draw_skeleton,
+            draw_points=draw_points,
+            draw_labels=draw_labels
+        )
+
+    def infer(self, image, mirror=False):
+        """
+        Run pose and hand detection without drawing anything
+
+        Headless and server callers should use this instead of detect_pose
+        so they don't pay for the overlay and output copy. Rendering is a
+        separate, optional step (see render()).
+
+        Args:
+            image: Input image (BGR format)
+            mirror: Run detection on the horizontally flipped frame
 
         Returns:
-            Processed image with pose and hand landmarks
+            PoseResult with landmark arrays, handedness and per-stage timings
         """
-        # Convert BGR to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        image_rgb.flags.writeable = False
+        image_height, image_width = image.shape[:2]
 
-        # Process the image for pose
-        pose_results = self.pose.process(image_rgb)
-        
-        # Process the image for hands
-        hand_results = self.hands.process(image_rgb)
+        gated = False
+        if self.motion_gate is not None:
+            gate_start = time.perf_counter()
+            gated = not self.motion_gate.should_infer(image, gate_start)
+            if self.metrics is not None and self.metrics.sample():
+                self.metrics.observe_stage('gate', time.perf_counter() - gate_start)
+
+        if gated:
+            result = self.motion_gate.reuse()
+            if self.metrics is not None:
+                self.metrics.counter('frames_total', 'Frames processed', kind='reused').inc()
+        elif self.people is not None:
+            result = self._infer_people(image, mirror)
+        elif self._should_synthesize():
+            result = self.scheduler.synthesize()
+            if self.metrics is not None:
+                self.metrics.counter('frames_total', 'Frames processed',
+                                     kind='synthesized').inc()
+        else:
+            start_time = time.perf_counter()
+            image_rgb = self._prepare_rgb(image, mirror=mirror)
+            models_start = time.perf_counter()
+
+            pose_results, hand_results, timings = self._run_models(image_rgb)
+
+            models_end = time.perf_counter()
+            timings['convert_ms'] = (models_start - start_time) * 1000.0
+            timings['total_ms'] = (models_end - start_time) * 1000.0
+
+            result = PoseResult.from_mediapipe(
+                pose_results,
+                hand_results,
+                image_size=(image_width, image_height),
+                timestamp=start_time,
+                timings=timings
+            )
+            if self.smoother is not None:
+                smooth_start = time.perf_counter()
+                result = self.smoother.apply(result)
+                timings['smooth_ms'] = (time.perf_counter() - smooth_start) * 1000.0
+
+            if self.metrics is not None:
+                self.metrics.counter('frames_total', 'Frames processed', kind='inferred').inc()
+                if self.metrics.sample():
+                    self.metrics.observe_timings(timings)
+
+            latency = models_end - models_start
+            if self.scheduler is not None:
+                self.scheduler.record_inference(result, latency, start_time)
+            if self.resolution is not None:
+                self.resolution.record(latency)
+
+        if self.motion_gate is not None and not gated and not result.synthesized:
+            wake = self.motion_gate.record(result, result.timestamp)
+            if wake is not None and self.metrics is not None:
+                self.metrics.histogram('wake_seconds', 'Motion gate wake-up latency').observe(wake)
+
+        self.detected_hands_count = result.hands_count
+        if self.recorder is not None:
+            self._record(result)
+        return result
+
+    def render(self, image, result, draw_skeleton=True, draw_points=True, draw_labels=True):
+        """
+        Draw an inference result onto an image
+
+        Args:
+            image: Image to draw on (BGR format, modified in place)
+            result: PoseResult from infer()
+            draw_skeleton: Whether to draw skeleton connections
+            draw_points: Whether to draw landmark points
+            draw_labels: Whether to draw body part labels
+
+        Returns:
+            Image with pose and hand landmarks
+        """
+        sampled = self.metrics is not None and self.metrics.sample()
+        if sampled:
+            start = time.perf_counter()
 
-        # Convert back to BGR
-        image_rgb.flags.writeable = True
-        image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+        if result.people is not None:
+            for person in result.people:
+                image = self._draw_person(image, person, draw_skeleton=draw_skeleton,
+                                          draw_points=draw_points, draw_labels=draw_labels)
 
         # Draw pose landmarks if detected
-        if pose_results.pose_landmarks:
-            image_bgr = draw_pose_landmarks(
-                image_bgr,
-                pose_results.pose_landmarks,
-                self.mp_pose,
+        elif result.pose is not None:
+            image = draw_pose_array(
+                image,
+                result.pose,
+                self.mp_pose.POSE_CONNECTIONS,
                 self.body_parts,
                 draw_skeleton=draw_skeleton,
                 draw_points=draw_points,
@@ -170,26 +520,200 @@ class PoseEstimator:
             )
 
         # Draw hand landmarks if detected
-        if hand_results.multi_hand_landmarks:
-            self.detected_hands_count = len(hand_results.multi_hand_landmarks)
-            for hand_idx, hand_landmarks in enumerate(hand_results.multi_hand_landmarks):
-                # Get handedness (left or right)
-                handedness = "Hand"
-                if hand_results.multi_handedness:
-                    handedness = hand_results.multi_handedness[hand_idx].classification[0].label
-                
-                image_bgr = self.draw_hand_landmarks(
-                    image_bgr,
-                    hand_landmarks,
-                    handedness,
-                    draw_skeleton=draw_skeleton,
-                    draw_points=draw_points,
-                    draw_labels=draw_labels
-                )
+        for handedness, hand_landmarks in zip(result.handedness, result.hands):
+            image = self.draw_hand_landmarks(
+                image,
+                hand_landmarks,
+                handedness,
+                draw_skeleton=draw_skeleton,
+                draw_points=draw_points,
+                draw_labels=draw_labels
+            )
+
+        if sampled:
+            self.metrics.observe_stage('draw', time.perf_counter() - start)
+        return image
+
+    def _infer_people(self, image, mirror=False):
+        """Multi-person inference: pose on scheduled person crops"""
+        image_height, image_width = image.shape[:2]
+        start_time = time.perf_counter()
+        image_rgb = self._prepare_rgb(image, mirror=mirror)
+        models_start = time.perf_counter()
+
+        people, timings = self.people.process(image_rgb, self._crop_pose, start_time)
+
+        models_end = time.perf_counter()
+        timings['convert_ms'] = (models_start - start_time) * 1000.0
+        timings['total_ms'] = (models_end - start_time) * 1000.0
+        result = PoseResult(
+            pose=people[0].pose if people else None,
+            image_size=(image_width, image_height),
+            timestamp=start_time,
+            timings=timings,
+            people=people
+        )
+
+        if self.metrics is not None:
+            self.metrics.counter('frames_total', 'Frames processed', kind='inferred').inc()
+            if self.metrics.sample():
+                self.metrics.observe_timings(timings)
+        if self.resolution is not None:
+            self.resolution.record(models_end - models_start)
+        return result
+
+    def _crop_pose(self, crop_rgb):
+        """Pose landmarks of one person crop as a crop-normalized (33, 4) array"""
+        pose_results = self.person_pose.process(crop_rgb)
+        if not pose_results.pose_landmarks:
+            return None
+        return pose_landmarks_to_array(pose_results.pose_landmarks)
+
+    def _draw_person(self, image, person, draw_skeleton=True, draw_points=True, draw_labels=True):
+        """Draw one person of a multi-person result with an id box"""
+        image_height, image_width = image.shape[:2]
+        image = draw_pose_array(
+            image,
+            person.pose,
+            self.mp_pose.POSE_CONNECTIONS,
+            self.body_parts,
+            draw_skeleton=draw_skeleton,
+            draw_points=draw_points,
+            draw_labels=draw_labels
+        )
+        color = PERSON_COLORS[person.id % len(PERSON_COLORS)]
+        x0, y0, x1, y1 = (int(v * size) for v, size in
+                          zip(person.box, (image_width, image_height, image_width, image_height)))
+        cv2.rectangle(image, (x0, y0), (x1, y1), color, 2 if person.updated else 1)
+        cv2.putText(image, f"P{person.id}", (x0 + 4, max(y0 - 6, 14)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        return image
+
+    def _prepare_rgb(self, image, mirror=False):
+        """Downscale to the inference resolution (if set) and convert to RGB"""
+        if self.resolution is not None:
+            image = self.resolution.resize(image)
+        return self.frame_buffers.to_rgb(image, mirror=mirror)
+
+    def _should_synthesize(self):
+        """Whether the frame scheduler wants this frame skipped"""
+        return self.scheduler is not None and not self.scheduler.should_infer()
+
+    def _run_models(self, image_rgb):
+        """
+        Run the Pose and Hands graphs on an RGB frame
+
+        Returns:
+            Tuple of (pose_results, hand_results, timings) where timings
+            holds 'pose_ms' and 'hands_ms'
+        """
+        if self.hand_roi_tracking:
+            return self._run_models_with_hand_rois(image_rgb)
+
+        if self._executor is not None:
+            # Both graphs only read the frame, so they can share the buffer
+            hands_future = self._executor.submit(_timed, self.hands.process, image_rgb)
+            pose_results, pose_ms = _timed(self.pose.process, image_rgb)
+            hand_results, hands_ms = hands_future.result()
+        else:
+            # Process the image for pose
+            pose_results, pose_ms = _timed(self.pose.process, image_rgb)
+
+            # Process the image for hands
+            hand_results, hands_ms = _timed(self.hands.process, image_rgb)
+
+        return pose_results, hand_results, {'pose_ms': pose_ms, 'hands_ms': hands_ms}
+
+    def _run_models_with_hand_rois(self, image_rgb):
+        """
+        Run Pose on the full frame and Hands only on pose-derived wrist crops
+
+        With concurrent inference enabled the crops come from the previous
+        frame's pose so both graphs can still run in parallel; otherwise
+        they come from the current frame. Without any pose the Hands graph
+        falls back to the full frame, and when pose is present but neither
+        wrist is visible the Hands graph is skipped entirely.
+        """
+        image_height, image_width = image_rgb.shape[:2]
+        self.hand_roi_stats['frames'] += 1
+
+        def run_hands(pose_landmarks):
+            if pose_landmarks is None:
+                self.hand_roi_stats['fallback'] += 1
+                return self.hands.process(image_rgb)
+
+            rois = hand_rois_from_pose(pose_landmarks, image_width, image_height)
+            if rois[0] is None and rois[1] is None:
+                self.hand_roi_stats['skipped'] += 1
+                return HandResults(None, None)
+
+            self.hand_roi_stats['roi'] += 1
+            mosaic = build_hand_mosaic(image_rgb, rois, self._hand_mosaic)
+            return map_hand_results_to_frame(self.hands.process(mosaic), rois,
+                                             image_width, image_height)
+
+        if self._executor is not None:
+            hands_future = self._executor.submit(_timed, run_hands, self._last_pose_landmarks)
+            pose_results, pose_ms = _timed(self.pose.process, image_rgb)
+            hand_results, hands_ms = hands_future.result()
         else:
-            self.detected_hands_count = 0
+            pose_results, pose_ms = _timed(self.pose.process, image_rgb)
+            hand_results, hands_ms = _timed(run_hands, pose_results.pose_landmarks)
 
-        return image_bgr
+        self._last_pose_landmarks = pose_results.pose_landmarks
+        return pose_results, hand_results, {'pose_ms': pose_ms, 'hands_ms': hands_ms}
+
+    def start_recording(self, path, fps=0.0):
+        """
+        Stream every infer() result into a landmark timeline file
+
+        Args:
+            path: Output file path (see utils/landmark_timeline.py)
+            fps: Nominal frame rate stored in the file header
+
+        Returns:
+            The TimelineWriter being recorded into
+        """
+        self.stop_recording()
+        self.recorder = TimelineWriter(path, fps=fps)
+        self._recording_start = None
+        self._recorded_frames = 0
+        print(f"[INFO] Recording landmarks to {path}")
+        return self.recorder
+
+    def stop_recording(self):
+        """
+        Finish the current recording, if any
+
+        Returns:
+            Number of frames recorded
+        """
+        if self.recorder is None:
+            return 0
+        self.recorder.close()
+        print(f"[OK] Recorded {self._recorded_frames} frames to {self.recorder.path}")
+        self.recorder = None
+        return self._recorded_frames
+
+    def _record(self, result):
+        # Timestamps are stored relative to the first recorded frame
+        if self._recording_start is None:
+            self._recording_start = result.timestamp
+        self.recorder.append_result(result, timestamp=result.timestamp - self._recording_start,
+                                    frame_index=self._recorded_frames)
+        self._recorded_frames += 1
+
+    def get_hand_roi_fallback_rate(self):
+        """
+        Get the fraction of frames where hand ROI tracking needed a full-frame pass
+
+        Returns:
+            Fallback rate between 0.0 and 1.0 (0.0 before any frame is processed)
+        """
+        frames = self.hand_roi_stats['frames']
+        if frames == 0:
+            return 0.0
+        return self.hand_roi_stats['fallback'] / frames
 
     def draw_hand_landmarks(self, image, hand_landmarks, handedness, 
                            draw_skeleton=True, draw_points=True, draw_labels=True):
@@ -198,7 +722,7 @@ class PoseEstimator:
 
         Args:
             image: Input image
-            hand_landmarks: MediaPipe hand landmarks
+            hand_landmarks: MediaPipe hand landmarks, or a (21, 3) array
             handedness: "Left" or "Right" hand
             draw_skeleton: Whether to draw connections
             draw_points: Whether to draw points
@@ -207,72 +731,49 @@ class PoseEstimator:
         Returns:
             Image with drawn hand landmarks
         """
-        image_height, image_width = image.shape[:2]
+        if not isinstance(hand_landmarks, np.ndarray):
+            hand_landmarks = hand_landmarks_to_array(hand_landmarks)
+
+        renderer, labels = self._get_hand_renderer(handedness)
+        return renderer.render(
+            image,
+            hand_landmarks,
+            labels=labels,
+            draw_skeleton=draw_skeleton,
+            draw_points=draw_points,
+            draw_labels=draw_labels
+        )
 
-        # Define hand connections
-        HAND_CONNECTIONS = self.mp_hands.HAND_CONNECTIONS
+    def _get_hand_renderer(self, handedness):
+        """Get the cached renderer and fingertip labels for one handedness"""
+        cached = self._hand_renderers.get(handedness)
+        if cached is None:
+            # Colors for hands (different for left and right)
+            if handedness == "Left":
+                skeleton_color = (255, 100, 0)   # Blue-ish for left
+                point_color = (255, 50, 50)      # Blue points
+            else:
+                skeleton_color = (0, 100, 255)   # Orange-ish for right
+                point_color = (50, 50, 255)      # Red points
+
+            renderer = LandmarkRenderer(
+                self.mp_hands.HAND_CONNECTIONS,
+                skeleton_color=skeleton_color,
+                point_color=point_color,
+                point_radius=4,
+                point_outline_color=(255, 255, 255),  # White outline
+                label_style=HAND_LABEL_STYLE,
+                visibility_threshold=None
+            )
 
-        # Colors for hands (different for left and right)
-        if handedness == "Left":
-            SKELETON_COLOR = (255, 100, 0)   # Blue-ish for left
-            POINT_COLOR = (255, 50, 50)      # Blue points
-        else:
-            SKELETON_COLOR = (0, 100, 255)   # Orange-ish for right
-            POINT_COLOR = (50, 50, 255)      # Red points
-        
-        LABEL_COLOR = (255, 255, 255)  # White
-        LABEL_BG_COLOR = (50, 50, 50)  # Dark gray
-
-        # Draw skeleton connections
-        if draw_skeleton:
-            for connection in HAND_CONNECTIONS:
-                start_idx = connection[0]
-                end_idx = connection[1]
-
-                start_landmark = hand_landmarks.landmark[start_idx]
-                end_landmark = hand_landmarks.landmark[end_idx]
-
-                start_point = (
-                    int(start_landmark.x * image_width),
-                    int(start_landmark.y * image_height)
-                )
-                end_point = (
-                    int(end_landmark.x * image_width),
-                    int(end_landmark.y * image_height)
-                )
-
-                # Draw line
-                cv2.line(image, start_point, end_point, SKELETON_COLOR, 2)
-
-        # Draw landmark points and labels
-        if draw_points or draw_labels:
-            for landmark_id, landmark in enumerate(hand_landmarks.landmark):
-                x = int(landmark.x * image_width)
-                y = int(landmark.y * image_height)
-
-                # Draw point
-                if draw_points:
-                    cv2.circle(image, (x, y), 4, POINT_COLOR, -1)
-                    cv2.circle(image, (x, y), 4, (255, 255, 255), 1)  # White outline
-
-                # Draw label for fingertips only (to avoid clutter)
-                if draw_labels and landmark_id in [4, 8, 12, 16, 20]:  # Fingertips
-                    label = f"{handedness[0]}-{self.hand_landmarks[landmark_id]}"
-                    
-                    # Get text size for background
-                    text_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
-
-                    # Draw background rectangle
-                    cv2.rectangle(image,
-                                (x - 2, y - text_size[1] - 8),
-                                (x + text_size[0] + 2, y - 3),
-                                LABEL_BG_COLOR, -1)
-
-                    # Draw text
-                    cv2.putText(image, label, (x, y - 5),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.4, LABEL_COLOR, 1)
-
-        return image
+            # Label fingertips only (to avoid clutter)
+            labels = {
+                landmark_id: f"{handedness[0]}-{self.hand_landmarks[landmark_id]}"
+                for landmark_id in (4, 8, 12, 16, 20)
+            }
+            cached = (renderer, labels)
+            self._hand_renderers[handedness] = cached
+        return cached
 
     def get_detected_body_parts_count(self):
         """
@@ -297,33 +798,45 @@ class PoseEstimator:
         Extract landmark coordinates from results
 
         Args:
-            results: MediaPipe pose results
+            results: PoseResult from infer(), or MediaPipe pose results
             image_shape: Shape of the image (height, width)
 
         Returns:
             Dictionary of body part names and their coordinates
         """
-        if not results.pose_landmarks:
+        if isinstance(results, PoseResult):
+            pose = results.pose
+        elif results.pose_landmarks:
+            pose = pose_landmarks_to_array(results.pose_landmarks)
+        else:
+            pose = None
+
+        if pose is None:
             return {}
 
-        landmarks = {}
         image_height, image_width = image_shape[:2]
-
-        for landmark_id, landmark_name in self.body_parts.items():
-            landmark = results.pose_landmarks.landmark[landmark_id]
-            if landmark.visibility > 0.5:  # Only consider visible landmarks
-                x = int(landmark.x * image_width)
-                y = int(landmark.y * image_height)
-                landmarks[landmark_name] = (x, y)
-
-        return landmarks
+        scale = np.array((image_width, image_height), dtype=np.float64)
+        points = (pose[:, :2] * scale).astype(np.int32).tolist()
+        visible = (pose[:, 3] > 0.5).tolist()  # Only consider visible landmarks
+
+        return {
+            landmark_name: tuple(points[landmark_id])
+            for landmark_id, landmark_name in self.body_parts.items()
+            if visible[landmark_id]
+        }
 
     def __del__(self):
         """Cleanup when object is destroyed"""
-        if hasattr(self, 'pose'):
-            self.pose.close()
-        if hasattr(self, 'hands'):
-            self.hands.close()
+        if getattr(self, 'recorder', None) is not None:
+            self.recorder.close()
+        if getattr(self, '_executor', None) is not None:
+            self._executor.shutdown(wait=True)
+        if getattr(self, '_pose', None) is not None:
+            self._pose.close()
+        if getattr(self, '_hands', None) is not None:
+            self._hands.close()
+        if getattr(self, '_person_pose', None) is not None:
+            self._person_pose.close()
 
 if __name__ == "__main__":
     # Test the pose estimator
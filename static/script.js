@@ -694,6 +694,9 @@ function stopDetection() {
         mediaRecorder.stop();
     }
 
+    // Send any buffered samples
+    flushIngestBuffer();
+
     // Reset UI
     startBtn.disabled = false;
     stopBtn.disabled = true;
@@ -815,6 +818,7 @@ async function startRecording() {
 
 async function exportData() {
     try {
+        await flushIngestBuffer();
         const response = await fetch('/api/export?format=json');
         const data = await response.json();
 
@@ -844,6 +848,7 @@ function closeSettingsModal() {
 async function clearData() {
     if (confirm('Are you sure you want to clear all session data?')) {
         try {
+            takeIngestBatch();  // drop buffered samples so they are not re-sent after the reset
             await fetch('/api/reset', { method: 'POST' });
             alert('Session data cleared successfully');
         } catch (error) {
@@ -854,37 +859,89 @@ async function clearData() {
 
 // ===== API COMMUNICATION =====
 
-async function sendGestureData(gesture) {
-    try {
-        await fetch('/api/gestures', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                gesture: gesture.gesture,
-                confidence: gesture.confidence
-            })
-        });
-    } catch (error) {
-        console.error('Error sending gesture data:', error);
+// Gesture and analytics samples are buffered and posted to /api/ingest in
+// batches instead of one request per frame. A batch is sent once it holds
+// INGEST_MAX_SAMPLES samples or INGEST_FLUSH_INTERVAL_MS after its first
+// sample, whichever comes first.
+const INGEST_MAX_SAMPLES = 120;
+const INGEST_FLUSH_INTERVAL_MS = 2000;
+let ingestBuffer = { gestures: [], analytics: [] };
+let ingestFlushTimer = null;
+
+function queueIngestSample(kind, sample) {
+    ingestBuffer[kind].push(sample);
+
+    const buffered = ingestBuffer.gestures.length + ingestBuffer.analytics.length;
+    if (buffered >= INGEST_MAX_SAMPLES) {
+        flushIngestBuffer();
+    } else if (!ingestFlushTimer) {
+        ingestFlushTimer = setTimeout(flushIngestBuffer, INGEST_FLUSH_INTERVAL_MS);
+    }
+}
+
+function takeIngestBatch() {
+    if (ingestFlushTimer) {
+        clearTimeout(ingestFlushTimer);
+        ingestFlushTimer = null;
+    }
+    if (!ingestBuffer.gestures.length && !ingestBuffer.analytics.length) {
+        return null;
     }
+
+    const batch = ingestBuffer;
+    ingestBuffer = { gestures: [], analytics: [] };
+    // Lets the server map sample times onto its own clock
+    batch.sent_at = Date.now();
+    return batch;
 }
 
-async function sendAnalyticsData(analytics) {
+async function flushIngestBuffer() {
+    const batch = takeIngestBatch();
+    if (!batch) return;
+
     try {
-        await fetch('/api/analytics', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                posture_score: analytics.postureScore,
-                joint_angles: analytics.jointAngles,
-                body_alignment: analytics.bodyAlignment
-            })
-        });
+        const json = JSON.stringify(batch);
+        const headers = { 'Content-Type': 'application/json' };
+        let body = json;
+
+        // Joint angle samples are very repetitive, gzip shrinks them ~10x
+        if (typeof CompressionStream !== 'undefined') {
+            const stream = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+            body = await new Response(stream).blob();
+            headers['Content-Encoding'] = 'gzip';
+        }
+
+        await fetch('/api/ingest', { method: 'POST', headers, body });
     } catch (error) {
-        console.error('Error sending analytics data:', error);
+        console.error('Error sending ingest batch:', error);
+    }
+}
+
+function flushIngestBufferOnExit() {
+    // sendBeacon survives the page being closed; it cannot set Content-Encoding
+    const batch = takeIngestBatch();
+    if (batch) {
+        navigator.sendBeacon('/api/ingest', new Blob([JSON.stringify(batch)], { type: 'application/json' }));
     }
 }
 
+function sendGestureData(gesture) {
+    queueIngestSample('gestures', {
+        t: Date.now(),
+        gesture: gesture.gesture,
+        confidence: gesture.confidence
+    });
+}
+
+function sendAnalyticsData(analytics) {
+    queueIngestSample('analytics', {
+        t: Date.now(),
+        posture_score: analytics.postureScore,
+        joint_angles: analytics.jointAngles,
+        body_alignment: analytics.bodyAlignment
+    });
+}
+
 // ===== EVENT LISTENERS =====
 
 startBtn.addEventListener('click', startDetection);
@@ -895,6 +952,10 @@ exportBtn.addEventListener('click', exportData);
 settingsBtn.addEventListener('click', openSettings);
 closeSettings.addEventListener('click', closeSettingsModal);
 document.getElementById('clearDataBtn').addEventListener('click', clearData);
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushIngestBufferOnExit();
+});
+window.addEventListener('pagehide', flushIngestBufferOnExit);
 
 // Fullscreen functionality
 const fullscreenBtn = document.getElementById('fullscreenBtn');
@@ -0,0 +1,415 @@
+import os
+import sys
+import threading
+import time
+import uuid
+
+import cv2
+import numpy as np
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Streaming sessions keep MediaPipe in tracking mode: after the first
+# detection, consecutive frames of the same client only run the cheap
+# landmark tracker until tracking confidence drops
+DEFAULT_STREAM_ESTIMATOR_KWARGS = {
+    'static_image_mode': False,
+    'model_complexity': 1,
+    'min_detection_confidence': 0.5,
+    'min_tracking_confidence': 0.5,
+}
+
+
+class StreamCapacityError(RuntimeError):
+    """Raised when no more streaming sessions can be opened"""
+
+
+class UnknownSessionError(KeyError):
+    """Raised for session ids that were never opened, closed or evicted"""
+
+
+def _stream_worker_main(requests, results, estimator_kwargs):
+    """
+    Worker process loop: one PoseEstimator per session pinned to this worker
+
+    Messages on `requests`:
+        ('frame', session_id, seq, data, submitted_at)
+        ('close', session_id)
+        None to exit
+    Every frame produces (session_id, seq, PoseResult or None, error) on `results`.
+    """
+    from pose_estimator import PoseEstimator
+
+    # A warmed estimator on standby for the next session that opens, so a
+    # session's first frame does not wait for graph construction
+    spare = PoseEstimator(**estimator_kwargs)
+    spare.warmup()
+
+    estimators = {}
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+
+        if message[0] == 'close':
+            # Dropping the last reference closes the MediaPipe graphs
+            estimators.pop(message[1], None)
+            continue
+
+        _, session_id, seq, data, submitted_at = message
+        queue_ms = (time.time() - submitted_at) * 1000.0
+        try:
+            estimator = estimators.get(session_id)
+            if estimator is None:
+                estimator, spare = spare or PoseEstimator(**estimator_kwargs), None
+                estimators[session_id] = estimator
+
+            start = time.perf_counter()
+            frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            decode_ms = (time.perf_counter() - start) * 1000.0
+            if frame is None:
+                results.put((session_id, seq, None, "Could not decode image"))
+                continue
+
+            result = estimator.infer(frame)
+            result.timings['queue_ms'] = queue_ms
+            result.timings['decode_ms'] = decode_ms
+            results.put((session_id, seq, result, None))
+        except Exception as e:
+            results.put((session_id, seq, None, f"Inference failed: {e}"))
+
+        # Replace the standby estimator while no frames are waiting
+        if spare is None and requests.empty():
+            spare = PoseEstimator(**estimator_kwargs)
+            spare.warmup()
+
+
+class _StreamWorker:
+    """
+    Handle for one worker process with its own request and result queues
+
+    Queues are per worker so a crashed worker cannot leave a shared queue
+    locked or half-written for the others.
+    """
+
+    def __init__(self, index, context, estimator_kwargs, on_result):
+        self.index = index
+        self._context = context
+        self._estimator_kwargs = estimator_kwargs
+        self._on_result = on_result
+        self.sessions = 0
+        self.restarts = 0
+        self._start()
+
+    def _start(self):
+        self.requests = self._context.Queue()
+        self.results = self._context.Queue()
+        self.process = self._context.Process(
+            target=_stream_worker_main,
+            args=(self.requests, self.results, self._estimator_kwargs),
+            name=f"stream-worker-{self.index}",
+            daemon=True
+        )
+        self.process.start()
+        self._dispatcher = threading.Thread(target=self._dispatch, args=(self.results,),
+                                            name=f"stream-results-{self.index}", daemon=True)
+        self._dispatcher.start()
+
+    def _dispatch(self, results):
+        while True:
+            try:
+                message = results.get()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+            self._on_result(*message)
+
+    def restart(self):
+        # Stop the old dispatcher; anything the dead process left is dropped
+        self.results.put(None)
+        self.restarts += 1
+        self._start()
+
+    def stop(self):
+        self.requests.put(None)
+        self.process.join(timeout=5.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.results.put(None)
+        self._dispatcher.join(timeout=5.0)
+
+
+class StreamSession:
+    """Parent-side state of one streaming client"""
+
+    def __init__(self, session_id, worker):
+        self.session_id = session_id
+        self.worker = worker
+        self.created = time.monotonic()
+        self.last_active = self.created
+
+        # At most one frame is with the worker and at most one waits for
+        # it; a newer frame replaces the waiting one (latest wins)
+        self.in_flight = False
+        self.pending = None
+
+        # Clients blocked in wait_result; such sessions are never idle
+        self.waiters = 0
+
+        self.next_seq = 0
+        self.result = None
+        self.result_seq = -1
+        self.error = None
+
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+
+    def get_stats(self):
+        return {
+            'session_id': self.session_id,
+            'worker': self.worker.index,
+            'received': self.received,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'in_flight': self.in_flight,
+            'idle_seconds': time.monotonic() - self.last_active,
+        }
+
+
+class StreamSessionManager:
+    """
+    Streaming inference sessions pinned to worker processes
+
+    Each session is assigned to the least loaded worker when it opens and
+    stays there, and the worker keeps a PoseEstimator per session, so
+    MediaPipe's tracking state stays warm from one frame to the next.
+
+    Backpressure is per session and drops stale frames: while a frame is
+    being processed only the newest submitted frame is kept, so a slow
+    worker makes clients skip frames instead of building up latency.
+    Sessions idle for `idle_timeout` seconds are evicted (their estimator
+    is released in the worker) and at most `max_sessions` can be open.
+    """
+
+    def __init__(self, workers=None, max_sessions=None, idle_timeout=30.0, estimator_kwargs=None,
+                 prefork=False):
+        from inference_pool import worker_context
+        from pose_estimator import MEDIAPIPE_AVAILABLE
+        if not MEDIAPIPE_AVAILABLE:
+            raise ImportError("MediaPipe is not installed. Please run: pip install mediapipe")
+
+        kwargs = dict(DEFAULT_STREAM_ESTIMATOR_KWARGS)
+        kwargs.update(estimator_kwargs or {})
+
+        workers = workers or os.cpu_count() or 1
+        self.max_sessions = max_sessions or workers * 4
+        self.idle_timeout = idle_timeout
+
+        self._sessions = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self.opened = 0
+        self.evicted = 0
+
+        # Spawned, or forked from a fork server with `prefork` (never forked
+        # from the multi-threaded web server itself)
+        context = worker_context(prefork)
+        self._workers = [_StreamWorker(index, context, kwargs, self._on_result)
+                         for index in range(workers)]
+        self._janitor = threading.Thread(target=self._run_janitor,
+                                         name="stream-janitor", daemon=True)
+        self._janitor.start()
+
+        print(f"[OK] Stream sessions ready: {workers} workers, "
+              f"up to {self.max_sessions} sessions, {idle_timeout:.0f}s idle timeout")
+
+    def open_session(self):
+        """
+        Open a session on the least loaded worker
+
+        Returns:
+            New session id
+
+        Raises:
+            StreamCapacityError: max_sessions are already open
+        """
+        with self._cond:
+            self._evict_idle_locked()
+            if len(self._sessions) >= self.max_sessions:
+                raise StreamCapacityError(f"{len(self._sessions)} sessions open "
+                                          f"(limit {self.max_sessions})")
+            worker = min(self._workers, key=lambda w: w.sessions)
+            worker.sessions += 1
+            session = StreamSession(uuid.uuid4().hex, worker)
+            self._sessions[session.session_id] = session
+            self.opened += 1
+            return session.session_id
+
+    def close_session(self, session_id):
+        """Close a session and release its estimator (unknown ids are ignored)"""
+        with self._cond:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._release_locked(session)
+
+    def submit(self, session_id, data):
+        """
+        Submit an encoded (JPEG/PNG) frame to a session
+
+        Returns immediately. If the session's previous frame is still being
+        processed, this frame replaces any frame already waiting behind it.
+
+        Returns:
+            Sequence number of the frame
+
+        Raises:
+            UnknownSessionError: The session does not exist (or was evicted)
+        """
+        with self._cond:
+            session = self._get_locked(session_id)
+            seq = session.next_seq
+            session.next_seq += 1
+            session.received += 1
+
+            frame = (seq, data, time.time())
+            if session.in_flight:
+                if session.pending is not None:
+                    session.dropped += 1
+                session.pending = frame
+            else:
+                self._send_locked(session, frame)
+            return seq
+
+    def wait_result(self, session_id, after_seq=-1, timeout=None):
+        """
+        Wait for a result newer than `after_seq`
+
+        Because stale frames are dropped, the result returned may belong to
+        a later frame than the one the caller submitted.
+
+        Returns:
+            Tuple of (seq, PoseResult or None, error or None), or None if
+            nothing newer arrived within `timeout` seconds
+
+        Raises:
+            UnknownSessionError: The session does not exist (or was evicted)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            session = self._get_locked(session_id)
+            session.waiters += 1
+            try:
+                while True:
+                    if self._sessions.get(session_id) is not session:
+                        raise UnknownSessionError(session_id)
+                    if session.result_seq > after_seq:
+                        return session.result_seq, session.result, session.error
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+            finally:
+                session.waiters -= 1
+                session.last_active = time.monotonic()
+
+    def session_stats(self, session_id):
+        with self._cond:
+            return self._get_locked(session_id).get_stats()
+
+    def get_stats(self):
+        """
+        Get session and worker statistics
+
+        Returns:
+            Dictionary of session counts and per-worker load
+        """
+        with self._cond:
+            return {
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'opened': self.opened,
+                'evicted': self.evicted,
+                'idle_timeout': self.idle_timeout,
+                'dropped_frames': sum(s.dropped for s in self._sessions.values()),
+                'workers': [
+                    {'index': w.index, 'sessions': w.sessions,
+                     'alive': w.process.is_alive(), 'restarts': w.restarts}
+                    for w in self._workers
+                ],
+            }
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._sessions.clear()
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.stop()
+
+    def _get_locked(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise UnknownSessionError(session_id)
+        session.last_active = time.monotonic()
+        return session
+
+    def _send_locked(self, session, frame):
+        seq, data, submitted_at = frame
+        session.in_flight = True
+        session.worker.requests.put(('frame', session.session_id, seq, data, submitted_at))
+
+    def _release_locked(self, session):
+        session.worker.sessions -= 1
+        session.worker.requests.put(('close', session.session_id))
+        self._cond.notify_all()
+
+    def _evict_idle_locked(self):
+        now = time.monotonic()
+        for session_id, session in list(self._sessions.items()):
+            if session.waiters == 0 and now - session.last_active > self.idle_timeout:
+                del self._sessions[session_id]
+                self._release_locked(session)
+                self.evicted += 1
+
+    def _restart_dead_workers_locked(self):
+        for worker in self._workers:
+            if worker.process.is_alive():
+                continue
+            print(f"[ERROR] Stream worker {worker.index} died, restarting")
+            worker.restart()
+            # Frames in flight on the dead worker are lost; resume with the
+            # newest waiting frame (the estimator is recreated on demand)
+            for session in self._sessions.values():
+                if session.worker is worker and session.in_flight:
+                    session.in_flight = False
+                    if session.pending is not None:
+                        frame, session.pending = session.pending, None
+                        self._send_locked(session, frame)
+
+    def _on_result(self, session_id, seq, result, error):
+        with self._cond:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            session.in_flight = False
+            session.result_seq = seq
+            session.result = result
+            session.error = error
+            session.processed += 1
+            if session.pending is not None:
+                frame, session.pending = session.pending, None
+                self._send_locked(session, frame)
+            self._cond.notify_all()
+
+    def _run_janitor(self):
+        interval = min(max(self.idle_timeout / 2.0, 0.5), 5.0)
+        while True:
+            time.sleep(interval)
+            with self._cond:
+                if self._closed:
+                    break
+                self._evict_idle_locked()
+                self._restart_dead_workers_locked()
@@ -95,8 +95,15 @@ def test_with_image():
     print("[OK] Test completed")
     print("\nTo run with webcam, please fix the camera issues listed above.")
 
-def test_with_video_file(video_path):
-    """Test the pose and hand detection using a video file"""
+def test_with_video_file(video_path, target_fps=None, skip_quality=0.5):
+    """
+    Test the pose and hand detection using a video file
+
+    Args:
+        video_path: Path to the video file
+        target_fps: Enable adaptive frame skipping to hold this frame rate
+        skip_quality: Frame skipping quality (0.0 fastest - 1.0 always infer)
+    """
     print("=" * 60)
     print("Body Parts Recognition System - Video File Test")
     print("=" * 60)
@@ -110,7 +117,9 @@ def test_with_video_file(video_path):
             static_image_mode=False,
             model_complexity=1,
             min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+            min_tracking_confidence=0.5,
+            target_fps=target_fps,
+            skip_quality=skip_quality
         )
     except Exception as e:
         print(f"[ERROR] Failed to initialize: {e}")
@@ -162,12 +171,18 @@ def test_with_video_file(video_path):
     
     cap.release()
     cv2.destroyAllWindows()
+
+    if pose_estimator.scheduler is not None:
+        stats = pose_estimator.scheduler.get_stats()
+        print(f"[INFO] Frames inferred: {stats['inferred']}, synthesized: {stats['synthesized']}")
     print("[OK] Video test completed")
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         # If video path provided, test with video
-        test_with_video_file(sys.argv[1])
+        # Optional second argument: target FPS for adaptive frame skipping
+        target_fps = float(sys.argv[2]) if len(sys.argv) > 2 else None
+        test_with_video_file(sys.argv[1], target_fps=target_fps)
     else:
         # Default: show test info
         test_with_image()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from utils.asset_pipeline import minify_css, minify_js
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+NODE = shutil.which('node')
+needs_node = pytest.mark.skipif(NODE is None, reason="node is not installed")
+
+# Snippets whose minified form must behave exactly like the original
+PROGRAMS = {
+    'strings': r'''
+        var a = "a // not a comment", b = 'it\'s /* still */ a string';
+        var c = `line one
+        line   two ${a.length}`;
+        console.log(a, b, c, "tab\t  spaces");
+    ''',
+    'regex literals': r'''
+        var re = /\/\/[^/]*\/*/g;             // slashes inside a regex
+        var cls = /[/*]+/;                    /* a class holding comment chars */
+        var x = 10, y = 2, z = 5;
+        console.log("a//b/*c".replace(re, "!"), cls.test("*"), x / y / z);
+        function f(s) { return /^\d+$/.test(s) }
+        console.log(f("123"), typeof /x/ === "object", [1, /a/i.flags]);
+    ''',
+    'automatic semicolon insertion': r'''
+        function g() {
+            return
+            42
+        }
+        var i = 1, j = 1
+        i
+        ++j
+        var k = i
+        var l = k++
+        console.log(g(), i, j, k, l)
+        var m = 1 + +"2", n = 3 - -1, o = i+ ++j
+        console.log(m, n, o)
+    ''',
+    'comments and whitespace': r'''
+        /* header
+           comment */
+        const obj = {
+            a: 1,   // trailing
+            b: [1, 2,
+                3],
+        }
+        let sum = 0
+        for (const key in obj) { sum += typeof obj[key] === 'number' ? obj[key] : obj[key].length }
+        console.log(sum)
+    ''',
+}
+
+
+def run_node(source):
+    result = subprocess.run([NODE, '-e', source], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+@needs_node
+@pytest.mark.parametrize('name', sorted(PROGRAMS))
+def test_minified_js_behaves_the_same(name):
+    source = PROGRAMS[name]
+    minified = minify_js(source)
+    assert len(minified) < len(source)
+    assert run_node(minified) == run_node(source)
+
+
+@needs_node
+@pytest.mark.parametrize('filename', sorted(f for f in os.listdir(STATIC_DIR) if f.endswith('.js')))
+def test_minified_static_scripts_still_parse(tmp_path, filename):
+    with open(os.path.join(STATIC_DIR, filename), encoding='utf-8') as f:
+        source = f.read()
+    path = tmp_path / filename
+    path.write_text(minify_js(source), encoding='utf-8')
+    result = subprocess.run([NODE, '--check', str(path)], capture_output=True, text=True,
+                            timeout=30)
+    assert result.returncode == 0, result.stderr
+
+
+def test_js_literals_are_kept_verbatim():
+    source = 'x = "a  //  b";\ny = /a {2}\\/\\/ b/g;\nz = `  ${ w }  `'
+    minified = minify_js(source)
+    assert '"a  //  b"' in minified
+    assert '/a {2}\\/\\/ b/g' in minified
+    assert '`  ${ w }  `' in minified
+
+
+def test_js_division_is_not_a_regex():
+    # Spaces around '/' stay so it can never merge into a comment or regex
+    assert minify_js('a = b / c / d') == 'a=b / c / d'
+    assert minify_js('a = (b) / 2 // half') == 'a=(b)/ 2'
+
+
+def test_js_newlines_kept_where_asi_applies():
+    assert minify_js('return\nvalue') == 'return\nvalue'
+    assert minify_js('a = b\n++c') == 'a=b\n++c'
+    # Nothing can end the statement after an operator or before a closer
+    assert minify_js('a = [\n  1,\n  2\n]') == 'a=[1,2]'
+
+
+def test_css_minify():
+    source = '/* theme */\n.a  >  .b ,\n.c {\n  color:  red;\n  content: "x  y";\n}\n'
+    assert minify_css(source) == '.a>.b,.c{color:red;content:"x  y"}'
@@ -0,0 +1,35 @@
+import pytest
+
+app_module = pytest.importorskip('app')
+
+
+@pytest.fixture
+def client():
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+
+@pytest.mark.parametrize('body', [
+    {'gestures': 5},
+    {'analytics': True},
+    {'gestures': 'abc', 'analytics': []},
+    {'gestures': {'t': 1}},
+    [1, 2],
+])
+def test_malformed_body_is_a_client_error(client, body):
+    response = client.post('/api/ingest', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+def test_too_many_samples(client):
+    samples = [{'t': 0}] * (app_module.MAX_INGEST_SAMPLES + 1)
+    response = client.post('/api/ingest', json={'gestures': samples})
+    assert response.status_code == 413
+
+
+def test_ingest_accepts_samples(client):
+    response = client.post('/api/ingest', json={'gestures': [{'t': 1000}], 'analytics': []})
+    assert response.status_code == 200
+    assert response.get_json()['accepted'] == {'gestures': 1, 'analytics': 0}
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from utils.landmark_arrays import NUM_HAND_LANDMARKS, NUM_POSE_LANDMARKS, PoseResult
+from utils.landmark_filters import KalmanFilterBank, LandmarkSmoother, OneEuroFilterBank
+
+FPS = 30.0
+
+
+def make_hand(x, y):
+    hand = np.zeros((NUM_HAND_LANDMARKS, 3), dtype=np.float32)
+    hand[:, 0] = x + np.linspace(0.0, 0.05, NUM_HAND_LANDMARKS)
+    hand[:, 1] = y
+    return hand
+
+
+def make_result(timestamp, pose_x=None, hands=(), handedness=()):
+    pose = None
+    if pose_x is not None:
+        pose = np.zeros((NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+        pose[:, 0] = pose_x
+        pose[:, 3] = 1.0
+    hands = np.array(hands, dtype=np.float32).reshape(-1, NUM_HAND_LANDMARKS, 3)
+    return PoseResult(pose=pose, hands=hands, handedness=list(handedness), timestamp=timestamp)
+
+
+@pytest.mark.parametrize('bank_class', [OneEuroFilterBank, KalmanFilterBank])
+def test_bank_converges_to_a_constant_signal(bank_class):
+    bank = bank_class(1, 1)
+    assert bank.update([[0.0]], 0.0, [0])[0, 0] == 0.0
+    for frame in range(1, 90):
+        value = bank.update([[1.0]], frame / FPS, [0])[0, 0]
+    assert value == pytest.approx(1.0, abs=1e-3)
+
+
+@pytest.mark.parametrize('bank_class', [OneEuroFilterBank, KalmanFilterBank])
+def test_bank_reduces_jitter(bank_class):
+    rng = np.random.default_rng(0)
+    # Roughly MediaPipe's landmark jitter while holding still (normalized units)
+    noise = rng.normal(0.0, 0.002, 300)
+    bank = bank_class(1, 1)
+    filtered = np.array([bank.update([[0.5 + n]], i / FPS, [0])[0, 0] for i, n in enumerate(noise)])
+    assert np.std(filtered[30:] - 0.5) < 0.8 * np.std(noise[30:])
+
+
+@pytest.mark.parametrize('bank_class', [OneEuroFilterBank, KalmanFilterBank])
+def test_bank_reset_starts_from_the_measurement(bank_class):
+    bank = bank_class(2, 1)
+    for frame in range(30):
+        bank.update([[0.0], [0.0]], frame / FPS, [0, 1])
+    bank.reset([0])
+    filtered = bank.update([[1.0], [1.0]], 30 / FPS, [0, 1])
+    assert filtered[0, 0] == 1.0
+    assert filtered[1, 0] < 1.0
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        LandmarkSmoother('median')
+
+
+def test_smoother_tracks_pose_and_keeps_input_unmodified():
+    smoother = LandmarkSmoother()
+    for frame in range(60):
+        result = make_result(frame / FPS, pose_x=0.3)
+        smoothed = smoother.apply(result)
+    result = make_result(60 / FPS, pose_x=0.3005)
+    smoothed = smoother.apply(result)
+    assert result.pose[0, 0] == pytest.approx(0.3005)
+    assert 0.3 <= smoothed.pose[0, 0] < 0.3005
+    # Visibility is passed through
+    assert smoothed.pose[0, 3] == 1.0
+
+
+def test_smoother_resets_tracks_after_a_gap():
+    smoother = LandmarkSmoother(reset_after=0.5)
+    for frame in range(30):
+        smoother.apply(make_result(frame / FPS, hands=[make_hand(0.2, 0.5)], handedness=['Left']))
+
+    # Seen again within reset_after: still filtered towards the old position
+    smoothed = smoother.apply(make_result(1.2, hands=[make_hand(0.25, 0.5)], handedness=['Left']))
+    assert smoothed.hands[0, 0, 0] < 0.25
+    assert smoother.stats['track_resets'] == 0
+
+    # Missing longer than reset_after: starts fresh at the measurement
+    smoothed = smoother.apply(make_result(2.0, hands=[make_hand(0.7, 0.5)], handedness=['Left']))
+    assert smoother.stats['track_resets'] == 1
+    np.testing.assert_allclose(smoothed.hands[0], make_hand(0.7, 0.5))
+
+
+def test_smoother_keeps_hands_on_their_tracks_when_labels_flip():
+    smoother = LandmarkSmoother()
+    left, right = make_hand(0.2, 0.5), make_hand(0.7, 0.5)
+    for frame in range(10):
+        smoother.apply(make_result(frame / FPS, hands=[left, right], handedness=['Left', 'Right']))
+
+    smoothed = smoother.apply(make_result(10 / FPS, hands=[left, right],
+                                          handedness=['Right', 'Left']))
+    assert smoothed.handedness == ['Left', 'Right']
+    assert smoother.stats['relabelled_hands'] == 2
+    np.testing.assert_allclose(smoothed.hands, [left, right], atol=1e-4)
+
+
+def test_smoother_reset():
+    smoother = LandmarkSmoother('kalman')
+    for frame in range(10):
+        smoother.apply(make_result(frame / FPS, pose_x=0.2))
+    smoother.reset()
+    smoothed = smoother.apply(make_result(10 / FPS, pose_x=0.8))
+    assert smoothed.pose[0, 0] == pytest.approx(0.8)
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from utils.landmark_arrays import PoseResult
+from utils.landmark_timeline import (HEADER_SIZE, RECORD_DTYPE, TimelineReader, TimelineWriter,
+                                     concatenate_timelines, records_from_results)
+
+
+def make_pose(value):
+    return np.full((33, 4), value, dtype=np.float32)
+
+
+def make_hand(value):
+    return np.full((21, 3), value, dtype=np.float32)
+
+
+def write_frames(path, count, start=0, fps=30.0, buffer_frames=4):
+    with TimelineWriter(str(path), fps=fps, buffer_frames=buffer_frames) as writer:
+        for index in range(start, start + count):
+            writer.append(index / fps, pose=make_pose(index),
+                          hands=np.stack([make_hand(index + 0.5)]), handedness=['Right'],
+                          frame_index=index)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'clip.bvlm'
+    write_frames(path, 10)
+
+    with TimelineReader(str(path)) as reader:
+        assert len(reader) == 10
+        assert reader.fps == 30.0
+        np.testing.assert_array_equal(reader.frame_indices, np.arange(10))
+        np.testing.assert_allclose(reader.timestamps, np.arange(10) / 30.0)
+        np.testing.assert_array_equal(reader.pose[7], make_pose(7))
+        # Right hand in slot 1, the empty left slot is NaN
+        np.testing.assert_array_equal(reader.hands[7, 1], make_hand(7.5))
+        assert np.isnan(reader.hands[7, 0]).all()
+        assert reader.duration == pytest.approx(9 / 30.0)
+
+
+def test_missing_pose_and_hands_are_nan(tmp_path):
+    path = tmp_path / 'empty.bvlm'
+    with TimelineWriter(str(path)) as writer:
+        writer.append(0.0)
+        writer.append_result(PoseResult(hands=np.stack([make_hand(1), make_hand(2)]),
+                                        handedness=['Left', 'Right']), timestamp=0.1)
+
+    with TimelineReader(str(path)) as reader:
+        assert np.isnan(reader.pose).all()
+        assert np.isnan(reader.hands[0]).all()
+        np.testing.assert_array_equal(reader.hands[1], [make_hand(1), make_hand(2)])
+
+
+def test_same_label_hands_both_kept(tmp_path):
+    path = tmp_path / 'labels.bvlm'
+    with TimelineWriter(str(path)) as writer:
+        writer.append(0.0, hands=np.stack([make_hand(1), make_hand(2)]),
+                      handedness=['Left', 'Left'])
+
+    with TimelineReader(str(path)) as reader:
+        np.testing.assert_array_equal(reader.hands[0], [make_hand(1), make_hand(2)])
+
+
+def test_slice_time(tmp_path):
+    path = tmp_path / 'clip.bvlm'
+    write_frames(path, 30)
+
+    with TimelineReader(str(path)) as reader:
+        records = reader.slice_time(10 / 30.0, 20 / 30.0)
+        np.testing.assert_array_equal(records['frame_index'], np.arange(10, 20))
+        assert len(reader.slice_time(start=5.0)) == 0
+        assert len(reader.slice_time()) == 30
+
+
+def test_truncated_file_opens_up_to_the_last_whole_record(tmp_path):
+    path = tmp_path / 'cut.bvlm'
+    write_frames(path, 10)
+    with open(path, 'r+b') as handle:
+        handle.truncate(HEADER_SIZE + 6 * RECORD_DTYPE.itemsize + 100)
+
+    with TimelineReader(str(path)) as reader:
+        assert len(reader) == 6
+        np.testing.assert_array_equal(reader.frame_indices, np.arange(6))
+
+
+def test_not_a_timeline(tmp_path):
+    path = tmp_path / 'bogus.bvlm'
+    path.write_bytes(b'x' * (HEADER_SIZE + 10))
+    with pytest.raises(ValueError):
+        TimelineReader(str(path))
+
+
+def test_concatenate(tmp_path):
+    parts = [tmp_path / 'a.bvlm', tmp_path / 'b.bvlm']
+    write_frames(parts[0], 5)
+    write_frames(parts[1], 7, start=5)
+
+    merged = tmp_path / 'merged.bvlm'
+    assert concatenate_timelines([str(p) for p in parts], str(merged), fps=30.0) == 12
+
+    with TimelineReader(str(merged)) as reader:
+        np.testing.assert_array_equal(reader.frame_indices, np.arange(12))
+        np.testing.assert_array_equal(reader.pose[11], make_pose(11))
+
+
+def test_records_from_results():
+    results = [PoseResult(pose=make_pose(1), timestamp=2.0), None]
+    records = records_from_results(results)
+    assert records['timestamp'][0] == 2.0
+    np.testing.assert_array_equal(records['frame_index'], [0, 1])
+    assert np.isnan(records['pose'][1]).all()
+
+
+def test_views_outlive_the_reader(tmp_path):
+    path = tmp_path / 'clip.bvlm'
+    write_frames(path, 100)
+
+    with TimelineReader(str(path)) as reader:
+        clip = reader.slice_time(1.0, 2.0)
+        pose = reader.pose
+    assert len(reader) == 100
+
+    np.testing.assert_array_equal(clip['frame_index'], np.arange(30, 60))
+    np.testing.assert_array_equal(clip['pose'][0], make_pose(30))
+    np.testing.assert_array_equal(pose[99], make_pose(99))
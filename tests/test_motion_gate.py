@@ -0,0 +1,131 @@
+import time
+
+import numpy as np
+import pytest
+
+from utils.landmark_arrays import NUM_POSE_LANDMARKS, PoseResult
+from utils.motion_gate import MotionGate
+
+FPS = 30.0
+EMPTY = PoseResult()
+PERSON = PoseResult(pose=np.full((NUM_POSE_LANDMARKS, 4), 0.5, dtype=np.float32))
+
+
+def still_frame():
+    frame = np.empty((120, 160, 3), dtype=np.uint8)
+    frame[:] = np.linspace(40, 120, 120, dtype=np.uint8)[:, None, None]
+    return frame
+
+
+def moving_frame(index):
+    frame = still_frame()
+    x = 10 + (index * 7) % 100
+    frame[30:90, x:x + 30] = 255
+    return frame
+
+
+def step(gate, frame, timestamp, result=EMPTY):
+    """Run one frame through the gate the way PoseEstimator.infer does"""
+    if gate.should_infer(frame, timestamp):
+        gate.record(result, timestamp)
+        return True
+    gate.reuse(timestamp)
+    return False
+
+
+@pytest.fixture
+def gate():
+    gate = MotionGate(refresh_after=0.5, idle_after=3.0, probe_interval=2.0)
+    # Simulated frame times start at construction, like the gate's own clock
+    gate.start = time.perf_counter()
+    return gate
+
+
+def test_first_frame_is_inferred(gate):
+    assert gate.should_infer(still_frame(), gate.start)
+
+
+def test_still_scene_reuses_between_refreshes(gate):
+    frame = still_frame()
+    inferred = [step(gate, frame, gate.start + i / FPS) for i in range(30)]
+    # The first frame, then a refresh every 0.5 s
+    assert [i for i, ran in enumerate(inferred) if ran] == [0, 15]
+    assert gate.state == gate.ACTIVE
+    assert gate.stats['reused'] == 28
+
+
+def test_motion_triggers_inference(gate):
+    step(gate, still_frame(), gate.start)
+    assert step(gate, moving_frame(1), gate.start + 1 / FPS)
+    assert gate.motion >= gate.threshold
+
+
+def test_goes_idle_and_probes(gate):
+    frame = still_frame()
+    inferred = [step(gate, frame, gate.start + i / FPS) for i in range(int(10 * FPS))]
+
+    assert gate.state == gate.IDLE
+    idle_from = int(3.0 * FPS)
+    idle_inferences = [i for i, ran in enumerate(inferred) if ran and i >= idle_from]
+    # Idle and still: one probe every probe_interval seconds after the last refresh
+    assert np.diff(idle_inferences).tolist() == [int(2.0 * FPS)] * (len(idle_inferences) - 1)
+    assert gate.stats['probes'] == len(idle_inferences)
+    assert gate.stats['idle_frames'] == len(inferred) - idle_from
+
+
+def test_idle_motion_without_person_stays_idle(gate):
+    frame = still_frame()
+    for i in range(int(4 * FPS)):
+        step(gate, frame, gate.start + i / FPS)
+    assert gate.state == gate.IDLE
+
+    assert step(gate, moving_frame(1), gate.start + 4.0)
+    assert gate.state == gate.IDLE
+    assert gate.stats['wakes'] == 0
+
+
+def test_person_during_probe_wakes_the_gate(gate):
+    frame = still_frame()
+    for i in range(int(4 * FPS)):
+        step(gate, frame, gate.start + i / FPS)
+    assert gate.state == gate.IDLE
+
+    assert step(gate, moving_frame(1), gate.start + 4.0, result=PERSON)
+    assert gate.state == gate.ACTIVE
+    assert gate.stats['wakes'] == 1
+    # Active with a person: still frames are refreshed every refresh_after
+    assert not step(gate, moving_frame(1), gate.start + 4.0 + 1 / FPS, result=PERSON)
+    assert step(gate, moving_frame(1), gate.start + 4.6, result=PERSON)
+
+
+def test_wake_latency_is_measured():
+    gate = MotionGate(idle_after=0.05, probe_interval=10.0)
+    frame = still_frame()
+    assert gate.should_infer(frame)
+    gate.record(EMPTY)
+    time.sleep(0.06)
+    assert not gate.should_infer(frame)
+    assert gate.state == gate.IDLE
+
+    assert gate.should_infer(moving_frame(1))
+    time.sleep(0.01)
+    latency = gate.record(PERSON)
+    assert latency is not None and 0.01 <= latency < 1.0
+    stats = gate.get_stats()
+    assert stats['wakes'] == 1
+    assert stats['wake_ms_last'] == pytest.approx(latency * 1000.0)
+
+
+def test_reuse_restamps_the_last_result(gate):
+    step(gate, still_frame(), gate.start, result=PERSON)
+    reused = gate.reuse(gate.start + 0.1)
+    assert reused.synthesized
+    assert reused.timestamp == gate.start + 0.1
+    assert reused.pose is PERSON.pose
+
+
+def test_reset_forces_inference(gate):
+    step(gate, still_frame(), gate.start)
+    gate.reset()
+    assert gate.state == gate.ACTIVE
+    assert gate.should_infer(still_frame(), gate.start + 1 / FPS)
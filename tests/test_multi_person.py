@@ -0,0 +1,92 @@
+import numpy as np
+
+from utils.landmark_arrays import NUM_POSE_LANDMARKS
+from utils.multi_person import CropScheduler, PersonTrack
+
+
+def make_track(track_id, x=0.5):
+    pose = np.zeros((NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+    pose[:, 0] = x
+    return PersonTrack(track_id, (0, 0, 10, 10), pose, 0.0)
+
+
+def run_frame(scheduler, tracks, proposals):
+    """Select crops and age the tracks the way MultiPersonTracker does"""
+    jobs = scheduler.select(tracks, proposals)
+    refreshed = {id(track) for track, _ in jobs if track is not None}
+    for track in tracks:
+        if id(track) in refreshed:
+            track.frames_since_update = 0
+        else:
+            track.frames_since_update += 1
+    return jobs
+
+
+def test_slots_follow_the_latency_budget():
+    scheduler = CropScheduler(max_crops=4, budget_ms=20.0)
+    assert scheduler.slots() == 4
+    scheduler.record(8.0)
+    assert scheduler.slots() == 2
+    scheduler = CropScheduler(max_crops=4, budget_ms=5.0)
+    scheduler.record(30.0)
+    # Never below one crop, even when one crop is over budget
+    assert scheduler.slots() == 1
+
+
+def test_without_tracks_every_slot_goes_to_proposals():
+    scheduler = CropScheduler(max_crops=2)
+    jobs = scheduler.select([], ['a', 'b', 'c'])
+    assert jobs == [(None, 'a'), (None, 'b')]
+
+
+def test_proposals_get_at_most_half_the_slots():
+    scheduler = CropScheduler(max_crops=4)
+    tracks = [make_track(i) for i in range(3)]
+    jobs = scheduler.select(tracks, ['a', 'b', 'c'])
+    assert len(jobs) == 4
+    assert [box for track, box in jobs if track is None] == ['a', 'b']
+
+
+def test_unused_proposal_slots_go_to_tracks():
+    scheduler = CropScheduler(max_crops=4)
+    tracks = [make_track(i) for i in range(5)]
+    jobs = scheduler.select(tracks, ['a'])
+    assert len(jobs) == 4
+    assert sum(track is None for track, _ in jobs) == 1
+
+
+def test_every_track_is_refreshed_within_a_bounded_wait():
+    scheduler = CropScheduler(max_crops=2)
+    tracks = [make_track(i) for i in range(5)]
+    for _ in range(50):
+        run_frame(scheduler, tracks, [])
+        # Five people, two crops a frame: nobody waits more than two frames
+        assert max(track.frames_since_update for track in tracks) <= 2
+
+
+def test_fast_tracks_are_refreshed_more_often():
+    scheduler = CropScheduler(max_crops=1)
+    tracks = [make_track(i) for i in range(4)]
+    tracks[0].velocity[:] = 2.0
+    counts = dict.fromkeys(range(4), 0)
+    for _ in range(40):
+        for track, _ in run_frame(scheduler, tracks, []):
+            counts[track.id] += 1
+    assert counts[0] > max(counts[1], counts[2], counts[3])
+    assert min(counts.values()) > 0
+
+
+def test_single_slot_alternates_so_tracks_are_not_starved():
+    scheduler = CropScheduler(max_crops=1)
+    tracks = [make_track(0)]
+    # A proposal that keeps reappearing (e.g. a poster the model rejects)
+    kinds = [run_frame(scheduler, tracks, ['poster'])[0][0] is None for _ in range(6)]
+    assert kinds == [True, False, True, False, True, False]
+    assert tracks[0].frames_since_update <= 1
+
+
+def test_single_slot_goes_to_tracks_without_proposals():
+    scheduler = CropScheduler(max_crops=1)
+    tracks = [make_track(0), make_track(1)]
+    jobs = run_frame(scheduler, tracks, [])
+    assert len(jobs) == 1 and jobs[0][0] is not None
@@ -0,0 +1,119 @@
+import threading
+
+import pytest
+
+from utils.time_series import TimeSeriesStore
+
+
+def test_rollup_bucket_boundaries():
+    store = TimeSeriesStore(rollup_fields=('value',), rollup_intervals=(1, 60))
+    store.extend([(100.0, {'value': 1}), (100.999, {'value': 3}),
+                  (101.0, {'value': 10}), (159.5, {'value': 5}), (160.0, {'value': 7})])
+
+    seconds = store.rollups(1)
+    assert [row['start'] for row in seconds] == [100.0, 101.0, 159.0, 160.0]
+    assert seconds[0]['count'] == 2
+    assert seconds[0]['value'] == {'avg': 2.0, 'min': 1, 'max': 3, 'count': 2}
+
+    minutes = store.rollups(60)
+    assert [row['start'] for row in minutes] == [60.0, 120.0]
+    assert [row['count'] for row in minutes] == [3, 2]
+    assert minutes[0]['value']['max'] == 10
+    assert minutes[1]['value'] == {'avg': 6.0, 'min': 5, 'max': 7, 'count': 2}
+
+
+def test_rollup_query_window_includes_overlapping_buckets():
+    store = TimeSeriesStore(rollup_fields=('value',), rollup_intervals=(1,))
+    store.extend((float(t), {'value': t}) for t in range(10))
+
+    rows = store.rollups(1, start=2.5, end=5.0)
+    # The bucket starting at 2 overlaps the window; the one at 5 does not
+    assert [row['start'] for row in rows] == [2.0, 3.0, 4.0]
+
+
+def test_rollup_skips_non_numeric_values():
+    store = TimeSeriesStore(rollup_fields=('value',), rollup_intervals=(1,))
+    store.extend([(0.0, {'value': True}), (0.1, {'value': 'x'}), (0.2, {}), (0.3, {'value': 2.5})])
+
+    row, = store.rollups(1)
+    assert row['count'] == 4
+    assert row['value']['count'] == 1
+    assert row['value']['avg'] == 2.5
+
+
+def test_rollup_history_is_bounded():
+    store = TimeSeriesStore(rollup_fields=('value',), rollup_intervals=(1,), rollup_capacity=3)
+    store.extend((float(t), {'value': t}) for t in range(5))
+
+    assert [row['start'] for row in store.rollups(1)] == [2.0, 3.0, 4.0]
+
+
+def test_unknown_rollup_interval():
+    with pytest.raises(KeyError):
+        TimeSeriesStore().rollups(5)
+
+
+def test_ring_wraparound_keeps_newest_in_order():
+    store = TimeSeriesStore(capacity=4)
+    store.extend((float(t), {'t': t}) for t in range(10))
+
+    assert len(store) == 4
+    assert [r['t'] for r in store.range()] == [6, 7, 8, 9]
+    assert [r['t'] for r in store.latest(2)] == [8, 9]
+    assert [r['t'] for r in store.latest(10)] == [6, 7, 8, 9]
+    assert store.time_span == (6.0, 9.0)
+    assert store.get_stats() == {'retained': 4, 'capacity': 4, 'appended': 10, 'evicted': 6}
+
+
+def test_range_after_wraparound():
+    store = TimeSeriesStore(capacity=5)
+    store.extend((float(t), {'t': t}) for t in range(12))
+
+    assert [r['t'] for r in store.range(start=8.5)] == [9, 10, 11]
+    assert [r['t'] for r in store.range(start=8.0, end=10.0)] == [8, 9]
+    assert [r['t'] for r in store.range(start=0.0, limit=2)] == [7, 8]
+    assert store.range(start=20.0) == []
+
+
+def test_clock_stepping_backwards_is_clamped():
+    store = TimeSeriesStore(capacity=3)
+    store.extend([(10.0, {'t': 0}), (5.0, {'t': 1}), (11.0, {'t': 2}), (12.0, {'t': 3})])
+
+    assert store.time_span == (10.0, 12.0)
+    assert [r['t'] for r in store.range(start=10.0, end=11.0)] == [1]
+
+
+def test_iter_range_skips_records_overwritten_while_iterating():
+    store = TimeSeriesStore(capacity=4)
+    store.extend((float(t), {'t': t}) for t in range(4))
+
+    chunks = store.iter_range(chunk_size=2)
+    assert [r['t'] for r in next(chunks)] == [0, 1]
+    # Overwrites 2 and 3 before the second chunk is read
+    store.extend((float(t), {'t': t}) for t in range(4, 7))
+    assert [r['t'] for chunk in chunks for r in chunk] == [3]
+
+
+def test_iter_range_matches_range():
+    store = TimeSeriesStore(capacity=50)
+    store.extend((float(t), {'t': t}) for t in range(120))
+
+    streamed = [r for chunk in store.iter_range(start=80.0, end=110.0, chunk_size=7) for r in chunk]
+    assert streamed == store.range(start=80.0, end=110.0)
+
+
+def test_concurrent_appends():
+    store = TimeSeriesStore(capacity=1000)
+
+    def producer():
+        for _ in range(500):
+            store.append({}, timestamp=1.0)
+
+    threads = [threading.Thread(target=producer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.get_stats()['appended'] == 2000
+    assert len(store) == 1000
@@ -0,0 +1,283 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Smaller files are not worth a compressed variant
+MIN_COMPRESS_SIZE = 512
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+# JS whitespace next to these characters can go without changing tokens
+JS_PUNCTUATION = set('{}()[];,:=<>!?&|*^%~')
+# After these a line cannot end a statement, so a following newline can go
+JS_OPEN_BEFORE = set('{([;,=:?&|!<>*%^~')
+JS_CLOSE_AFTER = set('})],;:.?')
+# A '/' after these characters or keywords starts a regex, not a division
+JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete',
+                     'new', 'throw', 'yield', 'await', 'instanceof'}
+
+CSS_PUNCTUATION = set('{};,>')
+
+
+def _skip_string(source, i):
+    """Index just past the string/template literal starting at source[i]"""
+    quote = source[i]
+    i += 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+            continue
+        if source[i] == quote:
+            return i + 1
+        i += 1
+    return i
+
+
+def _skip_regex(source, i):
+    """Index just past the regex literal (and flags) starting at source[i]"""
+    i += 1
+    in_class = False
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            break
+        elif c == '\n':
+            break
+        i += 1
+    while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+        i += 1
+    return i
+
+
+def _last_word(out):
+    text = out[-1] if out else ''
+    end = len(text)
+    start = end
+    while start > 0 and (text[start - 1].isalnum() or text[start - 1] in '_$'):
+        start -= 1
+    return text[start:end]
+
+
+def minify_js(source):
+    """
+    Conservative JavaScript minifier
+
+    Removes comments and collapses whitespace outside string, template and
+    regex literals. Newlines are only dropped where automatic semicolon
+    insertion cannot apply, so the output parses to the same program. It
+    does not rename identifiers; template literals must not nest backticks
+    inside ${...}.
+    """
+    out = []
+    pending = None
+    i, n = 0, len(source)
+    while i < n:
+        c = source[i]
+        if c in ' \t\r\n\ufeff':
+            j = i
+            while j < n and source[j] in ' \t\r\n\ufeff':
+                j += 1
+            if pending != '\n':
+                pending = '\n' if '\n' in source[i:j] else ' '
+            i = j
+            continue
+        if source.startswith('//', i):
+            j = source.find('\n', i)
+            i = n if j == -1 else j
+            continue
+        if source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            j = n if j == -1 else j + 2
+            if '\n' in source[i:j]:
+                pending = '\n'
+            elif pending is None:
+                pending = ' '
+            i = j
+            continue
+
+        prev = out[-1][-1] if out else ''
+        if pending and prev:
+            if pending == '\n':
+                if prev not in JS_OPEN_BEFORE and c not in JS_CLOSE_AFTER:
+                    out.append('\n')
+            elif prev not in JS_PUNCTUATION and c not in JS_PUNCTUATION:
+                out.append(' ')
+        pending = None
+
+        if c in '\'"`':
+            j = _skip_string(source, i)
+        elif c == '/' and (not prev or prev in JS_REGEX_AFTER or _last_word(out) in JS_REGEX_KEYWORDS):
+            j = _skip_regex(source, i)
+        else:
+            j = i + 1
+            if c.isalnum() or c in '_$':
+                while j < n and (source[j].isalnum() or source[j] in '_$'):
+                    j += 1
+        out.append(source[i:j])
+        i = j
+    return ''.join(out)
+
+
+def minify_css(source):
+    """Remove comments and collapse whitespace in CSS (strings are kept as-is)"""
+    out = []
+    pending = False
+    i, n = 0, len(source)
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            pending = True
+            i += 1
+            continue
+        if source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            i = n if j == -1 else j + 2
+            pending = True
+            continue
+
+        prev = out[-1][-1] if out else ''
+        if pending and prev and prev not in CSS_PUNCTUATION and prev != ':' \
+                and c not in CSS_PUNCTUATION:
+            out.append(' ')
+        pending = False
+
+        if c in '\'"':
+            j = _skip_string(source, i)
+        elif c == '}' and prev == ';':
+            out[-1] = out[-1][:-1]
+            j = i + 1
+        else:
+            j = i + 1
+        out.append(source[i:j])
+        i = j
+    return ''.join(out)
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+class StaticAsset:
+    """One servable file: content hash, MIME type and precompressed variants"""
+
+    def __init__(self, name, content, mimetype):
+        self.name = name
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(content).hexdigest()[:12]
+        stem, extension = os.path.splitext(name)
+        self.hashed_name = f"{stem}.{self.digest}{extension}"
+
+        self.variants = {'identity': content}
+        if len(content) >= MIN_COMPRESS_SIZE and mimetype.startswith(COMPRESSIBLE_TYPES):
+            compressed = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+            if BROTLI_AVAILABLE:
+                compressed['br'] = brotli.compress(content, quality=11)
+            for encoding, data in compressed.items():
+                if len(data) < len(content):
+                    self.variants[encoding] = data
+
+    def negotiate(self, accept_encodings):
+        """
+        Pick the smallest variant the client accepts
+
+        Args:
+            accept_encodings: werkzeug Accept object for Accept-Encoding
+
+        Returns:
+            Tuple of (encoding, body)
+        """
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding] > 0:
+                return encoding, self.variants[encoding]
+        return 'identity', self.variants['identity']
+
+
+class AssetPipeline:
+    """
+    Static files fingerprinted, bundled and compressed once at startup
+
+    Every file under `static_dir` is served under its plain name and under
+    a content-hash name (style.css -> style.1a2b3c4d5e6f.css). Bundles
+    concatenate (and minify) several files into one asset, e.g. all page
+    scripts into app.js, so the page makes one request instead of six.
+    Hashed names change whenever the content does, so they can be cached
+    forever; plain names should be revalidated with the ETag.
+    """
+
+    def __init__(self, static_dir, bundles=None, minify=True):
+        self.static_dir = static_dir
+        self.bundles = bundles or {}
+        self.minify = minify
+        self._by_name = {}
+        self._by_hashed_name = {}
+        self.stats = {}
+        self.build()
+
+    def build(self):
+        """(Re)read all files and bundles from disk"""
+        by_name = {}
+        for directory, _, files in os.walk(self.static_dir):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.static_dir).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    by_name[name] = StaticAsset(name, f.read(), self._mimetype(name))
+
+        stats = {}
+        for bundle, members in self.bundles.items():
+            extension = os.path.splitext(bundle)[1]
+            parts = []
+            for member in members:
+                with open(os.path.join(self.static_dir, member), encoding='utf-8') as f:
+                    text = f.read()
+                if self.minify and extension in MINIFIERS:
+                    text = MINIFIERS[extension](text)
+                parts.append(text)
+            # ';' keeps a file without a trailing semicolon from running into the next
+            content = (';\n' if extension == '.js' else '\n').join(parts).encode('utf-8')
+            asset = StaticAsset(bundle, content, self._mimetype(bundle))
+            by_name[bundle] = asset
+            stats[bundle] = {
+                'files': len(members),
+                'source_bytes': sum(len(by_name[member].variants['identity']) for member in members),
+                **{f'{encoding}_bytes': len(data) for encoding, data in asset.variants.items()},
+            }
+
+        self._by_name = by_name
+        self._by_hashed_name = {asset.hashed_name: asset for asset in by_name.values()}
+        self.stats = stats
+
+    def url(self, name):
+        """Fingerprinted URL of a file or bundle (the plain URL if unknown)"""
+        asset = self._by_name.get(name)
+        return f"/static/{asset.hashed_name if asset is not None else name}"
+
+    def lookup(self, filename):
+        """
+        Find the asset for a requested path
+
+        Returns:
+            Tuple of (StaticAsset or None, whether the name is fingerprinted)
+        """
+        asset = self._by_hashed_name.get(filename)
+        if asset is not None:
+            return asset, True
+        return self._by_name.get(filename), False
+
+    @staticmethod
+    def _mimetype(name):
+        return mimetypes.guess_type(name)[0] or 'application/octet-stream'
@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+
+
+class FrameBufferPool:
+    """
+    Preallocated frame buffers for the per-frame conversion path
+
+    `PoseEstimator` converts every frame to RGB for MediaPipe and, unless it
+    draws in place, needs a BGR frame to draw on. Allocating both per call
+    costs two full-frame buffers per frame; this pool keeps them around and
+    only reallocates when the frame shape changes.
+
+    Output frames come from a small ring so a frame handed to another stage
+    (e.g. a display queue) is not overwritten by the very next call.
+    """
+
+    def __init__(self, output_buffers=3):
+        self.output_buffers = output_buffers
+        self._rgb = None
+        self._outputs = []
+        self._next_output = 0
+
+    @staticmethod
+    def _ensure(buffer, shape):
+        if buffer is None or buffer.shape != shape:
+            return np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def to_rgb(self, image, mirror=False):
+        """
+        Convert a BGR frame to RGB in the shared buffer, optionally mirrored
+
+        Mirroring and BGR->RGB are done in a single pass: reversing the bytes
+        of a BGR row reverses the pixel order *and* the channel order of each
+        pixel, so a horizontal flip of the (H, W * 3) byte view is exactly
+        flip + BGR2RGB.
+
+        Args:
+            image: Input frame (BGR, uint8, 3 channels)
+            mirror: Whether to flip the frame horizontally
+
+        Returns:
+            The shared RGB buffer (read-only until the next call)
+        """
+        self._rgb = self._ensure(self._rgb, image.shape)
+        rgb = self._rgb
+        rgb.flags.writeable = True
+
+        if mirror:
+            if not image.flags.c_contiguous:
+                image = np.ascontiguousarray(image)
+            height = image.shape[0]
+            cv2.flip(image.reshape(height, -1), 1, dst=rgb.reshape(height, -1))
+        else:
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=rgb)
+
+        rgb.flags.writeable = False
+        return rgb
+
+    def output_frame(self, image, mirror=False):
+        """
+        Copy a BGR frame into the next pooled output buffer
+
+        Args:
+            image: Input frame (BGR)
+            mirror: Whether to flip the frame horizontally while copying
+
+        Returns:
+            Pooled BGR frame to draw on
+        """
+        if len(self._outputs) < self.output_buffers:
+            self._outputs.append(None)
+        index = self._next_output % len(self._outputs)
+        self._next_output += 1
+
+        output = self._ensure(self._outputs[index], image.shape)
+        self._outputs[index] = output
+
+        if mirror:
+            cv2.flip(image, 1, dst=output)
+        else:
+            np.copyto(output, image)
+        return output
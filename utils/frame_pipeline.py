@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import deque
+
+
+class LatestFrameQueue:
+    """
+    Bounded queue that drops the oldest item when full
+
+    Stages of the pipelined loop in main.py are joined by these queues so a
+    slow consumer always sees the freshest frame instead of a growing backlog.
+    """
+
+    def __init__(self, maxsize=1):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        """
+        Add an item, discarding the oldest one if the queue is full
+
+        Args:
+            item: Item to enqueue
+
+        Returns:
+            True if an older item had to be dropped
+        """
+        with self._cond:
+            dropped = False
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+                dropped = True
+            self._items.append(item)
+            self._cond.notify()
+            return dropped
+
+    def get(self, timeout=None):
+        """
+        Remove and return the oldest item
+
+        Args:
+            timeout: Seconds to wait for an item (None waits forever)
+
+        Returns:
+            The item, or None on timeout or when the queue is closed and empty
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        """Wake up all waiting consumers; further gets return None once drained"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class StageStats:
+    """Latency bookkeeping for a single pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed):
+        """Record one stage run that took `elapsed` seconds"""
+        self.count += 1
+        self.total_time += elapsed
+        self.last_time = elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+
+    @property
+    def average_ms(self):
+        if self.count == 0:
+            return 0.0
+        return self.total_time / self.count * 1000.0
+
+    def summary(self):
+        return (f"{self.name}: {self.count} frames, avg {self.average_ms:.1f} ms, "
+                f"max {self.max_time * 1000.0:.1f} ms")
+
+
+class StageTimer:
+    """Context manager that records elapsed time into a StageStats"""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats.record(time.perf_counter() - self._start)
+        return False
@@ -0,0 +1,164 @@
+import math
+import time
+
+from utils.landmark_arrays import PoseResult
+
+
+class AdaptiveFrameScheduler:
+    """
+    Decide which frames get full inference and synthesize the rest
+
+    The models run once every `interval` frames. The interval is adapted from
+    the measured inference latency and the per-frame overhead of the rest of
+    the loop (capture, drawing, display), so that one inference per interval
+    fits in the frame budget of `target_fps`. In between, landmarks are extrapolated
+    with constant velocity from the last two inferred frames so the display
+    keeps moving at the target rate.
+
+    `quality` trades accuracy for speed: 1.0 always infers, 0.0 allows up to
+    `max_interval` frames between inferences.
+    """
+
+    def __init__(self, target_fps=30.0, quality=0.5, max_interval=8):
+        if target_fps <= 0:
+            raise ValueError("target_fps must be positive")
+        if not 0.0 <= quality <= 1.0:
+            raise ValueError("quality must be between 0.0 and 1.0")
+
+        self.target_fps = target_fps
+        self.quality = quality
+        self.max_interval = max_interval
+
+        self.interval = 1
+        self.latency = None
+        self.overhead = 0.0
+        self.frames_inferred = 0
+        self.frames_synthesized = 0
+
+        self._frames_since_inference = 0
+        self._previous = None
+        self._latest = None
+        self._last_frame_time = None
+        self._last_model_time = 0.0
+
+    @property
+    def allowed_interval(self):
+        """Largest interval the quality setting permits"""
+        return 1 + int(round((1.0 - self.quality) * (self.max_interval - 1)))
+
+    def _note_frame(self, timestamp):
+        """Update the smoothed per-frame overhead spent outside the models"""
+        if self._last_frame_time is not None:
+            sample = max(0.0, timestamp - self._last_frame_time - self._last_model_time)
+            self.overhead = 0.8 * self.overhead + 0.2 * sample
+        self._last_frame_time = timestamp
+
+    def should_infer(self):
+        """
+        Check whether the next frame should run the models
+
+        Returns:
+            True to infer, False to synthesize landmarks instead
+        """
+        return self._latest is None or self._frames_since_inference + 1 >= self.interval
+
+    def record_inference(self, result, latency, timestamp=None):
+        """
+        Store a real inference result and adapt the interval
+
+        Args:
+            result: PoseResult produced by the models
+            latency: Seconds spent running the models
+            timestamp: Frame time in seconds (defaults to now)
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        self.frames_inferred += 1
+        self._frames_since_inference = 0
+        self._note_frame(timestamp)
+        self._last_model_time = latency
+
+        # Exponentially weighted latency so one slow frame doesn't swing N
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = 0.8 * self.latency + 0.2 * latency
+
+        # Spread one inference over enough frames that the average frame time
+        # (overhead + latency / N) stays within the frame budget
+        budget = 1.0 / self.target_fps
+        spare = max(budget - self.overhead, budget * 0.1)
+        needed = max(1, int(math.ceil(self.latency / spare)))
+        self.interval = min(needed, self.allowed_interval)
+
+        self._previous = self._latest
+        self._latest = (timestamp, result)
+
+    def synthesize(self, timestamp=None):
+        """
+        Produce a result for a skipped frame from the recent history
+
+        Args:
+            timestamp: Frame time in seconds (defaults to now)
+
+        Returns:
+            PoseResult with `synthesized` set
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        self.frames_synthesized += 1
+        self._frames_since_inference += 1
+        self._note_frame(timestamp)
+        self._last_model_time = 0.0
+
+        latest_time, latest = self._latest
+        previous_time, previous = self._previous if self._previous is not None else (latest_time, None)
+
+        # Extrapolation factor, capped at one interval past the last inference
+        span = latest_time - previous_time
+        if span > 0:
+            max_ahead = self.interval / self.target_fps
+            factor = min(timestamp - latest_time, max_ahead) / span
+        else:
+            factor = 0.0
+
+        pose = latest.pose
+        if pose is not None and previous is not None and previous.pose is not None and factor > 0:
+            pose = pose.copy()
+            pose[:, :3] += (latest.pose[:, :3] - previous.pose[:, :3]) * factor
+
+        hands = latest.hands
+        if len(hands) and previous is not None and factor > 0:
+            hands = hands.copy()
+            for hand_idx, label in enumerate(latest.handedness):
+                previous_hand = previous.hand(label)
+                if previous_hand is not None:
+                    hands[hand_idx] += (latest.hands[hand_idx] - previous_hand) * factor
+
+        return PoseResult(
+            pose=pose,
+            hands=hands,
+            handedness=list(latest.handedness),
+            handedness_scores=latest.handedness_scores,
+            image_size=latest.image_size,
+            timestamp=timestamp,
+            synthesized=True
+        )
+
+    def get_stats(self):
+        """
+        Get scheduler counters
+
+        Returns:
+            Dictionary with inferred/synthesized frame counts, current interval,
+            smoothed inference latency and per-frame overhead in milliseconds
+        """
+        return {
+            'inferred': self.frames_inferred,
+            'synthesized': self.frames_synthesized,
+            'interval': self.interval,
+            'latency_ms': (self.latency or 0.0) * 1000.0,
+            'overhead_ms': self.overhead * 1000.0,
+        }
@@ -0,0 +1,161 @@
+import cv2
+import numpy as np
+from collections import namedtuple
+
+# Minimal stand-in for MediaPipe's hands output, used for remapped or skipped frames
+HandResults = namedtuple('HandResults', ['multi_hand_landmarks', 'multi_handedness'])
+
+# Pose landmark indices used to locate each hand
+# (wrist, pinky knuckle, index knuckle, elbow)
+LEFT_HAND_POSE_IDS = (15, 17, 19, 13)
+RIGHT_HAND_POSE_IDS = (16, 18, 20, 14)
+
+
+def _square_box(center, size, image_width, image_height):
+    """Place a square of side `size` around `center`, inside the frame"""
+    size = min(size, image_width, image_height)
+    # Shift (rather than clip) the box back inside the frame so it stays square
+    x0 = int(round(min(max(center[0] - size / 2.0, 0), image_width - size)))
+    y0 = int(round(min(max(center[1] - size / 2.0, 0), image_height - size)))
+    side = int(round(size))
+    return (x0, y0, x0 + side, y0 + side)
+
+
+def _hand_box(landmarks, ids, image_width, image_height, visibility_threshold, min_size):
+    """
+    Estimate a square pixel box around one hand from pose landmarks
+
+    Returns:
+        (x0, y0, x1, y1) box, or None if the wrist is not visible
+    """
+    wrist_id, pinky_id, index_id, elbow_id = ids
+    wrist = landmarks[wrist_id]
+    if wrist.visibility < visibility_threshold:
+        return None
+
+    def to_px(landmark):
+        return np.array([landmark.x * image_width, landmark.y * image_height])
+
+    wrist_px = to_px(wrist)
+    knuckles_px = (to_px(landmarks[pinky_id]) + to_px(landmarks[index_id])) / 2.0
+    palm_length = np.linalg.norm(knuckles_px - wrist_px)
+    forearm_length = np.linalg.norm(wrist_px - to_px(landmarks[elbow_id]))
+
+    # Pose only tracks the knuckles, so the fingers extend roughly one
+    # palm length further; centre the box past the knuckle midpoint
+    center = wrist_px + (knuckles_px - wrist_px) * 1.2
+    size = max(palm_length * 4.0, forearm_length * 0.9, min_size)
+    return _square_box(center, size, image_width, image_height)
+
+
+def _iou(a, b):
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    intersection = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def hand_rois_from_pose(pose_landmarks, image_width, image_height,
+                        visibility_threshold=0.5, min_size=96):
+    """
+    Derive hand regions of interest from pose landmarks
+
+    Args:
+        pose_landmarks: MediaPipe pose landmarks (normalized)
+        image_width: Frame width in pixels
+        image_height: Frame height in pixels
+        visibility_threshold: Minimum wrist visibility for a hand to be considered
+        min_size: Minimum box side in pixels
+
+    Returns:
+        List of two entries (left tile, right tile), each an (x0, y0, x1, y1)
+        pixel box or None. Overlapping hands are merged into the left tile.
+    """
+    landmarks = pose_landmarks.landmark
+    left = _hand_box(landmarks, LEFT_HAND_POSE_IDS, image_width, image_height,
+                     visibility_threshold, min_size)
+    right = _hand_box(landmarks, RIGHT_HAND_POSE_IDS, image_width, image_height,
+                      visibility_threshold, min_size)
+
+    if left is not None and right is not None and _iou(left, right) > 0.3:
+        # The hand model expects a square crop, so square up the union
+        # around its centre rather than letting the tile resize stretch it
+        x0, y0 = min(left[0], right[0]), min(left[1], right[1])
+        x1, y1 = max(left[2], right[2]), max(left[3], right[3])
+        center = ((x0 + x1) / 2.0, (y0 + y1) / 2.0)
+        return [_square_box(center, max(x1 - x0, y1 - y0), image_width, image_height), None]
+
+    return [left, right]
+
+
+def build_hand_mosaic(image, rois, mosaic):
+    """
+    Resize each ROI crop into its tile of a preallocated side-by-side mosaic
+
+    Keeping one fixed mosaic layout (left tile, right tile) lets the Hands
+    graph keep tracking each hand in the same place from frame to frame.
+
+    Args:
+        image: Full RGB frame
+        rois: List of pixel boxes or None, one per tile
+        mosaic: Preallocated (tile, tile * len(rois), 3) uint8 buffer
+
+    Returns:
+        The mosaic buffer
+    """
+    tile = mosaic.shape[0]
+    for tile_idx, roi in enumerate(rois):
+        tile_view = mosaic[:, tile_idx * tile:(tile_idx + 1) * tile]
+        if roi is None:
+            tile_view.fill(0)
+            continue
+        x0, y0, x1, y1 = roi
+        cv2.resize(image[y0:y1, x0:x1], (tile, tile), dst=tile_view,
+                   interpolation=cv2.INTER_LINEAR)
+    return mosaic
+
+
+def map_hand_results_to_frame(hand_results, rois, image_width, image_height):
+    """
+    Map hand landmarks detected on a mosaic back to full-frame coordinates
+
+    Landmarks are rewritten in place so the results can be drawn and consumed
+    exactly like full-frame Hands output. Hands whose wrist lands on an empty
+    tile are discarded.
+
+    Args:
+        hand_results: MediaPipe hands results computed on the mosaic
+        rois: List of pixel boxes or None, one per tile
+        image_width: Full frame width in pixels
+        image_height: Full frame height in pixels
+
+    Returns:
+        HandResults with the remapped hands
+    """
+    if not hand_results.multi_hand_landmarks:
+        return HandResults(None, None)
+
+    n_tiles = len(rois)
+    kept_landmarks = []
+    kept_handedness = []
+    for hand_idx, hand_landmarks in enumerate(hand_results.multi_hand_landmarks):
+        wrist_x = hand_landmarks.landmark[0].x
+        tile_idx = min(max(int(wrist_x * n_tiles), 0), n_tiles - 1)
+        roi = rois[tile_idx]
+        if roi is None:
+            continue
+
+        x0, y0, x1, y1 = roi
+        roi_width = x1 - x0
+        roi_height = y1 - y0
+        for landmark in hand_landmarks.landmark:
+            landmark.x = (x0 + (landmark.x * n_tiles - tile_idx) * roi_width) / image_width
+            landmark.y = (y0 + landmark.y * roi_height) / image_height
+            landmark.z = landmark.z * n_tiles * roi_width / image_width
+
+        kept_landmarks.append(hand_landmarks)
+        if hand_results.multi_handedness:
+            kept_handedness.append(hand_results.multi_handedness[hand_idx])
+
+    return HandResults(kept_landmarks or None, kept_handedness or None)
@@ -0,0 +1,109 @@
+import cv2
+
+# Long-side resolutions the auto mode steps through, largest first
+RESOLUTION_LADDER = (1280, 960, 800, 640, 480, 384, 320)
+
+
+class ResolutionController:
+    """
+    Choose the resolution frames are downscaled to before inference
+
+    MediaPipe landmarks are normalized to [0, 1], so results computed on a
+    downscaled frame can be drawn on the original frame unchanged. The
+    resized frame is written into a buffer that is reused for as long as the
+    output size stays the same.
+
+    In auto mode the long side moves down the RESOLUTION_LADDER while the
+    smoothed inference latency is over `latency_budget_ms`, and back up when
+    it stays comfortably below the budget.
+    """
+
+    def __init__(self, long_side=None, auto=False, latency_budget_ms=33.0,
+                 ladder=RESOLUTION_LADDER, cooldown_frames=15):
+        self.auto = auto
+        self.latency_budget = latency_budget_ms / 1000.0
+        self.ladder = sorted(ladder, reverse=True)
+        self.cooldown_frames = cooldown_frames
+
+        if long_side is None:
+            long_side = self.ladder[0]
+        self.long_side = long_side
+        self._level = min(range(len(self.ladder)),
+                          key=lambda i: abs(self.ladder[i] - long_side))
+        if auto:
+            self.long_side = self.ladder[self._level]
+
+        self.latency = None
+        self._frames_since_change = 0
+        self._buffer = None
+
+    def target_size(self, width, height):
+        """
+        Get the inference size for a frame, never upscaling
+
+        Returns:
+            (width, height) tuple
+        """
+        frame_long_side = max(width, height)
+        if frame_long_side <= self.long_side:
+            return width, height
+        scale = self.long_side / frame_long_side
+        return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+    def resize(self, image):
+        """
+        Downscale a frame to the current inference resolution
+
+        Args:
+            image: Input frame
+
+        Returns:
+            The input frame itself if no scaling is needed, otherwise the
+            shared resize buffer holding the downscaled frame
+        """
+        height, width = image.shape[:2]
+        size = self.target_size(width, height)
+        if size == (width, height):
+            return image
+
+        shape = (size[1], size[0]) + image.shape[2:]
+        if self._buffer is None or self._buffer.shape != shape:
+            self._buffer = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        else:
+            cv2.resize(image, size, dst=self._buffer, interpolation=cv2.INTER_AREA)
+        return self._buffer
+
+    def record(self, latency):
+        """
+        Record one inference latency and step the resolution in auto mode
+
+        Args:
+            latency: Seconds spent running the models
+        """
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = 0.8 * self.latency + 0.2 * latency
+
+        if not self.auto:
+            return
+
+        self._frames_since_change += 1
+        if self._frames_since_change < self.cooldown_frames:
+            return
+
+        if self.latency > self.latency_budget and self._level < len(self.ladder) - 1:
+            self._set_level(self._level + 1)
+        elif self.latency < self.latency_budget * 0.6 and self._level > 0:
+            self._set_level(self._level - 1)
+
+    def _set_level(self, level):
+        previous = self.long_side
+        self._level = level
+        self.long_side = self.ladder[level]
+        self._frames_since_change = 0
+        # The latency estimate belongs to the old resolution; scale it by
+        # the pixel-count ratio so the next decision starts from a guess
+        self.latency *= (self.long_side / previous) ** 2
+        print(f"[INFO] Inference resolution: {previous} -> {self.long_side} px "
+              f"(budget {self.latency_budget * 1000:.0f} ms)")
@@ -0,0 +1,156 @@
+import numpy as np
+
+NUM_POSE_LANDMARKS = 33
+NUM_HAND_LANDMARKS = 21
+
+
+def pose_landmarks_to_array(pose_landmarks):
+    """
+    Convert MediaPipe pose landmarks to a (33, 4) float32 array
+
+    Args:
+        pose_landmarks: MediaPipe pose landmark list
+
+    Returns:
+        Array of [x, y, z, visibility] rows
+    """
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark],
+        dtype=np.float32
+    )
+
+
+def hand_landmarks_to_array(hand_landmarks):
+    """
+    Convert MediaPipe hand landmarks to a (21, 3) float32 array
+
+    Args:
+        hand_landmarks: MediaPipe hand landmark list
+
+    Returns:
+        Array of [x, y, z] rows
+    """
+    return np.array(
+        [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark],
+        dtype=np.float32
+    )
+
+
+class PoseResult:
+    """
+    Compact, drawing-free result of one PoseEstimator.infer() call
+
+    Attributes:
+        pose: (33, 4) float32 array of normalized [x, y, z, visibility],
+            or None when no person was found
+        hands: (k, 21, 3) float32 array of normalized [x, y, z] per hand
+        handedness: List of k labels ("Left" / "Right")
+        handedness_scores: (k,) float32 array of handedness confidences
+        image_size: (width, height) of the frame that was passed in
+        timestamp: time.perf_counter() value when inference started
+        timings: Dictionary of stage name -> milliseconds
+        synthesized: True when the landmarks were extrapolated by the frame
+            scheduler or reused by the motion gate instead of coming from
+            the models
+        people: List of utils.multi_person.Person in multi-person mode
+            (`pose` is then the lowest-id person), otherwise None
+    """
+
+    __slots__ = ('pose', 'hands', 'handedness', 'handedness_scores', 'image_size',
+                 'timestamp', 'timings', 'synthesized', 'people')
+
+    def __init__(self, pose=None, hands=None, handedness=None, handedness_scores=None,
+                 image_size=(0, 0), timestamp=0.0, timings=None, synthesized=False,
+                 people=None):
+        if hands is None:
+            hands = np.empty((0, NUM_HAND_LANDMARKS, 3), dtype=np.float32)
+        if handedness_scores is None:
+            handedness_scores = np.ones(len(hands), dtype=np.float32)
+
+        self.pose = pose
+        self.hands = hands
+        self.handedness = handedness if handedness is not None else ["Hand"] * len(hands)
+        self.handedness_scores = handedness_scores
+        self.image_size = image_size
+        self.timestamp = timestamp
+        self.timings = timings if timings is not None else {}
+        self.synthesized = synthesized
+        self.people = people
+
+    @classmethod
+    def from_mediapipe(cls, pose_results, hand_results, **kwargs):
+        """
+        Build a result from MediaPipe Pose and Hands outputs
+
+        Args:
+            pose_results: MediaPipe pose results
+            hand_results: MediaPipe hands results
+            **kwargs: Remaining PoseResult attributes
+
+        Returns:
+            PoseResult
+        """
+        pose = None
+        if pose_results.pose_landmarks:
+            pose = pose_landmarks_to_array(pose_results.pose_landmarks)
+
+        hand_arrays = []
+        handedness = []
+        scores = []
+        if hand_results.multi_hand_landmarks:
+            for hand_idx, hand_landmarks in enumerate(hand_results.multi_hand_landmarks):
+                hand_arrays.append(hand_landmarks_to_array(hand_landmarks))
+                if hand_results.multi_handedness:
+                    classification = hand_results.multi_handedness[hand_idx].classification[0]
+                    handedness.append(classification.label)
+                    scores.append(classification.score)
+                else:
+                    handedness.append("Hand")
+                    scores.append(1.0)
+
+        hands = None
+        if hand_arrays:
+            hands = np.stack(hand_arrays)
+        return cls(pose=pose, hands=hands, handedness=handedness,
+                   handedness_scores=np.array(scores, dtype=np.float32), **kwargs)
+
+    @property
+    def hands_count(self):
+        return len(self.hands)
+
+    def hand(self, label):
+        """
+        Get the landmarks of the hand with the given handedness
+
+        Returns:
+            (21, 3) array, or None if no such hand was detected
+        """
+        for hand_idx, hand_label in enumerate(self.handedness):
+            if hand_label == label:
+                return self.hands[hand_idx]
+        return None
+
+    def to_dict(self):
+        """
+        Convert to plain Python types for JSON serialization
+
+        Returns:
+            Dictionary with landmark lists, handedness and timings
+        """
+        data = {
+            'pose': self.pose.tolist() if self.pose is not None else None,
+            'hands': [
+                {'handedness': label, 'score': float(score), 'landmarks': hand.tolist()}
+                for label, score, hand in zip(self.handedness, self.handedness_scores, self.hands)
+            ],
+            'image_size': list(self.image_size),
+            'timings': self.timings,
+            'synthesized': self.synthesized,
+        }
+        if self.people is not None:
+            data['people'] = [
+                {'id': person.id, 'box': list(person.box), 'pose': person.pose.tolist(),
+                 'updated': person.updated}
+                for person in self.people
+            ]
+        return data
@@ -0,0 +1,280 @@
+import math
+from itertools import permutations
+
+import numpy as np
+
+from utils.landmark_arrays import NUM_HAND_LANDMARKS, NUM_POSE_LANDMARKS, PoseResult
+
+HAND_TRACKS = ('Left', 'Right')
+
+# Rows of the combined landmark buffer: 33 pose rows, then 21 per hand track
+POSE_ROWS = slice(0, NUM_POSE_LANDMARKS)
+HAND_ROWS = tuple(slice(NUM_POSE_LANDMARKS + i * NUM_HAND_LANDMARKS,
+                        NUM_POSE_LANDMARKS + (i + 1) * NUM_HAND_LANDMARKS)
+                  for i in range(len(HAND_TRACKS)))
+TOTAL_ROWS = NUM_POSE_LANDMARKS + len(HAND_TRACKS) * NUM_HAND_LANDMARKS
+
+
+class OneEuroFilterBank:
+    """
+    One-Euro filters over an (rows, dims) array of signals
+
+    Each value gets a low-pass filter whose cutoff rises with its speed:
+    `min_cutoff` (Hz) removes jitter while still, `beta` lets fast motion
+    through with little lag. Rows can be updated or reset independently.
+    """
+
+    def __init__(self, rows, dims=3, min_cutoff=1.0, beta=60.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._value = np.zeros((rows, dims))
+        self._derivative = np.zeros((rows, dims))
+        self._time = np.full(rows, np.nan)
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self, rows):
+        self._time[rows] = np.nan
+
+    def update(self, values, timestamp, rows):
+        """
+        Filter new measurements for some rows
+
+        Args:
+            values: (n, dims) measurements for `rows`
+            timestamp: Seconds
+            rows: Slice or index array selecting the rows being measured
+
+        Returns:
+            (n, dims) filtered values
+        """
+        values = np.asarray(values, dtype=np.float64)
+        last_time = self._time[rows]
+        fresh = np.isnan(last_time)
+        dt = np.maximum(timestamp - np.where(fresh, timestamp, last_time), 1e-6)[:, None]
+
+        value = self._value[rows]
+        derivative = (values - value) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        derivative = self._derivative[rows] + a_d * (derivative - self._derivative[rows])
+        cutoff = self.min_cutoff + self.beta * np.abs(derivative)
+        a = self._alpha(cutoff, dt)
+        filtered = value + a * (values - value)
+
+        fresh = fresh[:, None]
+        filtered = np.where(fresh, values, filtered)
+        self._value[rows] = filtered
+        self._derivative[rows] = np.where(fresh, 0.0, derivative)
+        self._time[rows] = timestamp
+        return filtered
+
+
+class KalmanFilterBank:
+    """
+    Constant-velocity Kalman filters over an (rows, dims) array of signals
+
+    Every value is an independent [position, velocity] state with white
+    noise acceleration of variance `process_noise` and measurement noise
+    of variance `measurement_noise`. The 2x2 covariances are kept as three
+    arrays so all filters step together without per-value Python loops.
+    """
+
+    def __init__(self, rows, dims=3, process_noise=10.0, measurement_noise=2.5e-5):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self._position = np.zeros((rows, dims))
+        self._velocity = np.zeros((rows, dims))
+        self._p00 = np.zeros((rows, dims))
+        self._p01 = np.zeros((rows, dims))
+        self._p11 = np.zeros((rows, dims))
+        self._time = np.full(rows, np.nan)
+
+    def reset(self, rows):
+        self._time[rows] = np.nan
+
+    def update(self, values, timestamp, rows):
+        """Same interface as OneEuroFilterBank.update"""
+        values = np.asarray(values, dtype=np.float64)
+        last_time = self._time[rows]
+        fresh = np.isnan(last_time)
+        dt = np.maximum(timestamp - np.where(fresh, timestamp, last_time), 1e-6)[:, None]
+
+        # Predict
+        q = self.process_noise
+        position = self._position[rows] + self._velocity[rows] * dt
+        velocity = self._velocity[rows]
+        p00 = (self._p00[rows] + dt * (2 * self._p01[rows] + dt * self._p11[rows])
+               + q * dt ** 4 / 4)
+        p01 = self._p01[rows] + dt * self._p11[rows] + q * dt ** 3 / 2
+        p11 = self._p11[rows] + q * dt ** 2
+
+        # Update with the measured position
+        innovation = values - position
+        s = p00 + self.measurement_noise
+        k0 = p00 / s
+        k1 = p01 / s
+        position = position + k0 * innovation
+        velocity = velocity + k1 * innovation
+        p11 = p11 - k1 * p01
+        p01 = (1 - k0) * p01
+        p00 = (1 - k0) * p00
+
+        fresh = fresh[:, None]
+        self._position[rows] = np.where(fresh, values, position)
+        self._velocity[rows] = np.where(fresh, 0.0, velocity)
+        self._p00[rows] = np.where(fresh, self.measurement_noise, p00)
+        self._p01[rows] = np.where(fresh, 0.0, p01)
+        self._p11[rows] = np.where(fresh, 1.0, p11)
+        self._time[rows] = timestamp
+        return self._position[rows]
+
+
+FILTERS = {'one_euro': OneEuroFilterBank, 'kalman': KalmanFilterBank}
+
+
+class LandmarkSmoother:
+    """
+    Temporal smoothing of pose and hand landmarks as one filter bank
+
+    The 33 pose landmarks and two hand tracks of 21 landmarks are filtered
+    together in a single (75, 3) bank, so each frame is one vectorized
+    update. Hand tracks are 'Left' and 'Right'. Detected hands are matched
+    to tracks by distance to where each track last was, not only by the
+    handedness label, so a frame where MediaPipe flips the label does not
+    swap (and smear) the two hands' filter state; the output keeps the
+    track's label. A track unseen for `reset_after` seconds starts fresh.
+    """
+
+    def __init__(self, method='one_euro', smooth_pose=True, reset_after=0.5,
+                 new_track_distance=0.15, **filter_kwargs):
+        """
+        Args:
+            method: 'one_euro' or 'kalman'
+            smooth_pose: Also filter pose landmarks (MediaPipe's
+                smooth_landmarks already smooths pose in tracking mode)
+            reset_after: Seconds a track may be missing before its state is dropped
+            new_track_distance: Mean landmark distance (normalized units)
+                beyond which a hand is treated as new rather than the
+                continuation of a live track
+            **filter_kwargs: Parameters of the filter class
+        """
+        if method not in FILTERS:
+            raise ValueError(f"Unknown filter method: {method} (expected one of {list(FILTERS)})")
+        self.method = method
+        self.smooth_pose = smooth_pose
+        self.reset_after = reset_after
+        self.new_track_distance = new_track_distance
+        self.bank = FILTERS[method](TOTAL_ROWS, 3, **filter_kwargs)
+        self._last_seen = np.full(1 + len(HAND_TRACKS), -np.inf)
+        self._last_hands = [None] * len(HAND_TRACKS)
+        self.stats = {'frames': 0, 'relabelled_hands': 0, 'track_resets': 0}
+
+    def reset(self):
+        self.bank.reset(slice(None))
+        self._last_seen[:] = -np.inf
+        self._last_hands = [None] * len(HAND_TRACKS)
+
+    def _expire(self, timestamp):
+        for track in range(len(self._last_seen)):
+            if np.isfinite(self._last_seen[track]) and \
+                    timestamp - self._last_seen[track] > self.reset_after:
+                self.bank.reset(POSE_ROWS if track == 0 else HAND_ROWS[track - 1])
+                self._last_seen[track] = -np.inf
+                if track > 0:
+                    self._last_hands[track - 1] = None
+                self.stats['track_resets'] += 1
+
+    def assign_hands(self, hands, handedness):
+        """
+        Match detected hands to hand tracks
+
+        Args:
+            hands: (k, 21, 3) detected hands (k <= 2)
+            handedness: k labels from the detector
+
+        Returns:
+            List of k track indices into HAND_TRACKS
+        """
+        best, best_cost = None, np.inf
+        for tracks in permutations(range(len(HAND_TRACKS)), len(hands)):
+            cost = 0.0
+            for hand, label, track in zip(hands, handedness, tracks):
+                previous = self._last_hands[track]
+                if previous is not None:
+                    cost += float(np.mean(np.linalg.norm(hand - previous, axis=-1)))
+                else:
+                    # Opening a track costs a fixed distance; the label breaks ties
+                    cost += self.new_track_distance + (0.0 if HAND_TRACKS[track] == label else 1e-3)
+            if cost < best_cost:
+                best, best_cost = tracks, cost
+        return list(best)
+
+    def apply(self, result, timestamp=None):
+        """
+        Smooth one inference result
+
+        Args:
+            result: PoseResult (not modified)
+            timestamp: Frame time in seconds (defaults to result.timestamp)
+
+        Returns:
+            New PoseResult with filtered landmarks and stable hand labels
+        """
+        if timestamp is None:
+            timestamp = result.timestamp
+        self.stats['frames'] += 1
+        self._expire(timestamp)
+
+        hands = result.hands[:len(HAND_TRACKS)]
+        handedness = list(result.handedness[:len(HAND_TRACKS)])
+        tracks = self.assign_hands(hands, handedness)
+
+        # One bank update over every row measured this frame
+        row_blocks, values = [], []
+        if result.pose is not None and self.smooth_pose:
+            row_blocks.append(np.arange(POSE_ROWS.start, POSE_ROWS.stop))
+            values.append(result.pose[:, :3])
+        for hand, track in zip(hands, tracks):
+            rows = HAND_ROWS[track]
+            row_blocks.append(np.arange(rows.start, rows.stop))
+            values.append(hand)
+
+        filtered = None
+        if row_blocks:
+            filtered = self.bank.update(np.concatenate(values), timestamp,
+                                        np.concatenate(row_blocks)).astype(np.float32)
+
+        pose = result.pose
+        offset = 0
+        if result.pose is not None:
+            self._last_seen[0] = timestamp
+            if self.smooth_pose:
+                pose = result.pose.copy()
+                pose[:, :3] = filtered[:NUM_POSE_LANDMARKS]
+                offset = NUM_POSE_LANDMARKS
+
+        smoothed_hands = np.empty_like(hands)
+        labels = []
+        for i, track in enumerate(tracks):
+            smoothed_hands[i] = filtered[offset + i * NUM_HAND_LANDMARKS:
+                                         offset + (i + 1) * NUM_HAND_LANDMARKS]
+            self._last_hands[track] = smoothed_hands[i]
+            self._last_seen[1 + track] = timestamp
+            if handedness[i] != HAND_TRACKS[track]:
+                self.stats['relabelled_hands'] += 1
+            labels.append(HAND_TRACKS[track])
+
+        return PoseResult(
+            pose=pose,
+            hands=smoothed_hands,
+            handedness=labels,
+            handedness_scores=result.handedness_scores[:len(hands)],
+            image_size=result.image_size,
+            timestamp=result.timestamp,
+            timings=result.timings,
+            synthesized=result.synthesized
+        )
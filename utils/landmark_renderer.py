@@ -0,0 +1,195 @@
+import cv2
+import numpy as np
+from collections import namedtuple
+
+# Label geometry relative to the landmark pixel (x, y):
+#   text baseline at (x, y - text_offset)
+#   background box from (x - pad_x, baseline - text_height - pad_top)
+#                    to (x + text_width + pad_x, baseline + pad_bottom)
+LabelStyle = namedtuple('LabelStyle', ['font_scale', 'pad_x', 'pad_top', 'pad_bottom',
+                                       'text_offset', 'color', 'bg_color'])
+
+POSE_LABEL_STYLE = LabelStyle(0.5, 5, 0, 5, 10, (255, 255, 255), (0, 0, 0))
+HAND_LABEL_STYLE = LabelStyle(0.4, 2, 3, 2, 5, (255, 255, 255), (50, 50, 50))
+
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+MAX_CACHED_LABELS = 512
+
+
+def _circle_offsets(radius, thickness):
+    """Pixel offsets cv2.circle would touch for a circle centred on (0, 0)"""
+    size = 2 * (radius + max(thickness, 1)) + 1
+    center = size // 2
+    canvas = np.zeros((size, size), dtype=np.uint8)
+    cv2.circle(canvas, (center, center), radius, 255, thickness)
+    ys, xs = np.nonzero(canvas)
+    return ys - center, xs - center
+
+
+def _render_label_sprite(text, style):
+    """
+    Pre-render a label into an opaque box sprite plus overhanging glyph pixels
+
+    Returns:
+        Tuple of (box, dx, dy, overhang) where box is the background box with
+        the text drawn in, (dx, dy) is its top-left corner relative to the
+        landmark pixel, and overhang is (offset_y, offset_x, colors) for text
+        pixels that fall outside the box (descenders), or None
+    """
+    (text_width, text_height), baseline = cv2.getTextSize(text, LABEL_FONT, style.font_scale, 1)
+
+    box_left = -style.pad_x
+    box_right = text_width + style.pad_x
+    box_top = -style.text_offset - text_height - style.pad_top
+    box_bottom = -style.text_offset + style.pad_bottom
+
+    # Render on a canvas large enough for glyphs hanging out of the box
+    margin = baseline + 2
+    left, top = box_left - margin, box_top - margin
+    width = box_right - left + margin + 1
+    height = box_bottom - top + margin + 1
+    canvas = np.zeros((height, width, 3), dtype=np.uint8)
+    glyphs = np.zeros((height, width), dtype=np.uint8)
+
+    box = (slice(box_top - top, box_bottom - top + 1), slice(box_left - left, box_right - left + 1))
+    canvas[box] = style.bg_color
+    origin = (-left, -style.text_offset - top)
+    cv2.putText(canvas, text, origin, LABEL_FONT, style.font_scale, style.color, 1)
+    cv2.putText(glyphs, text, origin, LABEL_FONT, style.font_scale, 255, 1)
+
+    glyphs[box] = 0
+    ys, xs = np.nonzero(glyphs)
+    overhang = None
+    if len(ys):
+        overhang = (ys + top, xs + left, canvas[ys, xs])
+
+    return np.ascontiguousarray(canvas[box]), box_left, box_top, overhang
+
+
+class LandmarkRenderer:
+    """
+    Vectorized renderer for one kind of landmark set (pose or hand)
+
+    Landmarks are passed as an (N, 3) or (N, 4) float array of normalized
+    [x, y, z(, visibility)] rows. Pixel coordinates and visibility masks are
+    computed for all landmarks at once, every skeleton connection is drawn
+    with a single cv2.polylines call, and points are stamped with one NumPy
+    scatter using pre-rendered circle offsets. Label text is rendered once
+    into cached sprites, so per-frame label cost is a slice copy per label.
+    """
+
+    def __init__(self, connections, skeleton_color, point_color, point_radius,
+                 point_outline_color=None, line_thickness=2,
+                 label_style=POSE_LABEL_STYLE, visibility_threshold=0.5):
+        connections = np.array(sorted(connections), dtype=np.intp).reshape(-1, 2)
+        self.connection_starts = connections[:, 0]
+        self.connection_ends = connections[:, 1]
+
+        self.skeleton_color = skeleton_color
+        self.point_color = np.array(point_color, dtype=np.uint8)
+        self.point_outline_color = None
+        if point_outline_color is not None:
+            self.point_outline_color = np.array(point_outline_color, dtype=np.uint8)
+        self.line_thickness = line_thickness
+        self.label_style = label_style
+        self.visibility_threshold = visibility_threshold
+
+        self._fill_offsets = _circle_offsets(point_radius, -1)
+        self._outline_offsets = _circle_offsets(point_radius, 1)
+        self._label_cache = {}
+
+    def pixel_coordinates(self, landmarks, image_width, image_height):
+        """
+        Convert normalized landmarks to pixel coordinates and a visibility mask
+
+        Returns:
+            Tuple of ((N, 2) int32 pixel array, (N,) bool visibility mask)
+        """
+        # MediaPipe landmarks are float32; scaling in float64 truncates to the
+        # same pixels as int(landmark.x * width) on the protobuf values
+        scale = np.array((image_width, image_height), dtype=np.float64)
+        points = (landmarks[:, :2] * scale).astype(np.int32)
+        if self.visibility_threshold is not None and landmarks.shape[1] >= 4:
+            visible = landmarks[:, 3] > self.visibility_threshold
+        else:
+            visible = np.ones(len(landmarks), dtype=bool)
+        return points, visible
+
+    def render(self, image, landmarks, labels=None,
+               draw_skeleton=True, draw_points=True, draw_labels=True):
+        """
+        Draw landmarks, connections and labels on the image
+
+        Args:
+            image: Image to draw on (BGR, modified in place)
+            landmarks: (N, 3) or (N, 4) normalized landmark array
+            labels: Optional dictionary of landmark index -> label text
+            draw_skeleton: Whether to draw skeleton connections
+            draw_points: Whether to draw landmark points
+            draw_labels: Whether to draw labels
+
+        Returns:
+            The image
+        """
+        image_height, image_width = image.shape[:2]
+        points, visible = self.pixel_coordinates(landmarks, image_width, image_height)
+
+        if draw_skeleton:
+            drawn = visible[self.connection_starts] & visible[self.connection_ends]
+            if drawn.any():
+                segments = np.stack((points[self.connection_starts[drawn]],
+                                     points[self.connection_ends[drawn]]), axis=1)
+                cv2.polylines(image, segments, False, self.skeleton_color, self.line_thickness)
+
+        if draw_points:
+            visible_points = points[visible]
+            self._stamp(image, visible_points, self._fill_offsets, self.point_color)
+            if self.point_outline_color is not None:
+                self._stamp(image, visible_points, self._outline_offsets, self.point_outline_color)
+
+        if draw_labels and labels:
+            for landmark_id, text in labels.items():
+                if landmark_id < len(points) and visible[landmark_id]:
+                    x, y = points[landmark_id]
+                    self._blit_label(image, text, int(x), int(y))
+
+        return image
+
+    @staticmethod
+    def _stamp(image, points, offsets, color):
+        """Scatter one pre-rendered circle shape onto every point at once"""
+        if len(points) == 0:
+            return
+        offset_y, offset_x = offsets
+        ys = (points[:, 1:2] + offset_y).ravel()
+        xs = (points[:, 0:1] + offset_x).ravel()
+        inside = (ys >= 0) & (ys < image.shape[0]) & (xs >= 0) & (xs < image.shape[1])
+        image[ys[inside], xs[inside]] = color
+
+    def _label_sprite(self, text):
+        sprite = self._label_cache.get(text)
+        if sprite is None:
+            if len(self._label_cache) >= MAX_CACHED_LABELS:
+                self._label_cache.clear()
+            sprite = _render_label_sprite(text, self.label_style)
+            self._label_cache[text] = sprite
+        return sprite
+
+    def _blit_label(self, image, text, x, y):
+        """Copy a cached label sprite onto the image, clipped to its bounds"""
+        box, dx, dy, overhang = self._label_sprite(text)
+        image_height, image_width = image.shape[:2]
+
+        x0, y0 = x + dx, y + dy
+        x1, y1 = x0 + box.shape[1], y0 + box.shape[0]
+        cx0, cy0 = max(x0, 0), max(y0, 0)
+        cx1, cy1 = min(x1, image_width), min(y1, image_height)
+        if cx0 < cx1 and cy0 < cy1:
+            image[cy0:cy1, cx0:cx1] = box[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0]
+
+        if overhang is not None:
+            offset_y, offset_x, colors = overhang
+            ys = offset_y + y
+            xs = offset_x + x
+            inside = (ys >= 0) & (ys < image_height) & (xs >= 0) & (xs < image_width)
+            image[ys[inside], xs[inside]] = colors[inside]
@@ -0,0 +1,292 @@
+import os
+import struct
+import time
+
+import numpy as np
+
+# On-disk layout (little endian):
+#
+#   header  64 bytes  magic, version, header size, record size, frame count,
+#                     fps, creation time (see HEADER_FORMAT)
+#   records N * RECORD_DTYPE.itemsize bytes, one fixed-stride record per frame
+#
+# Every record has the same size, so the file can be appended to while
+# recording and memory-mapped as a NumPy record array afterwards. Each
+# field (timestamp, pose, hands) is then a zero-copy strided float view,
+# and timestamps are monotonic so they double as the time index.
+# Missing detections are stored as NaN.
+
+MAGIC = b'BVLMTL01'
+VERSION = 1
+HEADER_FORMAT = '<8sHHIQdd'
+HEADER_SIZE = 64
+TIMELINE_EXTENSION = '.bvlm'
+
+# Hand slots in the hands field, indexed by handedness
+HAND_SLOTS = {'Left': 0, 'Right': 1}
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('frame_index', '<i8'),
+    ('pose', '<f4', (33, 4)),
+    ('hands', '<f4', (2, 21, 3)),
+])
+
+
+def _pack_header(frame_count, fps, created):
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE,
+                         RECORD_DTYPE.itemsize, frame_count, fps, created)
+    return header.ljust(HEADER_SIZE, b'\0')
+
+
+def _read_header(handle):
+    raw = handle.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError("File is too short to be a landmark timeline")
+    magic, version, header_size, record_size, frame_count, fps, created = \
+        struct.unpack_from(HEADER_FORMAT, raw)
+    if magic != MAGIC:
+        raise ValueError("Not a landmark timeline file")
+    if version != VERSION or header_size != HEADER_SIZE or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Unsupported landmark timeline version {version}")
+    return frame_count, fps, created
+
+
+def _fill_record(record, timestamp, pose, hands, handedness, frame_index):
+    record['timestamp'] = timestamp
+    record['frame_index'] = frame_index
+    record['pose'] = np.nan if pose is None else pose
+    record['hands'] = np.nan
+    if hands is not None:
+        free = [0, 1]
+        for hand_idx, hand in enumerate(hands[:2]):
+            slot = hand_idx
+            if handedness is not None and hand_idx < len(handedness):
+                slot = HAND_SLOTS.get(handedness[hand_idx], hand_idx)
+            # Two hands with the same label (a mislabelled frame) must not
+            # overwrite each other: the second one takes the remaining slot
+            if slot not in free:
+                slot = free[0]
+            free.remove(slot)
+            record['hands'][slot] = hand
+
+
+def records_from_results(results, timestamps=None):
+    """
+    Pack PoseResults into an array of timeline records
+
+    Args:
+        results: List of PoseResult (None entries become all-NaN records)
+        timestamps: Optional per-result timestamps (defaults to result.timestamp)
+
+    Returns:
+        Array of RECORD_DTYPE with frame_index set to the list position
+    """
+    records = np.empty(len(results), dtype=RECORD_DTYPE)
+    for idx, result in enumerate(results):
+        if result is None:
+            timestamp = timestamps[idx] if timestamps is not None else np.nan
+            _fill_record(records[idx], timestamp, None, None, None, idx)
+            continue
+        timestamp = timestamps[idx] if timestamps is not None else result.timestamp
+        _fill_record(records[idx], timestamp, result.pose, result.hands, result.handedness, idx)
+    return records
+
+
+class TimelineWriter:
+    """
+    Streaming writer for landmark timeline files
+
+    Records are buffered in memory and written in blocks; the frame count
+    in the header is rewritten on every flush, so a file cut short by a
+    crash still opens with everything up to the last flush.
+    """
+
+    def __init__(self, path, fps=0.0, buffer_frames=256):
+        self.path = path
+        self.fps = fps
+        self.frame_count = 0
+        self._created = time.time()
+        self._buffer = np.empty(buffer_frames, dtype=RECORD_DTYPE)
+        self._buffered = 0
+        self._handle = open(path, 'wb')
+        self._handle.write(_pack_header(0, fps, self._created))
+
+    def append(self, timestamp, pose=None, hands=None, handedness=None, frame_index=-1):
+        """
+        Append one frame
+
+        Args:
+            timestamp: Frame time in seconds (must not decrease)
+            pose: (33, 4) pose array or None
+            hands: (k, 21, 3) hand arrays
+            handedness: List of k labels used to place hands in their slots;
+                without it hands fill the slots in order
+            frame_index: Source frame number, -1 if unknown
+        """
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+        _fill_record(self._buffer[self._buffered], timestamp, pose, hands, handedness, frame_index)
+        self._buffered += 1
+
+    def append_result(self, result, timestamp=None, frame_index=-1):
+        """
+        Append a PoseResult from PoseEstimator.infer()
+
+        Args:
+            result: PoseResult
+            timestamp: Frame time in seconds (defaults to result.timestamp)
+            frame_index: Source frame number, -1 if unknown
+        """
+        self.append(result.timestamp if timestamp is None else timestamp,
+                    pose=result.pose, hands=result.hands,
+                    handedness=result.handedness, frame_index=frame_index)
+
+    def append_records(self, records):
+        """Append an array of RECORD_DTYPE records (e.g. from another timeline)"""
+        self.flush()
+        np.ascontiguousarray(records, dtype=RECORD_DTYPE).tofile(self._handle)
+        self.frame_count += len(records)
+        self._write_frame_count()
+
+    def flush(self):
+        """Write buffered records and update the header frame count"""
+        if self._buffered:
+            self._buffer[:self._buffered].tofile(self._handle)
+            self.frame_count += self._buffered
+            self._buffered = 0
+        self._write_frame_count()
+
+    def _write_frame_count(self):
+        position = self._handle.tell()
+        self._handle.seek(0)
+        self._handle.write(_pack_header(self.frame_count, self.fps, self._created))
+        self._handle.seek(position)
+        self._handle.flush()
+
+    def close(self):
+        if self._handle.closed:
+            return
+        self.flush()
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class TimelineReader:
+    """
+    Memory-mapped reader for landmark timeline files
+
+    Nothing is loaded up front: `pose`, `hands` and `timestamps` are views
+    into the mapped file, and slicing them (or using `slice_time`) only
+    touches the pages that are actually read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as handle:
+            header_count, self.fps, self.created = _read_header(handle)
+
+        # Trust the file size over the header if a write was interrupted
+        stored = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        self.frame_count = min(header_count, stored) if header_count else stored
+
+        if self.frame_count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r',
+                                     offset=HEADER_SIZE, shape=(self.frame_count,))
+        else:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return self.frame_count
+
+    @property
+    def timestamps(self):
+        return self.records['timestamp']
+
+    @property
+    def frame_indices(self):
+        return self.records['frame_index']
+
+    @property
+    def pose(self):
+        """(N, 33, 4) view of pose landmarks"""
+        return self.records['pose']
+
+    @property
+    def hands(self):
+        """(N, 2, 21, 3) view of hand landmarks (left slot 0, right slot 1)"""
+        return self.records['hands']
+
+    @property
+    def duration(self):
+        if self.frame_count == 0:
+            return 0.0
+        return float(self.timestamps[-1] - self.timestamps[0])
+
+    def time_range(self, start=None, end=None):
+        """
+        Find the record index range covering [start, end) seconds
+
+        Returns:
+            (first, last) indices suitable for slicing
+        """
+        timestamps = self.timestamps
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        last = self.frame_count if end is None else int(np.searchsorted(timestamps, end, side='left'))
+        return first, last
+
+    def slice_time(self, start=None, end=None):
+        """
+        Get the records between two timestamps without copying
+
+        Args:
+            start: Start time in seconds (inclusive), None for the beginning
+            end: End time in seconds (exclusive), None for the end
+
+        Returns:
+            Record array view; use ['pose'] / ['hands'] / ['timestamp']
+        """
+        first, last = self.time_range(start, end)
+        return self.records[first:last]
+
+    def close(self):
+        """
+        Release the reader's reference to the mapping
+
+        The mapping itself is freed by numpy once the last view taken from
+        this reader (`slice_time`, `pose`, ...) is gone, so those views stay
+        readable after the reader is closed.
+        """
+        self.records = np.empty(0, dtype=RECORD_DTYPE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def concatenate_timelines(paths, output_path, fps=0.0):
+    """
+    Join timeline files end to end into a new file
+
+    Records are copied in blocks straight from the memory maps, so memory
+    use stays bounded regardless of file size.
+
+    Returns:
+        Number of frames written
+    """
+    with TimelineWriter(output_path, fps=fps) as writer:
+        for path in paths:
+            with TimelineReader(path) as reader:
+                for start in range(0, len(reader), 65536):
+                    writer.append_records(reader.records[start:start + 65536])
+        return writer.frame_count
@@ -0,0 +1,217 @@
+import random
+import threading
+from bisect import bisect_left
+
+# Latency bucket upper bounds in seconds (100 us .. 10 s, denser around one frame)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.0075, 0.01, 0.015,
+                   0.02, 0.025, 0.033, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# PoseResult.timings keys and the stage each one is recorded as
+TIMING_STAGES = {
+    'convert_ms': 'convert',
+    'pose_ms': 'pose',
+    'hands_ms': 'hands',
+    'smooth_ms': 'smooth',
+    'queue_ms': 'queue',
+    'decode_ms': 'decode',
+    'propose_ms': 'propose',
+    'total_ms': 'inference',
+}
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in items)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + '}'
+
+
+class Counter:
+    """Monotonic count (requests, frames); name it with a _total suffix"""
+
+    kind = 'counter'
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        return [(name, _format_labels(labels), self.value)]
+
+
+class Gauge:
+    """Current value (store sizes, queue depth), set by the owner"""
+
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self, name, labels):
+        return [(name, _format_labels(labels), self.value)]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram
+
+    Observations are counted into buckets, so recording is O(log buckets)
+    with no per-sample storage, and percentiles are estimated by linear
+    interpolation inside a bucket like Prometheus' histogram_quantile().
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q):
+        """
+        Estimate the q-quantile (0..1) of the observed values
+
+        Returns:
+            Estimated value, or 0.0 before any observation
+        """
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if total == 0:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                return lower + (self.bounds[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.bounds[-1]
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts = list(self.counts)
+            total, value_sum = self.count, self.sum
+        rows = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float('inf'),), counts):
+            cumulative += count
+            rows.append((f'{name}_bucket', _format_labels(labels, ('le', _format_value(bound))),
+                         cumulative))
+        rows.append((f'{name}_sum', _format_labels(labels), value_sum))
+        rows.append((f'{name}_count', _format_labels(labels), total))
+        return rows
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges and histograms with Prometheus text output
+
+    Hot paths ask sample() once per event and only time it when it
+    returns True: every event at sample_rate 1.0, a random fraction below
+    that (random rather than every Nth, so stages sampled in lockstep on
+    the same frames cannot alias), and none at 0. Counters are cheap and
+    always counted; histograms hold the sampled events only.
+    """
+
+    def __init__(self, namespace='bodyvision', sample_rate=1.0):
+        self.namespace = namespace
+        self._metrics = {}
+        self._help = {}
+        self._lock = threading.Lock()
+        self.set_sample_rate(sample_rate)
+
+    def set_sample_rate(self, sample_rate):
+        """Time every event (1.0), that fraction of events, or none (0)"""
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def sample(self):
+        """Whether the current event should be timed"""
+        if self.sample_rate >= 1.0:
+            return True
+        return random.random() < self.sample_rate
+
+    def _get(self, cls, name, help_text, labels, *args):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = cls(*args)
+                    self._metrics[key] = metric
+                    self._help.setdefault(name, (cls.kind, help_text))
+        return metric
+
+    def counter(self, name, help_text='', **labels):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text='', **labels):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text='', buckets=LATENCY_BUCKETS, **labels):
+        return self._get(Histogram, name, help_text, labels, buckets)
+
+    def observe_stage(self, stage, seconds):
+        """Record one run of a hot-path stage"""
+        self.histogram('stage_seconds', 'Latency of each processing stage',
+                       stage=stage).observe(seconds)
+
+    def observe_timings(self, timings):
+        """Record the stages of a PoseResult.timings dictionary"""
+        for key, stage in TIMING_STAGES.items():
+            value = timings.get(key)
+            if value is not None:
+                self.observe_stage(stage, value / 1000.0)
+
+    def stage_histograms(self):
+        """Dictionary of stage name -> Histogram, in first-recorded order"""
+        return {dict(labels)['stage']: metric for (name, labels), metric in list(self._metrics.items())
+                if name == 'stage_seconds'}
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        by_name = {}
+        for (name, labels), metric in list(self._metrics.items()):
+            by_name.setdefault(name, []).append((labels, metric))
+
+        lines = []
+        for name, metrics in by_name.items():
+            full_name = f'{self.namespace}_{name}'
+            kind, help_text = self._help[name]
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} {kind}')
+            for labels, metric in metrics:
+                for sample_name, label_text, value in metric.samples(full_name, labels):
+                    lines.append(f'{sample_name}{label_text} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,192 @@
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from utils.landmark_arrays import PoseResult
+
+
+class MotionGate:
+    """
+    Skip inference on frames where nothing moved
+
+    A cheap pre-stage for mostly static scenes (an empty gym, a kiosk):
+    each frame is subsampled to a ~`width` px blurred grayscale thumbnail
+    and compared with the thumbnail of the last inferred frame. When less
+    than `threshold` of the pixels changed by more than `pixel_delta`, the
+    last result is reused instead of running the models.
+
+    While a person is in view the models still run at least every
+    `refresh_after` seconds. After `idle_after` seconds without a person
+    the gate goes idle, and then only motion or an idle probe every
+    `probe_interval` seconds runs them. Wake latency is measured from the
+    first frame that triggered inference while idle to the end of the
+    inference that found a person.
+    """
+
+    ACTIVE = 'active'
+    IDLE = 'idle'
+
+    def __init__(self, threshold=0.005, pixel_delta=20, width=96, refresh_after=0.5,
+                 idle_after=3.0, probe_interval=2.0):
+        """
+        Args:
+            threshold: Fraction of thumbnail pixels that must change to count as motion
+            pixel_delta: Grey level change (0-255) for a pixel to count as changed
+            width: Approximate thumbnail width in pixels
+            refresh_after: Longest reuse of a result while a person is in view (seconds)
+            idle_after: Seconds without a person before the gate goes idle
+            probe_interval: Seconds between inferences while idle and still
+        """
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.width = width
+        self.refresh_after = refresh_after
+        self.idle_after = idle_after
+        self.probe_interval = probe_interval
+
+        self.state = self.ACTIVE
+        self.motion = 0.0
+        self._thumbnail = None
+        self._reference = None
+        self._latest = None
+        self._last_inference = -np.inf
+        self._last_person = time.perf_counter()
+        self._wake_start = None
+        self.wake_latencies = deque(maxlen=100)
+        self.stats = {'frames': 0, 'inferred': 0, 'reused': 0, 'probes': 0, 'idle_frames': 0,
+                      'wakes': 0}
+
+    def reset(self):
+        self.state = self.ACTIVE
+        self._reference = None
+        self._latest = None
+        self._last_person = time.perf_counter()
+        self._wake_start = None
+
+    def _make_thumbnail(self, image):
+        # Strided subsampling instead of a full-frame resize: the gate must
+        # cost far less than the models it is skipping
+        step = max(1, image.shape[1] // self.width)
+        small = np.ascontiguousarray(image[::step, ::step])
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def should_infer(self, image, timestamp=None):
+        """
+        Check whether a frame needs the models
+
+        Args:
+            image: Input frame (BGR format)
+            timestamp: Frame time in time.perf_counter() seconds (defaults to now)
+
+        Returns:
+            True to run inference, False to reuse the last result (see reuse())
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        self.stats['frames'] += 1
+
+        if self.state == self.ACTIVE and timestamp - self._last_person >= self.idle_after:
+            self.state = self.IDLE
+
+        self._thumbnail = self._make_thumbnail(image)
+        if self._latest is None or self._reference is None or \
+                self._thumbnail.shape != self._reference.shape:
+            self.motion = 1.0
+        else:
+            changed = cv2.absdiff(self._thumbnail, self._reference) > self.pixel_delta
+            self.motion = float(np.count_nonzero(changed)) / changed.size
+        moving = self.motion >= self.threshold
+
+        since_inference = timestamp - self._last_inference
+        if self.state == self.IDLE:
+            self.stats['idle_frames'] += 1
+            probe = not moving and since_inference >= self.probe_interval
+            infer = moving or probe
+            if infer and self._wake_start is None:
+                self._wake_start = timestamp
+            elif not infer:
+                # The motion stopped without anyone being found
+                self._wake_start = None
+            if probe:
+                self.stats['probes'] += 1
+        else:
+            infer = moving or since_inference >= self.refresh_after
+
+        if not infer:
+            self.stats['reused'] += 1
+        return infer
+
+    def record(self, result, timestamp=None):
+        """
+        Store the result of a frame that was inferred
+
+        Args:
+            result: PoseResult from the models
+            timestamp: Frame time in time.perf_counter() seconds (defaults to now)
+
+        Returns:
+            Wake latency in seconds when this result ended the idle state, else None
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        self.stats['inferred'] += 1
+        self._reference = self._thumbnail
+        self._latest = result
+        self._last_inference = timestamp
+
+        if result.pose is None and not result.hands_count:
+            return None
+        self._last_person = timestamp
+        if self.state != self.IDLE:
+            return None
+        self.state = self.ACTIVE
+        self.stats['wakes'] += 1
+        wake = None
+        if self._wake_start is not None:
+            wake = time.perf_counter() - self._wake_start
+            self.wake_latencies.append(wake)
+            self._wake_start = None
+        return wake
+
+    def reuse(self, timestamp=None):
+        """
+        The last inferred result, restamped for a gated frame
+
+        Returns:
+            PoseResult with `synthesized` set
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        latest = self._latest
+        return PoseResult(
+            pose=latest.pose,
+            hands=latest.hands,
+            handedness=list(latest.handedness),
+            handedness_scores=latest.handedness_scores,
+            image_size=latest.image_size,
+            timestamp=timestamp,
+            synthesized=True,
+            people=latest.people
+        )
+
+    def get_stats(self):
+        """
+        Get gate counters
+
+        Returns:
+            Dictionary with frame counts, the current state and motion level,
+            and the last / mean / max wake latency in milliseconds
+        """
+        wakes = np.array(self.wake_latencies) * 1000.0
+        return {
+            **self.stats,
+            'state': self.state,
+            'motion': self.motion,
+            'wake_ms_last': float(wakes[-1]) if len(wakes) else None,
+            'wake_ms_mean': float(wakes.mean()) if len(wakes) else None,
+            'wake_ms_max': float(wakes.max()) if len(wakes) else None,
+        }
@@ -0,0 +1,395 @@
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from utils.landmark_arrays import NUM_POSE_LANDMARKS
+
+# One person in a multi-person result. `box` is (x0, y0, x1, y1) and `pose`
+# is (33, 4) [x, y, z, visibility], both normalized to the full frame;
+# `updated` is False when the pose was extrapolated instead of inferred
+Person = namedtuple('Person', ['id', 'box', 'pose', 'updated'])
+
+
+def box_iou(a, b):
+    """Intersection over union of two (x0, y0, x1, y1) boxes"""
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    intersection = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def box_from_pose(pose, image_width, image_height, visibility_threshold=0.5):
+    """
+    Pixel box around a person's visible pose landmarks
+
+    Returns:
+        (x0, y0, x1, y1) array, or None with fewer than 4 visible landmarks
+    """
+    visible = pose[:, 3] >= visibility_threshold
+    if np.count_nonzero(visible) < 4:
+        return None
+    xy = pose[visible, :2] * (image_width, image_height)
+    x0, y0 = xy.min(axis=0)
+    x1, y1 = xy.max(axis=0)
+    # Landmarks sit on joints: leave room for the head, hands and feet
+    w, h = x1 - x0, y1 - y0
+    pad = 0.15 * max(w, h)
+    return np.array((x0 - pad, y0 - pad * 1.5, x1 + pad, y1 + pad * 0.5))
+
+
+class PersonProposer:
+    """
+    Candidate person boxes for people not tracked yet
+
+    Two cheap sources run on a downscaled frame: frame differencing
+    (MOG2 background subtraction, every frame, so moving people are
+    found within a few frames) and OpenCV's HOG people detector (every
+    `detect_interval` frames, for people standing still).
+    """
+
+    def __init__(self, motion_width=160, detect_width=480, detect_interval=15,
+                 min_area=0.01, use_hog=True):
+        """
+        Args:
+            motion_width: Width of the frame used for background subtraction
+            detect_width: Width of the frame the HOG detector runs on; people
+                must be at least 128 px tall at this scale
+            detect_interval: Frames between HOG detector runs
+            min_area: Smallest motion blob kept, as a fraction of the frame
+            use_hog: Run the HOG detector at all
+        """
+        self.motion_width = motion_width
+        self.detect_width = detect_width
+        self.detect_interval = detect_interval
+        self.min_area = min_area
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self._hog = None
+        if use_hog:
+            self._hog = cv2.HOGDescriptor()
+            self._hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+        self.reset()
+
+    def reset(self):
+        """Forget the background model (e.g. when a new video starts)"""
+        self._background = cv2.createBackgroundSubtractorMOG2(history=200, detectShadows=False)
+        self._frame_index = 0
+
+    def propose(self, image_rgb):
+        """
+        Find candidate person boxes in an RGB frame
+
+        Returns:
+            List of (x0, y0, x1, y1) pixel boxes
+        """
+        height, width = image_rgb.shape[:2]
+        boxes = self._motion_boxes(image_rgb, width, height)
+        if self._hog is not None and self._frame_index % self.detect_interval == 0:
+            boxes += self._hog_boxes(image_rgb, width, height)
+        self._frame_index += 1
+        return boxes
+
+    def _motion_boxes(self, image_rgb, width, height):
+        scale = self.motion_width / width
+        small = cv2.resize(image_rgb, (self.motion_width, max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        mask = self._background.apply(cv2.cvtColor(small, cv2.COLOR_RGB2GRAY))
+        # Skip the first frames while the background model is still empty
+        if self._frame_index < 5:
+            return []
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+        mask = cv2.dilate(mask, self._kernel, iterations=3)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        min_area = self.min_area * mask.shape[0] * mask.shape[1]
+        boxes = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w * h >= min_area:
+                boxes.append(np.array((x, y, x + w, y + h)) / scale)
+        return boxes
+
+    def _hog_boxes(self, image_rgb, width, height):
+        scale = min(1.0, self.detect_width / width)
+        small = cv2.resize(image_rgb, (int(width * scale), int(height * scale)),
+                           interpolation=cv2.INTER_AREA) if scale < 1.0 else image_rgb
+        rects, _ = self._hog.detectMultiScale(small, winStride=(8, 8), padding=(8, 8), scale=1.05)
+        return [np.array((x, y, x + w, y + h)) / scale for x, y, w, h in rects]
+
+
+class PersonTrack:
+    """One tracked person: stable id, pixel box and landmark motion"""
+
+    def __init__(self, track_id, box, pose, timestamp):
+        self.id = track_id
+        self.box = box
+        self.pose = pose
+        self.velocity = np.zeros((NUM_POSE_LANDMARKS, 2))
+        self.updated_at = timestamp
+        self.frames_since_update = 0
+        self.misses = 0
+
+    def update(self, box, pose, timestamp):
+        dt = timestamp - self.updated_at
+        if dt > 0:
+            velocity = (pose[:, :2] - self.pose[:, :2]) / dt
+            self.velocity = 0.5 * self.velocity + 0.5 * velocity
+        self.box = box
+        self.pose = pose
+        self.updated_at = timestamp
+        self.frames_since_update = 0
+        self.misses = 0
+
+    @property
+    def speed(self):
+        """Mean landmark speed in normalized units per second"""
+        return float(np.mean(np.linalg.norm(self.velocity, axis=1)))
+
+    def predicted_pose(self, timestamp, max_extrapolation=0.25):
+        """Pose extrapolated to `timestamp` (at most `max_extrapolation` seconds ahead)"""
+        dt = min(max(timestamp - self.updated_at, 0.0), max_extrapolation)
+        if dt == 0.0:
+            return self.pose
+        pose = self.pose.copy()
+        pose[:, :2] += (self.velocity * dt).astype(pose.dtype)
+        return pose
+
+
+class CropScheduler:
+    """
+    Chooses which person crops run through the pose model each frame
+
+    At most `max_crops` crops run per frame; with `budget_ms` the count is
+    lowered further from the measured per-crop latency. New people get up
+    to half the slots (at least one), then tracked people go stalest
+    first, weighted by how fast they move, so with more people than slots
+    every person is refreshed round-robin and moving people more often.
+    While anyone is tracked at least one slot is kept for tracks; with a
+    single slot, frames alternate between new people and the stalest
+    track, so a proposal that keeps reappearing cannot starve tracked
+    people. People not refreshed in a frame have their pose extrapolated.
+    """
+
+    def __init__(self, max_crops=2, budget_ms=None):
+        self.max_crops = max_crops
+        self.budget_ms = budget_ms
+        self.crop_ms = None
+        self._proposal_turn = False
+
+    def record(self, crop_ms):
+        """Feed back the latency of one crop"""
+        self.crop_ms = crop_ms if self.crop_ms is None else 0.8 * self.crop_ms + 0.2 * crop_ms
+
+    def slots(self):
+        if self.budget_ms is None or self.crop_ms is None:
+            return self.max_crops
+        return int(min(max(self.budget_ms // max(self.crop_ms, 1e-3), 1), self.max_crops))
+
+    def select(self, tracks, proposals):
+        """
+        Pick this frame's crops
+
+        Args:
+            tracks: Live PersonTracks
+            proposals: Pixel boxes of people not tracked yet
+
+        Returns:
+            List of (PersonTrack or None, pixel box) jobs
+        """
+        slots = self.slots()
+        if not tracks:
+            proposal_slots = slots
+        elif slots >= 2:
+            proposal_slots = slots // 2
+        elif proposals:
+            self._proposal_turn = not self._proposal_turn
+            proposal_slots = 1 if self._proposal_turn else 0
+        else:
+            proposal_slots = 0
+        jobs = [(None, box) for box in proposals[:proposal_slots]]
+        ranked = sorted(tracks, key=lambda t: (t.frames_since_update + 1) * (1.0 + t.speed),
+                        reverse=True)
+        jobs += [(track, track.box) for track in ranked[:slots - len(jobs)]]
+        return jobs[:slots]
+
+
+class MultiPersonTracker:
+    """
+    Multi-person pose from a single-person pose model run on person crops
+
+    Each frame: proposals for untracked people come from PersonProposer,
+    CropScheduler picks a budgeted set of crops (new people and the
+    stalest tracks), and the pose model runs on each crop, resized to at
+    most `crop_size` px. The cost per frame is bounded by the crop budget
+    plus the cheap proposal pass, so it grows with the update interval
+    rather than with the number of people. Tracks keep their id while
+    their crops keep finding a pose; `max_misses` failed crops in a row
+    or `stale_after` seconds without an update drop a track. When nothing
+    is proposed the whole frame, with tracked people blanked out, is
+    searched instead: every frame while nobody is tracked (the
+    single-person pipeline) and every `discover_interval` frames after,
+    so people standing still are found even when the detectors miss them.
+    """
+
+    def __init__(self, max_people=4, max_crops=2, budget_ms=None, crop_size=256,
+                 crop_margin=0.2, max_misses=3, stale_after=2.0, discover_interval=10,
+                 proposer=None):
+        self.max_people = max_people
+        self.crop_size = crop_size
+        self.crop_margin = crop_margin
+        self.max_misses = max_misses
+        self.stale_after = stale_after
+        self.discover_interval = discover_interval
+        self.proposer = proposer if proposer is not None else PersonProposer()
+        self.scheduler = CropScheduler(max_crops=max_crops, budget_ms=budget_ms)
+        self.tracks = []
+        self._next_id = 1
+        self.stats = {'frames': 0, 'crops': 0, 'proposals': 0, 'full_frame': 0,
+                      'tracks_created': 0, 'tracks_dropped': 0}
+
+    def reset(self):
+        self.tracks = []
+        self.proposer.reset()
+
+    def _new_proposals(self, boxes):
+        """Proposals that do not overlap a tracked person, largest first"""
+        fresh = []
+        for box in sorted(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]), reverse=True):
+            if all(box_iou(box, track.box) < 0.3 for track in self.tracks) and \
+                    all(box_iou(box, other) < 0.5 for other in fresh):
+                fresh.append(box)
+        return fresh[:max(0, self.max_people - len(self.tracks))]
+
+    def _crop(self, image_rgb, box, masked=()):
+        """
+        Expanded crop of a box, clipped to the frame and downscaled to crop_size
+
+        Args:
+            image_rgb: RGB frame
+            box: Pixel box to crop around
+            masked: Pixel boxes blanked out in the crop (people already tracked)
+
+        Returns:
+            Tuple of (crop, (x0, y0, x1, y1) region), or (None, None) when
+            the region is too small
+        """
+        height, width = image_rgb.shape[:2]
+        w, h = box[2] - box[0], box[3] - box[1]
+        margin = self.crop_margin * max(w, h)
+        x0 = int(max(box[0] - margin, 0))
+        y0 = int(max(box[1] - margin, 0))
+        x1 = int(min(box[2] + margin, width))
+        y1 = int(min(box[3] + margin, height))
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None, None
+        crop = image_rgb[y0:y1, x0:x1]
+        if len(masked):
+            crop = crop.copy()
+            for mx0, my0, mx1, my1 in masked:
+                crop[max(int(my0) - y0, 0):max(int(my1) - y0, 0),
+                     max(int(mx0) - x0, 0):max(int(mx1) - x0, 0)] = 0
+        scale = self.crop_size / max(x1 - x0, y1 - y0)
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, int((x1 - x0) * scale)), max(1, int((y1 - y0) * scale))),
+                              interpolation=cv2.INTER_AREA)
+        return np.ascontiguousarray(crop), (x0, y0, x1, y1)
+
+    def process(self, image_rgb, run_pose, timestamp):
+        """
+        Update all people for one frame
+
+        Args:
+            image_rgb: RGB frame
+            run_pose: Callable taking an RGB crop and returning (33, 4)
+                crop-normalized landmarks or None
+            timestamp: Frame time in seconds
+
+        Returns:
+            Tuple of (list of Person sorted by id, timings dictionary with
+            'propose_ms' and 'pose_ms')
+        """
+        height, width = image_rgb.shape[:2]
+        self.stats['frames'] += 1
+        for track in self.tracks:
+            track.frames_since_update += 1
+
+        start = time.perf_counter()
+        proposals = self._new_proposals(self.proposer.propose(image_rgb))
+        # Nothing proposed: search the whole frame with tracked people blanked
+        # out, every frame while nobody is tracked, else every discover_interval
+        if not proposals and len(self.tracks) < self.max_people and \
+                (not self.tracks or self.stats['frames'] % self.discover_interval == 0):
+            proposals = [np.array((0.0, 0.0, width, height))]
+            self.stats['full_frame'] += 1
+        self.stats['proposals'] += len(proposals)
+        propose_ms = (time.perf_counter() - start) * 1000.0
+
+        pose_ms = 0.0
+        for track, box in self.scheduler.select(self.tracks, proposals):
+            # A new person's crop must not lock onto someone already tracked
+            masked = [t.box for t in self.tracks] if track is None else ()
+            crop, region = self._crop(image_rgb, box, masked)
+            if crop is None:
+                continue
+            start = time.perf_counter()
+            pose = run_pose(crop)
+            crop_ms = (time.perf_counter() - start) * 1000.0
+            self.scheduler.record(crop_ms)
+            pose_ms += crop_ms
+            self.stats['crops'] += 1
+
+            if pose is not None:
+                pose = self._to_frame(pose, region, width, height)
+                person_box = box_from_pose(pose, width, height)
+                if person_box is None:
+                    pose = None
+            if track is not None:
+                if pose is None:
+                    track.misses += 1
+                else:
+                    track.update(person_box, pose, timestamp)
+            elif pose is not None:
+                self._add_or_merge(person_box, pose, timestamp)
+
+        self._prune(timestamp)
+        scale = np.array((width, height, width, height))
+        people = [
+            Person(track.id, tuple(float(v) for v in np.clip(track.box / scale, 0.0, 1.0)),
+                   track.predicted_pose(timestamp), track.frames_since_update == 0)
+            for track in sorted(self.tracks, key=lambda t: t.id)
+        ]
+        return people, {'propose_ms': propose_ms, 'pose_ms': pose_ms}
+
+    @staticmethod
+    def _to_frame(pose, region, width, height):
+        """Map crop-normalized landmarks onto the full frame"""
+        x0, y0, x1, y1 = region
+        mapped = np.array(pose, dtype=np.float32, copy=True)
+        mapped[:, 0] = (x0 + mapped[:, 0] * (x1 - x0)) / width
+        mapped[:, 1] = (y0 + mapped[:, 1] * (y1 - y0)) / height
+        mapped[:, 2] *= (x1 - x0) / width
+        return mapped
+
+    def _add_or_merge(self, box, pose, timestamp):
+        # A proposal can land on someone already tracked (e.g. a loose motion blob)
+        for track in self.tracks:
+            if box_iou(box, track.box) >= 0.5:
+                track.update(box, pose, timestamp)
+                return
+        if len(self.tracks) < self.max_people:
+            self.tracks.append(PersonTrack(self._next_id, box, pose, timestamp))
+            self._next_id += 1
+            self.stats['tracks_created'] += 1
+
+    def _prune(self, timestamp):
+        kept = []
+        for track in sorted(self.tracks, key=lambda t: t.id):
+            lost = track.misses >= self.max_misses or timestamp - track.updated_at > self.stale_after
+            # Two tracks that converged on the same person: the older id wins
+            duplicate = any(box_iou(track.box, other.box) >= 0.6 for other in kept)
+            if lost or duplicate:
+                self.stats['tracks_dropped'] += 1
+            else:
+                kept.append(track)
+        self.tracks = kept
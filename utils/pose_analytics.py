@@ -0,0 +1,233 @@
+import numpy as np
+
+# Joint angles as (a, vertex, c) pose landmark indices, keyed like
+# calculateJointAngles in static/analytics.js. The shoulder angles there use
+# the shoulder as both first point and vertex; that is kept so server and
+# browser numbers agree (atan2(0, 0) is 0, so they measure the upper arm
+# against the +x axis).
+JOINT_ANGLES = {
+    'leftShoulder': (11, 11, 13),
+    'leftElbow': (11, 13, 15),
+    'rightShoulder': (12, 12, 14),
+    'rightElbow': (12, 14, 16),
+    'leftHip': (11, 23, 25),
+    'leftKnee': (23, 25, 27),
+    'rightHip': (12, 24, 26),
+    'rightKnee': (24, 26, 28),
+}
+ANGLE_NAMES = tuple(JOINT_ANGLES)
+_ANGLE_INDICES = np.array(list(JOINT_ANGLES.values()))
+
+# Body segments as (start, end) landmark indices
+SEGMENTS = {
+    'shoulderWidth': (11, 12),
+    'hipWidth': (23, 24),
+    'leftUpperArm': (11, 13),
+    'leftForearm': (13, 15),
+    'rightUpperArm': (12, 14),
+    'rightForearm': (14, 16),
+    'leftTorso': (11, 23),
+    'rightTorso': (12, 24),
+    'leftThigh': (23, 25),
+    'leftShin': (25, 27),
+    'rightThigh': (24, 26),
+    'rightShin': (26, 28),
+}
+SEGMENT_NAMES = tuple(SEGMENTS)
+_SEGMENT_INDICES = np.array(list(SEGMENTS.values()))
+
+NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP = 0, 11, 12, 23, 24
+
+# Average landmark displacement per frame -> movement class (detectMovements)
+MOVEMENT_THRESHOLDS = ((0.05, 'FAST'), (0.02, 'MODERATE'), (0.005, 'SLOW'))
+
+
+def _as_pose_array(pose):
+    pose = np.asarray(pose, dtype=np.float64)
+    if pose.ndim < 2 or pose.shape[-2] < 33 or pose.shape[-1] < 2:
+        raise ValueError(f"Expected (..., 33, 2+) pose landmarks, got shape {pose.shape}")
+    return pose
+
+
+def joint_angles(pose):
+    """
+    All joint angles of one or many poses in degrees, as in analytics.js
+
+    Args:
+        pose: (..., 33, 2+) landmark array, e.g. PoseResult.pose (33, 4) or
+            TimelineReader.pose (frames, 33, 4); missing frames may be NaN
+
+    Returns:
+        (..., len(ANGLE_NAMES)) array in the order of ANGLE_NAMES
+    """
+    pose = _as_pose_array(pose)
+    xy = pose[..., _ANGLE_INDICES, :2]        # (..., joints, 3, 2)
+    a, b, c = xy[..., 0, :], xy[..., 1, :], xy[..., 2, :]
+    radians = (np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0]) -
+               np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0]))
+    angle = np.abs(np.degrees(radians))
+    return np.where(angle > 180.0, 360.0 - angle, angle)
+
+
+def torso_lean(pose):
+    """Lean of the shoulder midpoint from the hip midpoint in degrees (0 = upright)"""
+    pose = _as_pose_array(pose)
+    shoulder_mid = (pose[..., LEFT_SHOULDER, :2] + pose[..., RIGHT_SHOULDER, :2]) / 2
+    hip_mid = (pose[..., LEFT_HIP, :2] + pose[..., RIGHT_HIP, :2]) / 2
+    delta = shoulder_mid - hip_mid
+    # atan2(dx, dy), as calculateTorsoLean
+    return np.abs(np.degrees(np.arctan2(delta[..., 0], delta[..., 1])))
+
+
+def segment_lengths(pose):
+    """
+    Lengths of the body segments in SEGMENTS (3D when z is present)
+
+    Returns:
+        (..., len(SEGMENT_NAMES)) array in normalized image units
+    """
+    pose = _as_pose_array(pose)
+    xyz = pose[..., :min(pose.shape[-1], 3)]
+    delta = xyz[..., _SEGMENT_INDICES[:, 0], :] - xyz[..., _SEGMENT_INDICES[:, 1], :]
+    return np.sqrt(np.sum(delta * delta, axis=-1))
+
+
+def body_alignment(pose):
+    """
+    Shoulder / hip tilt, nose-to-hip distance and symmetry score, as in analytics.js
+
+    Returns:
+        Dictionary of name -> (...) array: shoulderTilt, hipTilt,
+        spinalAlignment, symmetryScore
+    """
+    pose = _as_pose_array(pose)
+    shoulder_tilt = np.abs(pose[..., LEFT_SHOULDER, 1] - pose[..., RIGHT_SHOULDER, 1])
+    hip_tilt = np.abs(pose[..., LEFT_HIP, 1] - pose[..., RIGHT_HIP, 1])
+
+    # Nose to the hip midpoint, which calculateBodyAlignment places at z = 0
+    hip_mid = (pose[..., LEFT_HIP, :2] + pose[..., RIGHT_HIP, :2]) / 2
+    delta = pose[..., NOSE, :2] - hip_mid
+    nose_z = pose[..., NOSE, 2] if pose.shape[-1] > 2 else 0.0
+    spinal = np.sqrt(np.sum(delta * delta, axis=-1) + nose_z * nose_z)
+
+    return {
+        'shoulderTilt': shoulder_tilt,
+        'hipTilt': hip_tilt,
+        'spinalAlignment': spinal,
+        'symmetryScore': 100 - (shoulder_tilt + hip_tilt) * 100,
+    }
+
+
+def posture_score(lean, alignment):
+    """
+    Overall 0-100 posture score, as calculatePostureScore
+
+    Args:
+        lean: torso_lean() output
+        alignment: body_alignment() output
+    """
+    lean = np.asarray(lean)
+    score = 100.0 - np.where(lean > 10, (lean - 10) * 2, 0.0)
+    score = score - alignment['shoulderTilt'] * 50 - alignment['hipTilt'] * 50
+    score = score + np.where(alignment['symmetryScore'] > 90, 5.0, 0.0)
+    # np.clip keeps NaN for frames without a pose
+    return np.clip(score, 0.0, 100.0)
+
+
+def movement_speed(poses):
+    """
+    Average landmark displacement from the previous frame
+
+    Args:
+        poses: (frames, 33, 3+) landmark array
+
+    Returns:
+        (frames,) array; the first frame is 0
+    """
+    poses = _as_pose_array(poses)
+    xyz = poses[..., :min(poses.shape[-1], 3)]
+    delta = np.diff(xyz, axis=0)
+    speed = np.sqrt(np.sum(delta * delta, axis=-1)).mean(axis=-1)
+    return np.concatenate([np.zeros(1), speed]) if len(poses) else np.zeros(0)
+
+
+def classify_movement(speed):
+    """Movement label ('STATIC', 'SLOW', 'MODERATE', 'FAST') for an average displacement"""
+    for threshold, label in MOVEMENT_THRESHOLDS:
+        if speed > threshold:
+            return label
+    return 'STATIC'
+
+
+def analyze_pose(pose):
+    """
+    Analytics of a single pose in the shape analytics.js posts to /api/analytics
+
+    Args:
+        pose: (33, 2+) landmark array or list of [x, y, z, ...] rows
+
+    Returns:
+        Dictionary with joint_angles, body_alignment and posture_score
+    """
+    angles = joint_angles(pose)
+    lean = torso_lean(pose)
+    alignment = body_alignment(pose)
+    score = posture_score(lean, alignment)
+
+    angle_values = {name: float(value) for name, value in zip(ANGLE_NAMES, angles)}
+    angle_values['torsoLean'] = float(lean)
+    return {
+        'joint_angles': angle_values,
+        'body_alignment': {name: float(value) for name, value in alignment.items()},
+        'posture_score': float(score),
+    }
+
+
+def analyze_sequence(poses, fps=60.0):
+    """
+    Analytics of every frame of a pose sequence in one vectorized pass
+
+    Args:
+        poses: (frames, 33, 2+) landmark array; frames without a pose are NaN
+            and give NaN metrics
+        fps: Frame rate used for velocity (analytics.js assumes 60)
+
+    Returns:
+        Dictionary of column name -> (frames,) array: one column per joint
+        angle, torsoLean, one per segment length, the alignment metrics,
+        posture_score, speed and velocity
+    """
+    poses = _as_pose_array(poses)
+    angles = joint_angles(poses)
+    lean = torso_lean(poses)
+    segments = segment_lengths(poses)
+    alignment = body_alignment(poses)
+
+    columns = {name: angles[:, i] for i, name in enumerate(ANGLE_NAMES)}
+    columns['torsoLean'] = lean
+    columns.update({name: segments[:, i] for i, name in enumerate(SEGMENT_NAMES)})
+    columns.update(alignment)
+    columns['posture_score'] = posture_score(lean, alignment)
+    speed = movement_speed(poses)
+    columns['speed'] = speed
+    columns['velocity'] = speed * fps
+    return columns
+
+
+def analyze_timeline(path):
+    """
+    Analytics of a recorded landmark timeline (.bvlm)
+
+    Returns:
+        analyze_sequence() columns plus 'timestamp' and 'frame_index'
+    """
+    from utils.landmark_timeline import TimelineReader
+
+    reader = TimelineReader(path)
+    try:
+        columns = analyze_sequence(reader.pose, fps=reader.fps or 60.0)
+        columns['timestamp'] = np.array(reader.timestamps)
+        columns['frame_index'] = np.array(reader.frame_indices)
+    finally:
+        reader.close()
+    return columns
@@ -0,0 +1,226 @@
+import csv
+import io
+import json
+from itertools import chain
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+EXPORT_FORMATS = ('json', 'ndjson', 'csv', 'parquet')
+EXPORT_MIMETYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Records per Parquet row group
+PARQUET_ROW_GROUP = 5000
+
+
+def flatten_record(record, prefix=''):
+    """
+    Flatten nested dictionaries into dotted column names
+
+    {'joint_angles': {'leftElbow': 90}} -> {'joint_angles.leftElbow': 90}
+    """
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_record(value, name + '.'))
+        else:
+            flat[name] = value
+    return flat
+
+
+def field_selected(name, fields):
+    """Whether a (dotted) column is selected; 'joint_angles' selects 'joint_angles.*'"""
+    if fields is None or name == 'timestamp':
+        return True
+    return any(name == field or name.startswith(field + '.') for field in fields)
+
+
+def _select_nested(record, fields):
+    selected = {}
+    for key, value in record.items():
+        if key in fields:
+            selected[key] = value
+        elif isinstance(value, dict):
+            nested = [field[len(key) + 1:] for field in fields if field.startswith(key + '.')]
+            if nested:
+                selected[key] = _select_nested(value, nested)
+    return selected
+
+
+def select_fields(record, fields):
+    """
+    Keep only the requested fields of a nested record (timestamp is always kept)
+
+    Args:
+        record: Stored record
+        fields: List of top-level or dotted field names, None for all
+    """
+    if fields is None:
+        return record
+    selected = _select_nested(record, fields)
+    if 'timestamp' in record:
+        selected['timestamp'] = record['timestamp']
+    return selected
+
+
+def iter_json(stores, start=None, end=None, fields=None, extra=None):
+    """
+    Stream a JSON object with one array per store
+
+    Args:
+        stores: Dictionary of key -> TimeSeriesStore, in output order
+        start, end: Unix time range (None for unbounded)
+        fields: Field filter (see select_fields)
+        extra: Small top-level values written before the arrays
+
+    Yields:
+        JSON text fragments
+    """
+    parts = [json.dumps(key) + ':' + json.dumps(value) for key, value in (extra or {}).items()]
+    yield '{' + ','.join(parts)
+
+    separator = ',' if parts else ''
+    for key, store in stores.items():
+        yield separator + json.dumps(key) + ':['
+        separator = ','
+        first = True
+        for chunk in store.iter_range(start, end):
+            body = ','.join(json.dumps(select_fields(record, fields)) for record in chunk)
+            yield body if first else ',' + body
+            first = False
+        yield ']'
+    yield '}'
+
+
+def iter_ndjson(stores, start=None, end=None, fields=None):
+    """
+    Stream newline-delimited JSON, one record per line tagged with its store key
+
+    Yields:
+        Blocks of lines
+    """
+    for key, store in stores.items():
+        for chunk in store.iter_range(start, end):
+            yield ''.join(json.dumps({'type': key, **select_fields(record, fields)}) + '\n'
+                          for record in chunk)
+
+
+def _flat_chunks(store, start, end, fields, chunk_size=500):
+    """
+    Flattened record chunks plus the column list taken from the first chunk
+
+    Columns only present in later records are dropped, which keeps the
+    export single-pass; stored records come from one client schema.
+    """
+    chunks = store.iter_range(start, end, chunk_size=chunk_size)
+    first = [flatten_record(record) for record in next(chunks, [])]
+
+    columns = ['timestamp']
+    for row in first:
+        for name in row:
+            if name not in columns and field_selected(name, fields):
+                columns.append(name)
+
+    rest = ([flatten_record(record) for record in chunk] for chunk in chunks)
+    return columns, chain([first] if first else [], rest)
+
+
+def iter_csv(store, start=None, end=None, fields=None):
+    """
+    Stream one store as CSV with nested fields flattened into dotted columns
+
+    Yields:
+        CSV text blocks (header first)
+    """
+    columns, chunks = _flat_chunks(store, start, end, fields)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, columns, extrasaction='ignore')
+    writer.writeheader()
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each row group"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_column(values):
+    """Numbers become float64 columns; anything else is stored as text"""
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, (int, float)) and not isinstance(value, bool)
+                       for value in present):
+        return pa.float64()
+    return pa.string()
+
+
+def _parquet_value(value, column_type):
+    if value is None:
+        return None
+    if column_type == pa.float64():
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def iter_parquet(store, start=None, end=None, fields=None):
+    """
+    Stream one store as a Parquet file, one row group per chunk of records
+
+    Yields:
+        Bytes of the file as each row group (and finally the footer) is written
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is not installed. Please run: pip install pyarrow")
+
+    columns, chunks = _flat_chunks(store, start, end, fields, chunk_size=PARQUET_ROW_GROUP)
+    chunks = iter(chunks)
+    first = next(chunks, [])
+    schema = pa.schema([(name, _parquet_column([row.get(name) for row in first]))
+                        for name in columns])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    for rows in chain([first] if first else [], chunks):
+        arrays = {
+            field.name: [_parquet_value(row.get(field.name), field.type) for row in rows]
+            for field in schema
+        }
+        writer.write_table(pa.table(arrays, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,355 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from utils.time_series import DEFAULT_ROLLUP_INTERVALS, TimeSeriesStore
+
+DEFAULT_SETTINGS = {
+    'theme': 'dark',
+    'showPose': True,
+    'showHands': True,
+    'showFace': False,
+    'multiPerson': False,
+    'showLabels': True,
+    'visualizationStyle': 'skeleton',
+    'confidenceThreshold': 0.5
+}
+
+# Numeric field rolled up per series
+ROLLUP_FIELDS = {'gestures': 'confidence', 'analytics': 'posture_score'}
+
+
+class MemorySession:
+    """Gesture / analytics history and settings of one client, held in memory"""
+
+    def __init__(self, history_limit):
+        self.gestures = TimeSeriesStore(capacity=history_limit,
+                                        rollup_fields=(ROLLUP_FIELDS['gestures'],))
+        self.analytics = TimeSeriesStore(capacity=history_limit,
+                                         rollup_fields=(ROLLUP_FIELDS['analytics'],))
+        self._settings = dict(DEFAULT_SETTINGS)
+        self._settings_lock = threading.Lock()
+        self.last_seen = time.monotonic()
+
+    def get_settings(self):
+        with self._settings_lock:
+            return dict(self._settings)
+
+    def update_settings(self, changes):
+        with self._settings_lock:
+            self._settings.update(changes)
+            return dict(self._settings)
+
+    def reset(self):
+        self.gestures.clear()
+        self.analytics.clear()
+
+
+class MemorySessionBackend:
+    """
+    Per-client sessions in process memory, spread over independently locked shards
+
+    A request only takes the lock of the shard its session hashes to (and
+    then the session's own store locks), so clients do not serialize
+    behind one global structure. Each shard keeps its sessions in LRU
+    order; sessions idle for `idle_timeout` seconds, or the least recently
+    used ones beyond the shard's share of `max_sessions`, are dropped.
+
+    State is per process: with several gunicorn workers use the SQLite
+    backend so every worker sees the same data.
+    """
+
+    name = 'memory'
+    blocking = False
+
+    def __init__(self, history_limit=10000, shards=16, max_sessions=1000, idle_timeout=3600.0):
+        self.history_limit = history_limit
+        self.idle_timeout = idle_timeout
+        self._shard_limit = max(1, -(-max_sessions // shards))
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self.evicted = 0
+
+    def get(self, session_id):
+        """Get the session with this id, creating it if needed"""
+        lock, sessions = self._shards[hash(session_id) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            session = sessions.get(session_id)
+            if session is None:
+                self._evict_locked(sessions, now)
+                session = MemorySession(self.history_limit)
+                sessions[session_id] = session
+            else:
+                sessions.move_to_end(session_id)
+            session.last_seen = now
+            return session
+
+    def _evict_locked(self, sessions, now):
+        while sessions:
+            session_id, oldest = next(iter(sessions.items()))
+            if len(sessions) < self._shard_limit and now - oldest.last_seen <= self.idle_timeout:
+                break
+            del sessions[session_id]
+            self.evicted += 1
+
+    def get_stats(self):
+        retained = dict.fromkeys(ROLLUP_FIELDS, 0)
+        sessions_count = 0
+        for lock, sessions in self._shards:
+            with lock:
+                shard_sessions = list(sessions.values())
+            sessions_count += len(shard_sessions)
+            for session in shard_sessions:
+                retained['gestures'] += session.gestures.get_stats()['retained']
+                retained['analytics'] += session.analytics.get_stats()['retained']
+        return {
+            'backend': self.name,
+            'sessions': sessions_count,
+            'shards': len(self._shards),
+            'evicted': self.evicted,
+            'retained': retained,
+        }
+
+
+class SQLiteSeries:
+    """
+    One session's gesture or analytics history in SQLite
+
+    Same query interface as TimeSeriesStore. Rows beyond `capacity` per
+    series are pruned every so often, so retention is approximate.
+    Rollups are computed with GROUP BY over the retained rows.
+    """
+
+    PRUNE_EVERY = 200
+
+    def __init__(self, backend, session_id, kind, capacity):
+        self._backend = backend
+        self.session_id = session_id
+        self.kind = kind
+        self.capacity = capacity
+        self.rollup_field = ROLLUP_FIELDS[kind]
+        self.rollup_intervals = DEFAULT_ROLLUP_INTERVALS
+
+    def _row(self, timestamp, record):
+        value = record.get(self.rollup_field)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            value = None
+        return (self.session_id, self.kind, timestamp, value, json.dumps(record))
+
+    def append(self, record, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        self.extend([(timestamp, record)], prune=random.randrange(self.PRUNE_EVERY) == 0)
+
+    def extend(self, items, prune=True):
+        rows = [self._row(timestamp, record) for timestamp, record in items]
+        if not rows:
+            return
+        with self._backend.transaction() as db:
+            db.executemany("INSERT INTO samples (session_id, kind, ts, value, record) "
+                           "VALUES (?, ?, ?, ?, ?)", rows)
+            if prune:
+                db.execute(
+                    "DELETE FROM samples WHERE session_id = ? AND kind = ? AND rowid <= ("
+                    " SELECT rowid FROM samples WHERE session_id = ? AND kind = ?"
+                    " ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+                    (self.session_id, self.kind, self.session_id, self.kind, self.capacity))
+
+    def _where(self, start, end):
+        clause = "session_id = ? AND kind = ?"
+        params = [self.session_id, self.kind]
+        if start is not None:
+            clause += " AND ts >= ?"
+            params.append(start)
+        if end is not None:
+            clause += " AND ts < ?"
+            params.append(end)
+        return clause, params
+
+    def latest(self, count):
+        rows = self._backend.connection().execute(
+            "SELECT record FROM samples WHERE session_id = ? AND kind = ? "
+            "ORDER BY ts DESC, rowid DESC LIMIT ?", (self.session_id, self.kind, count)).fetchall()
+        return [json.loads(record) for (record,) in reversed(rows)]
+
+    def range(self, start=None, end=None, limit=None):
+        clause, params = self._where(start, end)
+        rows = self._backend.connection().execute(
+            f"SELECT record FROM samples WHERE {clause} ORDER BY ts, rowid LIMIT ?",
+            params + [-1 if limit is None else limit]).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def iter_range(self, start=None, end=None, chunk_size=500):
+        """Chunked keyset iteration; rows inserted after it starts are not included"""
+        db = self._backend.connection()
+        clause, params = self._where(start, end)
+        (stop,) = db.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM samples WHERE {clause}",
+                             params).fetchone()
+        position = (float('-inf'), 0)
+        while True:
+            rows = db.execute(
+                f"SELECT ts, rowid, record FROM samples WHERE {clause} AND rowid <= ? "
+                "AND (ts > ? OR (ts = ? AND rowid > ?)) ORDER BY ts, rowid LIMIT ?",
+                params + [stop, position[0], position[0], position[1], chunk_size]).fetchall()
+            if not rows:
+                return
+            position = rows[-1][:2]
+            yield [json.loads(record) for _, _, record in rows]
+
+    def rollups(self, interval, start=None, end=None):
+        if interval not in self.rollup_intervals:
+            raise KeyError(interval)
+        clause, params = self._where(start, end)
+        rows = self._backend.connection().execute(
+            f"SELECT CAST(ts / ? AS INTEGER) * ? AS bucket, COUNT(*), COUNT(value), "
+            f"AVG(value), MIN(value), MAX(value) FROM samples WHERE {clause} "
+            "GROUP BY bucket ORDER BY bucket", [interval, interval] + params).fetchall()
+        buckets = []
+        for bucket, count, value_count, avg, low, high in rows:
+            row = {'start': float(bucket), 'count': count}
+            if value_count:
+                row[self.rollup_field] = {'avg': avg, 'min': low, 'max': high, 'count': value_count}
+            buckets.append(row)
+        return buckets
+
+    def clear(self):
+        with self._backend.transaction() as db:
+            db.execute("DELETE FROM samples WHERE session_id = ? AND kind = ?",
+                       (self.session_id, self.kind))
+
+    def get_stats(self):
+        (retained,) = self._backend.connection().execute(
+            "SELECT COUNT(*) FROM samples WHERE session_id = ? AND kind = ?",
+            (self.session_id, self.kind)).fetchone()
+        return {'retained': retained, 'capacity': self.capacity}
+
+
+class SQLiteSession:
+    """Gesture / analytics history and settings of one client, stored in SQLite"""
+
+    def __init__(self, backend, session_id, history_limit):
+        self._backend = backend
+        self.session_id = session_id
+        self.gestures = SQLiteSeries(backend, session_id, 'gestures', history_limit)
+        self.analytics = SQLiteSeries(backend, session_id, 'analytics', history_limit)
+
+    def get_settings(self):
+        row = self._backend.connection().execute(
+            "SELECT settings FROM settings WHERE session_id = ?", (self.session_id,)).fetchone()
+        settings = dict(DEFAULT_SETTINGS)
+        if row is not None:
+            settings.update(json.loads(row[0]))
+        return settings
+
+    def update_settings(self, changes):
+        with self._backend.transaction() as db:
+            row = db.execute("SELECT settings FROM settings WHERE session_id = ?",
+                             (self.session_id,)).fetchone()
+            settings = dict(DEFAULT_SETTINGS)
+            if row is not None:
+                settings.update(json.loads(row[0]))
+            settings.update(changes)
+            db.execute("INSERT OR REPLACE INTO settings (session_id, settings, updated) "
+                       "VALUES (?, ?, ?)", (self.session_id, json.dumps(settings), time.time()))
+        return settings
+
+    def reset(self):
+        self.gestures.clear()
+        self.analytics.clear()
+
+
+class SQLiteSessionBackend:
+    """
+    Per-client sessions in a local SQLite file shared by all worker processes
+
+    Every thread gets its own connection. WAL mode lets readers in any
+    process run alongside the single writer, and a busy timeout makes
+    concurrent writers wait for each other instead of failing.
+    """
+
+    name = 'sqlite'
+    # Queries do file I/O and may wait on other writers
+    blocking = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS samples (
+            session_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            ts REAL NOT NULL,
+            value REAL,
+            record TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS samples_session_time ON samples (session_id, kind, ts);
+        CREATE TABLE IF NOT EXISTS settings (
+            session_id TEXT PRIMARY KEY,
+            settings TEXT NOT NULL,
+            updated REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path, history_limit=10000):
+        self.path = path
+        self.history_limit = history_limit
+        self._local = threading.local()
+        self.connection().executescript(self.SCHEMA)
+
+    def connection(self):
+        db = getattr(self._local, 'db', None)
+        # A connection inherited through fork (gunicorn preload_app) must not be reused
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def transaction(self):
+        return _Transaction(self.connection())
+
+    def get(self, session_id):
+        return SQLiteSession(self, session_id, self.history_limit)
+
+    def get_stats(self):
+        db = self.connection()
+        (sessions,) = db.execute("SELECT COUNT(DISTINCT session_id) FROM samples").fetchone()
+        retained = dict.fromkeys(ROLLUP_FIELDS, 0)
+        retained.update(db.execute("SELECT kind, COUNT(*) FROM samples GROUP BY kind").fetchall())
+        return {'backend': self.name, 'sessions': sessions, 'path': self.path,
+                'retained': retained}
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT / ROLLBACK around a block"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        return False
+
+
+def create_session_backend(kind='memory', path='bodyvision_sessions.db', **kwargs):
+    """
+    Build the session backend selected by configuration
+
+    Args:
+        kind: 'memory' or 'sqlite'
+        path: SQLite database file (sqlite only)
+        **kwargs: history_limit, plus shards / max_sessions / idle_timeout
+            for the memory backend
+    """
+    if kind == 'sqlite':
+        return SQLiteSessionBackend(path, history_limit=kwargs.get('history_limit', 10000))
+    if kind == 'memory':
+        return MemorySessionBackend(**kwargs)
+    raise ValueError(f"Unknown session backend: {kind}")
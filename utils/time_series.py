@@ -0,0 +1,242 @@
+import threading
+import time
+from collections import deque
+
+# Rollup intervals in seconds
+DEFAULT_ROLLUP_INTERVALS = (1, 60)
+
+
+class _Rollup:
+    """Fixed-interval buckets of count / sum / min / max per numeric field"""
+
+    def __init__(self, interval, fields, capacity):
+        self.interval = interval
+        self.fields = fields
+        self.buckets = deque(maxlen=capacity)
+
+    def add(self, timestamp, record):
+        bucket_start = timestamp - timestamp % self.interval
+        if not self.buckets or self.buckets[-1]['start'] < bucket_start:
+            self.buckets.append({'start': bucket_start, 'count': 0, 'fields': {}})
+        bucket = self.buckets[-1]
+        bucket['count'] += 1
+
+        for field in self.fields:
+            value = record.get(field)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            stats = bucket['fields'].get(field)
+            if stats is None:
+                bucket['fields'][field] = [1, value, value, value]
+            else:
+                stats[0] += 1
+                stats[1] += value
+                if value < stats[2]:
+                    stats[2] = value
+                if value > stats[3]:
+                    stats[3] = value
+
+    def query(self, start=None, end=None):
+        rows = []
+        for bucket in self.buckets:
+            if start is not None and bucket['start'] + self.interval <= start:
+                continue
+            if end is not None and bucket['start'] >= end:
+                break
+            row = {'start': bucket['start'], 'count': bucket['count']}
+            for field, (count, total, low, high) in bucket['fields'].items():
+                row[field] = {'avg': total / count, 'min': low, 'max': high, 'count': count}
+            rows.append(row)
+        return rows
+
+
+class TimeSeriesStore:
+    """
+    Bounded, time-indexed store for a stream of JSON records
+
+    Raw records live in a fixed-capacity ring buffer: once it is full each
+    append overwrites the oldest record, so memory does not grow with the
+    length of the session. Timestamps are kept in a parallel ring and are
+    non-decreasing, so time range queries are a binary search.
+
+    Numeric fields listed in `rollup_fields` are also aggregated into
+    fixed-interval buckets (1 s and 1 min by default). Rollups keep their
+    own bounded history, so they cover far more time than the raw ring,
+    e.g. 1440 one-minute buckets is a full day.
+    """
+
+    def __init__(self, capacity=10000, rollup_fields=(), rollup_intervals=DEFAULT_ROLLUP_INTERVALS,
+                 rollup_capacity=1440):
+        self.capacity = capacity
+        # Grown on demand up to `capacity`, then reused as a ring
+        self._records = []
+        self._timestamps = []
+        self._start = 0
+        self._size = 0
+        self.appended = 0
+        self.evicted = 0
+        self._rollups = {interval: _Rollup(interval, tuple(rollup_fields), rollup_capacity)
+                         for interval in rollup_intervals}
+        self._lock = threading.Lock()
+
+    def append(self, record, timestamp=None):
+        """
+        Add a record
+
+        Args:
+            record: Dictionary to store (kept by reference)
+            timestamp: Unix time in seconds (defaults to now); clamped so
+                the index stays sorted if the clock steps backwards
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self._append_locked(record, timestamp)
+
+    def extend(self, items):
+        """
+        Add many records under a single lock acquisition
+
+        Args:
+            items: Iterable of (timestamp, record) pairs in time order
+        """
+        with self._lock:
+            for timestamp, record in items:
+                self._append_locked(record, timestamp)
+
+    def _append_locked(self, record, timestamp):
+        if self._size:
+            timestamp = max(timestamp, self._timestamps[self._index(self._size - 1)])
+
+        if self._size < self.capacity:
+            self._records.append(record)
+            self._timestamps.append(timestamp)
+            self._size += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+            self._records[slot] = record
+            self._timestamps[slot] = timestamp
+            self.evicted += 1
+        self.appended += 1
+
+        for rollup in self._rollups.values():
+            rollup.add(timestamp, record)
+
+    def latest(self, count):
+        """Get the newest `count` records, oldest first"""
+        with self._lock:
+            count = min(count, self._size)
+            return [self._records[self._index(i)] for i in range(self._size - count, self._size)]
+
+    def range(self, start=None, end=None, limit=None):
+        """
+        Get records with start <= timestamp < end, oldest first
+
+        Args:
+            start: Unix time in seconds, None for the oldest record
+            end: Unix time in seconds, None for the newest record
+            limit: Maximum number of records to return
+
+        Returns:
+            List of records
+        """
+        with self._lock:
+            first = 0 if start is None else self._bisect(start)
+            last = self._size if end is None else self._bisect(end)
+            if limit is not None:
+                last = min(last, first + limit)
+            return [self._records[self._index(i)] for i in range(first, last)]
+
+    def iter_range(self, start=None, end=None, chunk_size=500):
+        """
+        Iterate over records with start <= timestamp < end in chunks
+
+        The lock is only held while a chunk is copied out, so producers are
+        not blocked for the length of a slow consumer (e.g. a streaming
+        export). Records appended after iteration starts are not included;
+        records overwritten by the ring while iterating are skipped.
+
+        Yields:
+            Lists of up to `chunk_size` records, oldest first
+        """
+        with self._lock:
+            # Absolute sequence numbers survive the ring wrapping between chunks
+            position = self.appended - self._size
+            if start is not None:
+                position += self._bisect(start)
+            stop = self.appended
+
+        while True:
+            with self._lock:
+                oldest = self.appended - self._size
+                logical = max(position - oldest, 0)
+                last = min(logical + chunk_size, stop - oldest)
+                if end is not None:
+                    last = min(last, self._bisect(end))
+                chunk = [self._records[self._index(i)] for i in range(logical, last)]
+                position = oldest + last
+            if not chunk:
+                return
+            yield chunk
+
+    def rollups(self, interval, start=None, end=None):
+        """
+        Get aggregated buckets for one rollup interval
+
+        Returns:
+            List of {'start', 'count', <field>: {'avg', 'min', 'max', 'count'}}
+            dictionaries, oldest first
+
+        Raises:
+            KeyError: `interval` is not one of the configured intervals
+        """
+        with self._lock:
+            return self._rollups[interval].query(start, end)
+
+    @property
+    def rollup_intervals(self):
+        return tuple(self._rollups)
+
+    @property
+    def time_span(self):
+        """(oldest, newest) timestamps of the retained records, or None"""
+        with self._lock:
+            if self._size == 0:
+                return None
+            return self._timestamps[self._start], self._timestamps[self._index(self._size - 1)]
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        with self._lock:
+            self._records = []
+            self._timestamps = []
+            self._start = 0
+            self._size = 0
+            for rollup in self._rollups.values():
+                rollup.buckets.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'retained': self._size,
+                'capacity': self.capacity,
+                'appended': self.appended,
+                'evicted': self.evicted,
+            }
+
+    def _index(self, logical):
+        return (self._start + logical) % self.capacity
+
+    def _bisect(self, timestamp):
+        """First logical index whose timestamp is >= `timestamp`"""
+        low, high = 0, self._size
+        while low < high:
+            mid = (low + high) // 2
+            if self._timestamps[self._index(mid)] < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low